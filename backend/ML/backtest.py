@@ -0,0 +1,246 @@
+"""
+backtest.py
+
+Walk-forward backtest of the trained LSTM models in ML/models.
+
+For every symbol, the model is asked to forecast from many historical
+"origins" (one every --stride trading days). All origins of a symbol are
+stacked into a single tensor, so each forecast step is one model call
+instead of one call per origin. Symbols are evaluated in parallel.
+
+Each origin is scaled the way /api/predict scales "today": with the
+min/max of all prices up to that day, so no future data leaks in.
+
+Reports, per symbol and for the whole fleet:
+- direction accuracy per horizon (did the price move the predicted way?)
+- MAPE per horizon (mean absolute percentage error of the predicted price)
+- accuracy per year of origin (accuracy vs time)
+
+Usage:
+    python backtest.py                           # all models
+    python backtest.py --symbols NABIL NICA --stride 1 --report backtest.json
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.database import DB_CONFIG
+from ML.inference import WINDOW_SIZE, batched_rollout
+from ML.model_registry import list_symbols, model_path
+
+# Same horizons as /api/predict
+HORIZONS = {
+    "very_short_term": 3,
+    "short_term": 7,
+    "mid_term": 20,
+    "long_term": 60,
+}
+
+
+# -------------------------------------------------------------------
+# Data and models
+# -------------------------------------------------------------------
+
+def list_model_symbols():
+    """Symbols with a trained model in the live version."""
+    return list_symbols()
+
+
+def load_history(symbol):
+    """Dates and closing prices of one symbol, oldest first."""
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        df = pd.read_sql(
+            "SELECT date, close FROM stocks WHERE symbol = %s AND close IS NOT NULL ORDER BY date ASC",
+            conn,
+            params=(symbol,),
+        )
+    finally:
+        conn.close()
+    return df
+
+
+# -------------------------------------------------------------------
+# Backtest of one symbol
+# -------------------------------------------------------------------
+
+def backtest_symbol(symbol, stride=5, max_origins=None):
+    """
+    Evaluates one model over rolling origins.
+
+    Returns:
+        pd.DataFrame: one row per (origin, horizon) with the current,
+                      predicted and actual price, or None if not enough data
+    """
+    import tensorflow as tf
+
+    df = load_history(symbol)
+    close = df["close"].to_numpy(dtype=np.float64)
+    max_h = max(HORIZONS.values())
+    if len(close) < WINDOW_SIZE + max_h + 1:
+        return None
+
+    # Origins t: a full window ends at t and t + max_h is still in the data
+    origins = np.arange(WINDOW_SIZE - 1, len(close) - max_h, stride)
+    if max_origins:
+        origins = origins[-max_origins:]
+
+    # Scaler of each origin = min/max of all prices up to that day
+    running_min = np.minimum.accumulate(close)[origins]
+    running_max = np.maximum.accumulate(close)[origins]
+    price_range = np.where(running_max > running_min, running_max - running_min, 1.0)
+
+    # (n_origins, 60) windows ending at each origin, scaled per origin
+    all_windows = sliding_window_view(close, WINDOW_SIZE)
+    windows = all_windows[origins - (WINDOW_SIZE - 1)]
+    scaled = (windows - running_min[:, None]) / price_range[:, None]
+
+    model = tf.keras.models.load_model(model_path(symbol), compile=False)
+    predictions = batched_rollout(model, scaled, max_h)
+    predicted_prices = predictions * price_range[:, None] + running_min[:, None]
+
+    dates = pd.to_datetime(df["date"]).to_numpy()
+    rows = []
+    for name, days in HORIZONS.items():
+        rows.append(pd.DataFrame({
+            "symbol": symbol,
+            "horizon": name,
+            "days": days,
+            "origin_date": dates[origins],
+            "current": close[origins],
+            "predicted": predicted_prices[:, days - 1],
+            "actual": close[origins + days],
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+# -------------------------------------------------------------------
+# Metrics
+# -------------------------------------------------------------------
+
+def add_errors(results):
+    """Adds direction hit and absolute percentage error columns (vectorized)."""
+    predicted_move = np.sign(results["predicted"] - results["current"])
+    actual_move = np.sign(results["actual"] - results["current"])
+    results["direction_hit"] = predicted_move == actual_move
+    results["ape"] = (results["predicted"] - results["actual"]).abs() / results["actual"].abs()
+    return results
+
+
+def summarize(results):
+    """Direction accuracy and MAPE per horizon."""
+    grouped = results.groupby("horizon", sort=False)
+    return {
+        horizon: {
+            "origins": int(len(g)),
+            "direction_accuracy": round(float(g["direction_hit"].mean()), 4),
+            "mape": round(float(g["ape"].mean() * 100), 2),
+        }
+        for horizon, g in grouped
+    }
+
+
+def accuracy_over_time(results):
+    """Fleet-wide direction accuracy and MAPE per horizon and origin year."""
+    by_year = results.assign(year=pd.to_datetime(results["origin_date"]).dt.year)
+    table = by_year.groupby(["year", "horizon"], sort=True).agg(
+        direction_accuracy=("direction_hit", "mean"),
+        mape=("ape", "mean"),
+        origins=("ape", "size"),
+    )
+    return {
+        str(year): {
+            horizon: {
+                "direction_accuracy": round(float(row.direction_accuracy), 4),
+                "mape": round(float(row.mape * 100), 2),
+                "origins": int(row.origins),
+            }
+            for (_, horizon), row in group.iterrows()
+        }
+        for year, group in table.groupby(level=0)
+    }
+
+
+# -------------------------------------------------------------------
+# Fleet backtest
+# -------------------------------------------------------------------
+
+def run_backtest(symbols=None, stride=5, max_origins=None, workers=4):
+    """
+    Backtests every model (or the given symbols) and returns a report dict.
+    """
+    symbols = symbols or list_model_symbols()
+    start = time.perf_counter()
+
+    def run_one(symbol):
+        try:
+            return symbol, backtest_symbol(symbol, stride, max_origins)
+        except Exception as e:
+            print(f"Skipping {symbol}: {e}")
+            return symbol, None
+
+    per_symbol = {}
+    frames = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for symbol, results in pool.map(run_one, symbols):
+            if results is None:
+                continue
+            results = add_errors(results)
+            per_symbol[symbol] = summarize(results)
+            frames.append(results)
+            print(f"{symbol}: " + ", ".join(
+                f"{h} acc={m['direction_accuracy']:.2f} mape={m['mape']:.1f}%"
+                for h, m in per_symbol[symbol].items()
+            ))
+
+    if not frames:
+        return {"symbols": {}, "fleet": {}, "over_time": {}}
+
+    fleet = pd.concat(frames, ignore_index=True)
+    return {
+        "params": {"stride": stride, "max_origins": max_origins},
+        "elapsed_seconds": round(time.perf_counter() - start, 1),
+        "symbols": per_symbol,
+        "fleet": summarize(fleet),
+        "over_time": accuracy_over_time(fleet),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the LSTM models")
+    parser.add_argument("--symbols", nargs="*", help="Symbols to test (default: every model)")
+    parser.add_argument("--stride", type=int, default=5, help="Trading days between origins")
+    parser.add_argument("--max-origins", type=int, help="Only the most recent N origins per symbol")
+    parser.add_argument("--workers", type=int, default=4, help="Symbols evaluated in parallel")
+    parser.add_argument("--report", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run_backtest(args.symbols, args.stride, args.max_origins, args.workers)
+
+    print("\nFleet summary:")
+    for horizon, m in report["fleet"].items():
+        print(f"  {horizon:16s} accuracy={m['direction_accuracy']:.3f} "
+              f"mape={m['mape']:.2f}% origins={m['origins']}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.report}")
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
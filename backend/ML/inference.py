@@ -0,0 +1,42 @@
+"""
+inference.py
+
+Batched autoregressive rollouts for the LSTM models.
+
+The API and the backtester both need "feed the last 60 prices, predict the
+next one, append it, repeat". Doing that for many windows at once turns
+N separate rollouts into one model call per step on an (N, 60, 1) tensor.
+"""
+import numpy as np
+
+# Number of past prices the models were trained on (see utils/preprocessing.py)
+WINDOW_SIZE = 60
+
+
+def batched_rollout(model, windows, steps, batch_size=4096):
+    """
+    Roll a model forward `steps` days for every window at once.
+
+    Args:
+        model (tf.keras.Model): Trained LSTM model
+        windows (np.array): Scaled input windows, shape (n, >= 60)
+        steps (int): Number of days to predict
+        batch_size (int): Maximum windows per model call (limits memory)
+
+    Returns:
+        np.array: Scaled predictions, shape (n, steps); column i is day i+1
+    """
+    windows = np.asarray(windows, dtype=np.float32)[:, -WINDOW_SIZE:]
+    n = windows.shape[0]
+    predictions = np.empty((n, steps), dtype=np.float32)
+
+    for step in range(steps):
+        next_values = np.empty(n, dtype=np.float32)
+        for start in range(0, n, batch_size):
+            x = windows[start:start + batch_size, :, np.newaxis]
+            next_values[start:start + batch_size] = np.asarray(model(x, training=False))[:, 0]
+        predictions[:, step] = next_values
+        # Slide every window by one day, appending its own prediction
+        windows = np.concatenate([windows[:, 1:], next_values[:, np.newaxis]], axis=1)
+
+    return predictions
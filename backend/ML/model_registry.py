@@ -0,0 +1,380 @@
+"""
+model_registry.py
+
+Versioned storage of the trained LSTM models.
+
+Training never overwrites a model file that the API may be reading.
+Each training run writes a new version directory and then swaps a
+pointer file:
+
+    ML/models/
+        CURRENT                         name of the live version (replaced atomically)
+        versions/
+            20260101-120000-4242/
+                manifest.json           every symbol -> model file (may point into older versions)
+                NABIL_model.h5
+                ...
+
+- A run that retrains only some symbols carries the other symbols over
+  from the previous version, so every manifest is complete
+- The version directory is written under a temporary name and renamed
+  when complete, so readers never see half-written files
+- Old versions stay on disk for instant rollback (`rollback <version>`)
+- Without a CURRENT file, the old flat layout ML/models/<symbol>_model.h5
+  is used, so existing model folders keep working
+
+The API keeps loaded models in a ModelCache, which watches CURRENT and
+reloads changed symbols in the background.
+
+Usage:
+    python model_registry.py list
+    python model_registry.py rollback 20260101-120000-4242
+    python model_registry.py prune --keep 5
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import argparse
+import json
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+# Registry root; override with MODEL_DIR to keep a separate registry (load tests)
+MODEL_DIR = Path(os.getenv("MODEL_DIR", Path(BASE_DIR) / "models"))
+VERSIONS_DIR = MODEL_DIR / "versions"
+CURRENT_FILE = MODEL_DIR / "CURRENT"
+
+# How often the API checks CURRENT for a new version (seconds)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+# Loaded models kept per API process (least recently used are dropped)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "64"))
+
+
+# -------------------------------------------------------------------
+# Reading versions
+# -------------------------------------------------------------------
+
+def model_filename(symbol):
+    """File of one model, relative to its directory (symbols with '/' become subfolders)."""
+    return f"{symbol}_model.h5"
+
+
+def current_version():
+    """Name of the live version, or None for the flat (unversioned) layout."""
+    try:
+        return CURRENT_FILE.read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions():
+    """Published versions, oldest first."""
+    if not VERSIONS_DIR.exists():
+        return []
+    return sorted(
+        p.parent.name for p in VERSIONS_DIR.glob("*/manifest.json")
+        if not p.parent.name.startswith(".")  # skip runs still being written
+    )
+
+
+def read_manifest(version=None):
+    """
+    Manifest of a version (default: the live one).
+    For the flat layout, a manifest is built from the files on disk.
+    """
+    version = version or current_version()
+    if version is None:
+        symbols = {
+            p.relative_to(MODEL_DIR).as_posix()[:-len("_model.h5")]: {"path": p.relative_to(MODEL_DIR).as_posix()}
+            for p in MODEL_DIR.rglob("*_model.h5")
+            if VERSIONS_DIR not in p.parents
+        }
+        return {"version": None, "symbols": symbols}
+    return json.loads((VERSIONS_DIR / version / "manifest.json").read_text())
+
+
+def list_symbols(manifest=None):
+    """Symbols with a trained model."""
+    manifest = manifest or read_manifest()
+    return sorted(manifest["symbols"])
+
+
+def model_path(symbol, manifest=None):
+    """Absolute path of a symbol's model file, or None if it has no model."""
+    manifest = manifest or read_manifest()
+    entry = manifest["symbols"].get(symbol)
+    return MODEL_DIR / entry["path"] if entry else None
+
+
+# -------------------------------------------------------------------
+# Publishing versions
+# -------------------------------------------------------------------
+
+def set_current(version):
+    """Atomically point CURRENT at a version (also used for rollback)."""
+    if version not in list_versions():
+        raise ValueError(f"Unknown model version: {version}")
+    tmp_path = CURRENT_FILE.with_suffix(".tmp")
+    tmp_path.write_text(version + "\n")
+    os.replace(tmp_path, CURRENT_FILE)
+
+
+class VersionWriter:
+    """
+    Collects the models of one training run and publishes them as a new version.
+
+        writer = VersionWriter()
+        writer.save(symbol, model, rows=len(df), last_date=...)
+        writer.publish()
+    """
+
+    def __init__(self):
+        self.version = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.staging_dir = VERSIONS_DIR / f".staging-{self.version}"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.entries = {}
+
+    def save(self, symbol, model, **info):
+        """Save one model; `info` (rows, last_date, ...) is kept in the manifest as JSON values."""
+        path = self.staging_dir / model_filename(symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        model.save(path)
+        self.entries[symbol] = {
+            "path": f"versions/{self.version}/{model_filename(symbol)}",
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **info,
+        }
+
+    def publish(self):
+        """Write the manifest, move the version into place and make it live."""
+        # Symbols not retrained keep their current file (flat layout files included)
+        previous = read_manifest()
+        symbols = dict(previous["symbols"])
+        symbols.update(self.entries)
+
+        manifest = {
+            "version": self.version,
+            "parent": previous["version"],
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "trained": sorted(self.entries),
+            "symbols": symbols,
+        }
+        # default=str only for values JSON has no type for (dates)
+        (self.staging_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, default=str))
+        os.rename(self.staging_dir, VERSIONS_DIR / self.version)
+        set_current(self.version)
+        print(f"✔ Published model version {self.version} ({len(self.entries)} retrained, {len(symbols)} total)")
+        return self.version
+
+    def discard(self):
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+def prune(keep=5):
+    """
+    Delete old versions, keeping the newest `keep`, the live one, and any
+    version whose files are still referenced by a kept manifest.
+    """
+    if keep < 1:
+        # versions[-0:] would be the whole list and nothing would be pruned
+        raise ValueError("keep must be at least 1")
+    versions = list_versions()
+    kept = set(versions[-keep:]) | {current_version()}
+    referenced = set()
+    for version in kept - {None}:
+        for entry in read_manifest(version)["symbols"].values():
+            parts = entry["path"].split("/")
+            if parts[0] == "versions":
+                referenced.add(parts[1])
+
+    removed = [v for v in versions if v not in kept and v not in referenced]
+    for version in removed:
+        shutil.rmtree(VERSIONS_DIR / version)
+    return removed
+
+
+# -------------------------------------------------------------------
+# Loaded models with hot reload (used by the API)
+# -------------------------------------------------------------------
+
+class ModelCache:
+    """
+    Keeps loaded models in memory and follows the live version.
+
+    When CURRENT changes, the watcher thread switches to the new manifest
+    and loads the new files of the symbols currently in memory. Requests
+    keep being served by the previous model while its new file loads.
+    Each symbol is loaded by one thread at a time (per-symbol lock), and a
+    model is only cached if its file is still the live one.
+
+    Args:
+        loader: function(path) -> model (keeps TensorFlow out of this module)
+    """
+
+    def __init__(self, loader, max_size=MODEL_CACHE_SIZE):
+        self.loader = loader
+        self.max_size = max_size
+        self.reloads = 0
+        self._manifest = None
+        self._mtime = None
+        self._models = OrderedDict()  # symbol -> (path, model)
+        self._load_locks = {}         # symbol -> Lock held while its file loads
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def version(self):
+        return self._manifest["version"] if self._manifest else None
+
+    def _live_manifest(self):
+        if self._manifest is None:
+            self._manifest = read_manifest()
+        return self._manifest
+
+    def get(self, symbol):
+        """Loaded model of a symbol in the live version, or None if it has none."""
+        path = model_path(symbol, self._live_manifest())
+        if path is None or not path.exists():
+            return None
+
+        with self._lock:
+            entry = self._models.get(symbol)
+            if entry is not None and entry[0] == path:
+                self._models.move_to_end(symbol)
+                return entry[1]
+            load_lock = self._load_locks.setdefault(symbol, threading.Lock())
+
+        if entry is None:
+            load_lock.acquire()
+        elif not load_lock.acquire(blocking=False):
+            # The new file is being loaded; keep serving the previous model
+            return entry[1]
+        try:
+            return self._load(symbol, path)
+        finally:
+            load_lock.release()
+
+    def _load(self, symbol, path):
+        """Load and cache one model file. The caller holds the symbol's load lock."""
+        with self._lock:
+            entry = self._models.get(symbol)
+            if entry is not None and entry[0] == path:
+                return entry[1]  # loaded by the thread that held the lock before us
+
+        model = self.loader(path)
+        with self._lock:
+            # A version published during the load must not be overwritten by an older file
+            if model_path(symbol, self._manifest) == path:
+                self._models[symbol] = (path, model)
+                self._models.move_to_end(symbol)
+                while len(self._models) > self.max_size:
+                    self._models.popitem(last=False)
+        return model
+
+    def check_for_new_version(self):
+        """Reload the cached symbols whose model changed in the live version."""
+        try:
+            mtime = CURRENT_FILE.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+
+        manifest = read_manifest()
+        if self._manifest is not None and manifest["version"] == self._manifest["version"]:
+            return
+
+        with self._lock:
+            # Switch first: from now on requests resolve paths in the new version
+            self._manifest = manifest
+            loaded = {symbol: path for symbol, (path, _) in self._models.items()}
+        for symbol, old_path in loaded.items():
+            new_path = model_path(symbol, manifest)
+            if new_path == old_path:
+                continue
+            if new_path is None:
+                with self._lock:
+                    self._models.pop(symbol, None)
+                continue
+            with self._lock:
+                load_lock = self._load_locks.setdefault(symbol, threading.Lock())
+            with load_lock:
+                try:
+                    self._load(symbol, new_path)
+                    self.reloads += 1
+                except Exception as e:
+                    # Keep serving the previous model for this symbol
+                    print(f"Reloading model {symbol} failed: {e}")
+
+        print(f"Serving model version {manifest['version']}")
+
+    def _watch(self, stop_event, interval):
+        while not stop_event.wait(interval):
+            try:
+                self.check_for_new_version()
+            except Exception as e:
+                print(f"Model watcher error: {e}")
+
+    def start_watching(self, interval=MODEL_WATCH_INTERVAL):
+        if self._watcher is not None:
+            return
+        try:
+            self._mtime = CURRENT_FILE.stat().st_mtime
+        except FileNotFoundError:
+            self._mtime = None
+        stop_event = threading.Event()
+        thread = threading.Thread(target=self._watch, args=(stop_event, interval), daemon=True)
+        thread.start()
+        self._watcher = (thread, stop_event)
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher[1].set()
+            self._watcher = None
+
+    @property
+    def loaded_count(self):
+        return len(self._models)
+
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned LSTM models")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List versions (* = live)")
+    rollback_parser = sub.add_parser("rollback", help="Make an older version live")
+    rollback_parser.add_argument("version")
+    prune_parser = sub.add_parser("prune", help="Delete old versions")
+    prune_parser.add_argument("--keep", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        live = current_version()
+        for version in list_versions():
+            manifest = read_manifest(version)
+            marker = "*" if version == live else " "
+            print(f"{marker} {version}  {len(manifest['symbols'])} models, "
+                  f"{len(manifest.get('trained', []))} retrained")
+    elif args.command == "rollback":
+        set_current(args.version)
+        print(f"Live model version is now {args.version}")
+    elif args.command == "prune":
+        if args.keep < 1:
+            parser.error("--keep must be at least 1")
+        removed = prune(args.keep)
+        print(f"Removed {len(removed)} version(s): {', '.join(removed) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
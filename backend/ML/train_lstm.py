@@ -1,5 +1,6 @@
 import sys  # Provides access to system-specific parameters and functions
 import os   # Provides functions to interact with the operating system
+import time # Epoch timing
 
 # Make backend folder discoverable so Python can import modules from parent directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
@@ -13,38 +14,180 @@ import numpy as np
 
 # Import functions from your own modules
 from ML.lstm_model import create_lstm                 # Function to create LSTM model
-from utils.preprocessing import scale_data, create_sequences  # Functions to preprocess data
-
-
-# Database connection configuration
-DB_CONFIG = {
-    "dbname": "stock_data",  
-    "user": "postgres",      
-    "password": "root",      
-    "host": "localhost",     
-    "port": "5433",          
-}
-
-# Set up directory to save trained models
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))  # Current script directory
-MODEL_DIR = os.path.join(SCRIPT_DIR, "models")           # "models" folder inside current directory
-os.makedirs(MODEL_DIR, exist_ok=True)                   # Create folder if it doesn't exist
+from utils.preprocessing import scale_data            # Function to preprocess data
+from ML.model_registry import VersionWriter          # Publishes models as a new version
+
+
+# Database connection configuration (shared with the API)
+from core.database import DB_CONFIG
+
+# Trained models are saved as versions in ML/models (see model_registry.py)
+
+# Training settings (environment variables override the defaults)
+WINDOW_SIZE = 60                                                       # Days of history per input sequence
+MAX_EPOCHS = int(os.getenv("TRAIN_MAX_EPOCHS", "50"))                  # Upper bound; early stopping usually ends sooner
+PATIENCE = int(os.getenv("TRAIN_PATIENCE", "5"))                       # Epochs without val_loss improvement before stopping
+VALIDATION_SPLIT = float(os.getenv("TRAIN_VALIDATION_SPLIT", "0.1"))   # Most recent share of sequences held out
+BATCH_SIZE = int(os.getenv("TRAIN_BATCH_SIZE", "0"))                   # 0 = pick from the number of sequences
+MIN_BATCH_SIZE = int(os.getenv("TRAIN_MIN_BATCH_SIZE", "64"))
+MAX_BATCH_SIZE = int(os.getenv("TRAIN_MAX_BATCH_SIZE", "512"))
+TARGET_STEPS_PER_EPOCH = 50                                            # Adaptive batch size aims for about this many steps
+
+# Training runs alone, so it may use every core (0 = let TensorFlow decide)
+TRAIN_INTRA_OP_THREADS = int(os.getenv("TRAIN_INTRA_OP_THREADS", "0"))
+TRAIN_INTER_OP_THREADS = int(os.getenv("TRAIN_INTER_OP_THREADS", "2"))
+
+_threads_configured = False
+
+
+def configure_threads():
+    """
+    Apply the training thread counts. TensorFlow only accepts them before
+    it runs its first op, so this is called before any model is built.
+    """
+    global _threads_configured
+    if _threads_configured:
+        return
+    import tensorflow as tf
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(TRAIN_INTRA_OP_THREADS)
+        tf.config.threading.set_inter_op_parallelism_threads(TRAIN_INTER_OP_THREADS)
+    except RuntimeError as e:
+        # TensorFlow was already initialized elsewhere in this process
+        print(f"Could not set TensorFlow thread counts: {e}")
+    _threads_configured = True
+
+
+def pick_batch_size(samples):
+    """Power of two giving about TARGET_STEPS_PER_EPOCH steps, within the min/max."""
+    if BATCH_SIZE > 0:
+        return BATCH_SIZE
+    size = 1 << max(int(np.ceil(np.log2(max(samples / TARGET_STEPS_PER_EPOCH, 1)))), 0)
+    return int(min(max(size, MIN_BATCH_SIZE), MAX_BATCH_SIZE))
+
+
+def make_dataset(series, first, last, batch_size, shuffle=False):
+    """
+    tf.data pipeline over sequences first..last-1 of a scaled series.
+
+    Only the series itself is held in memory; each batch of windows is
+    gathered from it on the fly (the same X[i] = data[i:i+60], y = data[i+60]
+    as create_sequences) and prefetched while the previous batch trains.
+    """
+    import tensorflow as tf
+
+    offsets = tf.range(WINDOW_SIZE, dtype=tf.int64)
+
+    def gather(starts):
+        windows = tf.gather(series, starts[:, None] + offsets)       # (batch, 60)
+        return windows[..., None], tf.gather(series, starts + WINDOW_SIZE)
+
+    ds = tf.data.Dataset.range(first, last)
+    if shuffle:
+        ds = ds.shuffle(last - first, reshuffle_each_iteration=True)
+    return (
+        ds.batch(batch_size)
+        .map(gather, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
+def epoch_logger(symbol, samples):
+    """Keras callback printing duration and throughput of every epoch."""
+    import tensorflow as tf
+
+    class EpochLogger(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.started = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            logs = logs or {}
+            elapsed = time.perf_counter() - self.started
+            val_loss = logs.get("val_loss")
+            print(
+                f"{symbol} epoch {epoch + 1}: {elapsed:.2f}s, "
+                f"{samples / elapsed:.0f} samples/s, loss={logs.get('loss', float('nan')):.6f}"
+                + (f", val_loss={val_loss:.6f}" if val_loss is not None else "")
+            )
+
+    return EpochLogger()
+
+
+def best_weights_keeper():
+    """
+    Keras callback that puts back the weights of the epoch with the lowest
+    val_loss when training ends. EarlyStopping(restore_best_weights=True)
+    only restores when it stops early, so a run that reaches MAX_EPOCHS
+    would keep its last weights (TensorFlow is not pinned in requirements.txt).
+    """
+    import tensorflow as tf
+
+    class BestWeights(tf.keras.callbacks.Callback):
+        def on_train_begin(self, logs=None):
+            self.best = float("inf")
+            self.weights = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            val_loss = (logs or {}).get("val_loss")
+            if val_loss is not None and val_loss < self.best:
+                self.best = val_loss
+                self.weights = self.model.get_weights()
+
+        def on_train_end(self, logs=None):
+            if self.weights is not None:
+                self.model.set_weights(self.weights)
+
+    return BestWeights()
 
 
 # Function to train LSTM model for a single stock symbol
-def train_for_symbol(symbol, df):
+def train_for_symbol(symbol, df, writer):
+    configure_threads()                          # Must happen before TensorFlow runs anything
+    import tensorflow as tf
+
     df = df.sort_values("date")                  # Ensure data is sorted by date
     data = df["close"].values.reshape(-1, 1)     # Extract closing prices as a column vector
     scaled, scaler = scale_data(data)            # Scale data (normalize to 0-1 range)
-
-    X, y = create_sequences(scaled)              # Create sequences for time-series learning
-    X = np.array(X).reshape(X.shape[0], X.shape[1], 1)  # Reshape for LSTM input (samples, time steps, features)
-
-    model = create_lstm((X.shape[1], 1))         # Create LSTM model with input shape
-    model.fit(X, y, epochs=10, batch_size=32, verbose=1)  # Train the model
-
-    model.save(f"{MODEL_DIR}/{symbol}_model.h5") # Save trained model to file
-    print(f"✔ Model saved for {symbol}")         # Print success message
+    series = tf.constant(scaled[:, 0], dtype=tf.float32)
+
+    # Chronological split: the most recent sequences validate, so the
+    # model is never scored on days it has already seen
+    samples = len(scaled) - WINDOW_SIZE
+    n_val = int(samples * VALIDATION_SPLIT)
+    n_train = samples - n_val
+    batch_size = pick_batch_size(n_train)
+
+    train_ds = make_dataset(series, 0, n_train, batch_size, shuffle=True)
+    val_ds = make_dataset(series, n_train, samples, batch_size) if n_val else None
+
+    callbacks = [epoch_logger(symbol, n_train)]
+    if val_ds is not None:
+        # EarlyStopping only stops; best_weights_keeper restores the best epoch
+        callbacks.append(tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=PATIENCE))
+        callbacks.append(best_weights_keeper())
+
+    model = create_lstm((WINDOW_SIZE, 1))        # Create LSTM model with input shape
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=MAX_EPOCHS,
+        callbacks=callbacks,
+        verbose=0,                               # EpochLogger prints one line per epoch instead
+    )
+
+    epochs = len(history.history["loss"])
+    val_losses = history.history.get("val_loss")
+    best_val_loss = float(min(val_losses)) if val_losses else None
+
+    writer.save(                                 # Save into the new version
+        symbol, model,
+        rows=len(df),
+        last_date=df["date"].iloc[-1],
+        epochs=epochs,
+        batch_size=batch_size,
+        val_loss=round(best_val_loss, 6) if best_val_loss is not None else None,
+    )
+    print(f"✔ Model saved for {symbol} ({epochs} epochs, batch size {batch_size})")
 
 
 # Main function to train models for all symbols in database
@@ -55,23 +198,35 @@ def main():
     cur.execute("SELECT DISTINCT symbol FROM stocks")  # Get all unique stock symbols
     symbols = [row[0] for row in cur.fetchall()]      # Fetch symbols as a list
 
-    for symbol in symbols:                     
-        print(f"Training model for: {symbol}")   # Print which symbol is being trained
-
-        # Read historical closing price data for the current symbol
-        df = pd.read_sql(
-            "SELECT date, close FROM stocks WHERE symbol=%s ORDER BY date ASC",
-            conn,
-            params=(symbol,),                    # Parameterized query to avoid SQL injection
-        )
-
-        if len(df) < 100:                        # Skip symbols with too little data
-            print(f"Skipping {symbol} (not enough data)")
-            continue
-
-        train_for_symbol(symbol, df)             # Train model for this symbol
-
-    conn.close()  
+    writer = VersionWriter()  # The API keeps serving the current models until publish()
+
+    try:
+        for symbol in symbols:
+            print(f"Training model for: {symbol}")   # Print which symbol is being trained
+
+            # Read historical closing price data for the current symbol
+            df = pd.read_sql(
+                "SELECT date, close FROM stocks WHERE symbol=%s ORDER BY date ASC",
+                conn,
+                params=(symbol,),                    # Parameterized query to avoid SQL injection
+            )
+
+            if len(df) < 100:                        # Skip symbols with too little data
+                print(f"Skipping {symbol} (not enough data)")
+                continue
+
+            train_for_symbol(symbol, df, writer)     # Train model for this symbol
+    except BaseException:
+        writer.discard()                             # Don't leave a .staging-* directory behind
+        raise
+    finally:
+        conn.close()
+
+    # Make the new models live in one atomic switch
+    if writer.entries:
+        writer.publish()
+    else:
+        writer.discard()
 
 
 # Run main() if this script is executed directly
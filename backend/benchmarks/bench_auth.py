@@ -0,0 +1,119 @@
+"""
+bench_auth.py
+
+Benchmark for the password hashing pool.
+
+It runs against a live API server and measures:
+- login throughput (logins/sec) under a burst of concurrent logins
+- p50 / p99 latency of a cheap data endpoint, alone and while the
+  login burst is running, to show how much logins slow down other traffic
+
+Example:
+python benchmarks/bench_auth.py --url http://localhost:8000 --logins 200 --concurrency 16
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+# Account used for the login burst (created once if missing)
+BENCH_USER = {
+    "full_name": "Benchmark User",
+    "email": "bench-auth@example.com",
+    "password": "bench-password-123",
+}
+
+
+def ensure_user(base_url):
+    """Create the benchmark account (a 400 means it already exists)."""
+    res = requests.post(f"{base_url}/auth/signup", json=BENCH_USER, timeout=30)
+    if res.status_code not in (200, 400):
+        res.raise_for_status()
+
+
+def login_once(base_url):
+    """Send one login request and return its HTTP status code."""
+    res = requests.post(
+        f"{base_url}/auth/login",
+        json={"email": BENCH_USER["email"], "password": BENCH_USER["password"]},
+        timeout=60,
+    )
+    return res.status_code
+
+
+def probe_latencies(base_url, path, stop_event, results):
+    """Call a data endpoint in a loop and record latencies in milliseconds."""
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        requests.get(f"{base_url}{path}", timeout=60)
+        results.append((time.perf_counter() - start) * 1000)
+
+
+def percentiles(values):
+    """Return p50 and p99 of a list of latencies."""
+    if not values:
+        return float("nan"), float("nan")
+    return float(np.percentile(values, 50)), float(np.percentile(values, 99))
+
+
+def measure_baseline(base_url, path, seconds):
+    """Data endpoint latency with no login traffic."""
+    stop = threading.Event()
+    results = []
+    thread = threading.Thread(target=probe_latencies, args=(base_url, path, stop, results))
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return results
+
+
+def measure_under_load(base_url, path, logins, concurrency):
+    """Run a login burst while probing the data endpoint."""
+    stop = threading.Event()
+    results = []
+    probe = threading.Thread(target=probe_latencies, args=(base_url, path, stop, results))
+    probe.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(lambda _: login_once(base_url), range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    probe.join()
+    return statuses, elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput and data endpoint p99 benchmark")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the running API")
+    parser.add_argument("--logins", type=int, default=200, help="Number of logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--probe-path", default="/api/all-stocks", help="Data endpoint to probe")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0, help="Duration of the idle baseline")
+    args = parser.parse_args()
+
+    ensure_user(args.url)
+
+    baseline = measure_baseline(args.url, args.probe_path, args.baseline_seconds)
+    statuses, elapsed, loaded = measure_under_load(
+        args.url, args.probe_path, args.logins, args.concurrency
+    )
+
+    ok = sum(1 for s in statuses if s == 200)
+    rejected = sum(1 for s in statuses if s == 503)
+    base_p50, base_p99 = percentiles(baseline)
+    load_p50, load_p99 = percentiles(loaded)
+
+    print(f"Logins: {ok} ok, {rejected} rejected (503), {len(statuses) - ok - rejected} other")
+    print(f"Login throughput: {ok / elapsed:.1f} logins/sec over {elapsed:.2f}s")
+    print(f"{args.probe_path} idle:       p50={base_p50:.1f}ms p99={base_p99:.1f}ms ({len(baseline)} requests)")
+    print(f"{args.probe_path} under load: p50={load_p50:.1f}ms p99={load_p99:.1f}ms ({len(loaded)} requests)")
+
+
+if __name__ == "__main__":
+    main()
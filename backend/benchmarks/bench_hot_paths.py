@@ -0,0 +1,212 @@
+"""
+bench_hot_paths.py
+
+Micro-benchmarks for the analysis and ML hot paths.
+
+Commands:
+    python benchmarks/bench_hot_paths.py run --symbols 20 --years 10 --save before
+    python benchmarks/bench_hot_paths.py run --save after
+    python benchmarks/bench_hot_paths.py compare before after --threshold 0.10
+
+`run` stores results as JSON in benchmarks/baselines/<name>.json.
+`compare` prints the change for every case and exits with status 1 if any
+case got slower than the threshold (10% by default).
+"""
+import sys
+import os
+import argparse
+import json
+import platform
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.append(str(BACKEND_DIR))
+
+from benchmarks.synthetic import generate_ohlc
+
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+TIMEFRAMES = ["1D", "1W", "1M", "6M", "1Y", "3Y", "5Y", "ALL"]
+
+
+# -------------------------------------------------------------------
+# Timing helpers
+# -------------------------------------------------------------------
+
+def measure(fn, repeat=5, min_time=0.2):
+    """
+    Time `fn` and return stats in milliseconds.
+
+    The call is repeated in batches until a batch takes at least `min_time`
+    seconds, then `repeat` batches are timed; the median is the headline number.
+    """
+    fn()  # warm-up
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time or number >= 1 << 16:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1000)
+
+    return {
+        "median_ms": float(np.median(samples)),
+        "min_ms": float(np.min(samples)),
+        "max_ms": float(np.max(samples)),
+        "loops": number,
+    }
+
+
+# -------------------------------------------------------------------
+# Benchmark cases
+# -------------------------------------------------------------------
+
+def analysis_cases(series_df):
+    """Cases for routers/analysis.py and routers/technical_status.py."""
+    from routers.analysis import resample_data, calculate_rsi, calculate_bollinger
+    from routers.technical_status import compute_trends
+
+    cases = {}
+    for tf in TIMEFRAMES:
+        # resample_data modifies its input, so every call gets a fresh copy
+        cases[f"analysis.resample_data[{tf}]"] = lambda tf=tf: resample_data(series_df.copy(), tf)
+
+    close = series_df["close"]
+    cases["analysis.calculate_rsi"] = lambda: calculate_rsi(close)
+    cases["analysis.calculate_bollinger"] = lambda: calculate_bollinger(close)
+    cases["technical_status.compute_trends"] = lambda: compute_trends(series_df.copy())
+    return cases
+
+
+def ml_cases(series_df, include_model):
+    """Cases for utils/preprocessing.py and routers/predictions.py."""
+    from utils.preprocessing import scale_data, create_sequences
+
+    scaled, _ = scale_data(series_df["close"].values.reshape(-1, 1))
+    cases = {"preprocessing.create_sequences": lambda: create_sequences(scaled)}
+
+    if not include_model:
+        return cases
+
+    import tensorflow as tf
+    from ML.lstm_model import create_lstm
+    from routers.predictions import iterative_prediction
+
+    # A freshly built model has the same shape as the trained ones,
+    # so the benchmark does not depend on which models are checked in
+    model = create_lstm((60, 1))
+    model_path = Path(tempfile.mkdtemp()) / "bench_model.h5"
+    model.save(model_path)
+
+    last_window = scaled[-60:].reshape(-1, 1)
+    cases["predictions.iterative_prediction[7]"] = lambda: iterative_prediction(model, last_window, 7)
+    cases["predictions.load_model"] = lambda: tf.keras.models.load_model(model_path, compile=False)
+    return cases
+
+
+def run(args):
+    data = generate_ohlc(n_symbols=args.symbols, years=args.years, seed=args.seed)
+    # Per-symbol paths run on one symbol's full history
+    series_df = data[data["symbol"] == data["symbol"].iloc[0]].reset_index(drop=True)
+
+    cases = {}
+    cases.update(analysis_cases(series_df))
+    cases.update(ml_cases(series_df, include_model=not args.skip_model))
+
+    results = {}
+    for name, fn in cases.items():
+        if args.filter and args.filter not in name:
+            continue
+        stats = measure(fn, repeat=args.repeat)
+        results[name] = stats
+        print(f"{name:45s} {stats['median_ms']:10.3f} ms  (min {stats['min_ms']:.3f}, x{stats['loops']})")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": {"symbols": args.symbols, "years": args.years, "seed": args.seed},
+        "rows_per_symbol": len(series_df),
+        "results": results,
+    }
+    if args.save:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINE_DIR / f"{args.save}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Saved results to {path}")
+
+
+def load_report(name):
+    """Loads a report by name (benchmarks/baselines/<name>.json) or path."""
+    path = Path(name)
+    if not path.exists():
+        path = BASELINE_DIR / f"{name}.json"
+    return json.loads(path.read_text())
+
+
+def compare(args):
+    base = load_report(args.baseline)["results"]
+    current = load_report(args.current)["results"]
+
+    regressions = 0
+    for name in sorted(set(base) | set(current)):
+        if name not in base or name not in current:
+            print(f"{name:45s} only in {'current' if name in current else 'baseline'}")
+            continue
+        before = base[name]["median_ms"]
+        after = current[name]["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:45s} {before:10.3f} -> {after:10.3f} ms  {change:+7.1%}{flag}")
+
+    if regressions:
+        print(f"{regressions} regressions above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot path micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--symbols", type=int, default=10, help="Synthetic symbols")
+    run_parser.add_argument("--years", type=int, default=10, help="Years of history per symbol")
+    run_parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed batches per case")
+    run_parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    run_parser.add_argument("--skip-model", action="store_true", help="Skip TensorFlow cases")
+    run_parser.add_argument("--save", help="Save results as benchmarks/baselines/<name>.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="Compare two saved runs")
+    compare_parser.add_argument("baseline", help="Baseline name or path")
+    compare_parser.add_argument("current", help="Current name or path")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
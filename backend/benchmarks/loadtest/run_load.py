@@ -0,0 +1,168 @@
+"""
+run_load.py
+
+Scripted traffic mix against a running API, at increasing concurrency.
+
+For every concurrency level the mix runs for a fixed time and the script
+reports throughput and p50/p95/p99 latency per endpoint. The level where
+total throughput stops growing is where the server saturates.
+
+    # terminal 1 (backend folder)
+    DB_NAME=stock_data_loadtest uvicorn benchmarks.loadtest.stub_app:app --port 8000
+    # terminal 2
+    python benchmarks/loadtest/run_load.py --levels 1,4,16,64 --duration 30 --report load.json
+"""
+import sys
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import requests
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(BACKEND_DIR))
+
+from benchmarks.loadtest.seed import USER_COUNT, USER_PASSWORD, user_email
+
+TIMEFRAMES = ["1M", "6M", "1Y", "5Y", "ALL"]
+
+
+def traffic_mix(symbols, model_symbols):
+    """
+    (name, weight, request builder) for each endpoint.
+    A builder returns (method, path, params, json body).
+    """
+    return [
+        ("GET /api/stocks", 40, lambda: (
+            "GET", "/api/stocks",
+            {"symbol": random.choice(symbols), "timeframe": random.choice(TIMEFRAMES)}, None)),
+        ("GET /api/search-suggestions", 25, lambda: (
+            "GET", "/api/search-suggestions",
+            {"q": random.choice(symbols)[:random.randint(2, 5)]}, None)),
+        ("GET /api/market-movers", 15, lambda: (
+            "GET", "/api/market-movers", None, None)),
+        ("GET /api/predict", 10, lambda: (
+            "GET", "/api/predict", {"symbol": random.choice(model_symbols)}, None)),
+        ("POST /auth/login", 10, lambda: (
+            "POST", "/auth/login", None,
+            {"email": user_email(random.randrange(USER_COUNT)), "password": USER_PASSWORD})),
+    ]
+
+
+def worker(base_url, mix, deadline, results, lock):
+    """One simulated client: sends requests back to back until the deadline."""
+    names = [m[0] for m in mix]
+    weights = [m[1] for m in mix]
+    builders = {m[0]: m[2] for m in mix}
+    session = requests.Session()
+    local = defaultdict(list)
+
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        method, path, params, body = builders[name]()
+        start = time.perf_counter()
+        try:
+            res = session.request(method, f"{base_url}{path}", params=params, json=body, timeout=120)
+            ok = res.status_code < 400
+        except requests.RequestException:
+            ok = False
+        local[name].append(((time.perf_counter() - start) * 1000, ok))
+
+    with lock:
+        for name, samples in local.items():
+            results[name].extend(samples)
+
+
+def run_level(base_url, mix, concurrency, duration):
+    """Runs the mix with `concurrency` clients and returns per-endpoint stats."""
+    results = defaultdict(list)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, mix, deadline, results, lock))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    stats = {}
+    for name, samples in sorted(results.items()):
+        latencies = np.array([s[0] for s in samples])
+        stats[name] = {
+            "requests": len(samples),
+            "errors": sum(1 for s in samples if not s[1]),
+            "throughput_rps": len(samples) / elapsed,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+    total = sum(s["requests"] for s in stats.values())
+    return {"concurrency": concurrency, "total_rps": total / elapsed, "endpoints": stats}
+
+
+def print_level(level):
+    print(f"\n=== concurrency {level['concurrency']}: {level['total_rps']:.1f} req/s total ===")
+    print(f"{'endpoint':30s} {'req/s':>8s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'errors':>7s}")
+    for name, s in level["endpoints"].items():
+        print(f"{name:30s} {s['throughput_rps']:8.1f} {s['p50_ms']:8.1f}ms "
+              f"{s['p95_ms']:8.1f}ms {s['p99_ms']:8.1f}ms {s['errors']:7d}")
+
+
+def saturation_points(levels, min_gain=0.10):
+    """
+    For each endpoint, the first concurrency level after which its
+    throughput grew by less than `min_gain` (None if it kept scaling).
+    """
+    points = {}
+    names = {name for level in levels for name in level["endpoints"]}
+    for name in sorted(names):
+        points[name] = None
+        for prev, cur in zip(levels, levels[1:]):
+            before = prev["endpoints"].get(name, {}).get("throughput_rps", 0)
+            after = cur["endpoints"].get(name, {}).get("throughput_rps", 0)
+            if before and after < before * (1 + min_gain):
+                points[name] = prev["concurrency"]
+                break
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with a mixed workload")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the running API")
+    parser.add_argument("--levels", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per level")
+    parser.add_argument("--symbols", type=int, default=200, help="Symbols seeded (SYM000...)")
+    parser.add_argument("--models", type=int, default=3, help="Symbols with trained models")
+    parser.add_argument("--report", help="Write the full results as JSON to this file")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    mix = traffic_mix(symbols, symbols[:args.models])
+
+    levels = []
+    for concurrency in [int(c) for c in args.levels.split(",")]:
+        level = run_level(args.url, mix, concurrency, args.duration)
+        print_level(level)
+        levels.append(level)
+
+    print("\nSaturation (throughput stops growing after this concurrency):")
+    for name, point in saturation_points(levels).items():
+        print(f"  {name:30s} {point if point is not None else 'not reached'}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps({"levels": levels}, indent=2))
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+seed.py
+
+Seeds a local Postgres database for load testing.
+
+- stocks: synthetic OHLC history (see benchmarks/synthetic.py)
+- stock_info: one row per synthetic symbol, spread over a few sectors
+- users: load-test accounts with Argon2 hashes
+- models: small LSTM models for the first few symbols, published into
+  benchmarks/loadtest/models (MODEL_DIR) instead of the real ML/models
+
+Point the API and this script at a separate database with DB_NAME, e.g.
+    createdb -p 5433 stock_data_loadtest
+    DB_NAME=stock_data_loadtest python benchmarks/loadtest/seed.py --symbols 200 --years 10
+stub_app.py serves the load-test models by default.
+"""
+import sys
+import os
+import argparse
+import io
+from pathlib import Path
+
+import psycopg2
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(BACKEND_DIR))
+
+from core.database import DB_CONFIG, Base, engine
+from models import User
+from core.security import hash_password
+from db.migrate import run_migrations
+from db.rollups import refresh_rollups
+from db.sector_indices import rebuild_sector_indices
+from benchmarks.synthetic import generate_ohlc
+
+# Model registry of the load test, kept apart from the trained ML/models
+LOADTEST_MODEL_DIR = Path(__file__).resolve().parent / "models"
+
+SECTORS = ["Commercial Banks", "Hydro Power", "Insurance", "Microfinance", "Hotels"]
+
+# Accounts used by the login traffic in run_load.py
+USER_COUNT = 20
+USER_PASSWORD = "loadtest-password"
+
+
+def user_email(i):
+    return f"loadtest{i}@example.com"
+
+
+def seed_stocks(conn, df):
+    """
+    Replace all stocks rows with the synthetic history (COPY), and rebuild
+    the rollups and sector indices in the same transaction.
+    stock_info must be seeded first, since sectors come from it.
+    """
+    buffer = io.StringIO()
+    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    df[["date", "symbol", "open", "high", "low", "close", "close_norm"]].to_csv(
+        buffer, index=False, header=False
+    )
+    buffer.seek(0)
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE stocks")
+        cur.copy_expert(
+            "COPY stocks (date, symbol, open, high, low, close, close_norm) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        refresh_rollups(cur)
+        rebuild_sector_indices(cur)
+        cur.execute("ANALYZE stocks")
+        cur.execute("ANALYZE stock_rollups")
+        cur.execute("ANALYZE sector_index")
+    conn.commit()
+
+
+def seed_stock_info(conn, symbols):
+    """Replace stock_info with one row per symbol."""
+    rows = [
+        (symbol, f"Synthetic Company {symbol}", SECTORS[i % len(SECTORS)])
+        for i, symbol in enumerate(symbols)
+    ]
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE stock_info")
+        cur.executemany(
+            "INSERT INTO stock_info (symbol, company_name, category) VALUES (%s, %s, %s)",
+            rows,
+        )
+    conn.commit()
+
+
+def seed_users(conn):
+    """Create the load-test accounts (existing ones are kept)."""
+    # All accounts share one password, so it is hashed only once
+    hashed = hash_password(USER_PASSWORD)
+    with conn.cursor() as cur:
+        for i in range(USER_COUNT):
+            cur.execute(
+                """
+                INSERT INTO users (full_name, email, password)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (email) DO UPDATE SET password = EXCLUDED.password
+                """,
+                (f"Load Test {i}", user_email(i), hashed),
+            )
+    conn.commit()
+
+
+def train_models(df, symbols):
+    """Train a model for each of the given symbols (published as one version in MODEL_DIR)."""
+    # The registry reads MODEL_DIR on import
+    os.environ.setdefault("MODEL_DIR", str(LOADTEST_MODEL_DIR))
+    from ML.model_registry import VersionWriter
+    from ML.train_lstm import train_for_symbol
+
+    writer = VersionWriter()
+    try:
+        for symbol in symbols:
+            print(f"Training model for: {symbol}")
+            train_for_symbol(symbol, df[df["symbol"] == symbol], writer)
+    except Exception:
+        writer.discard()
+        raise
+    writer.publish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a load-test database")
+    parser.add_argument("--symbols", type=int, default=200, help="Number of synthetic symbols")
+    parser.add_argument("--years", type=int, default=10, help="Years of history per symbol")
+    parser.add_argument("--models", type=int, default=3, help="Symbols to train models for")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    print(f"Seeding database {DB_CONFIG['dbname']} on {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+    df = generate_ohlc(n_symbols=args.symbols, years=args.years, seed=args.seed)
+    symbols = sorted(df["symbol"].unique())
+
+    # Models are trained before the dates are converted to text for COPY
+    if args.models:
+        train_models(df, symbols[:args.models])
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        run_migrations(conn)
+        Base.metadata.create_all(engine, tables=[User.__table__])
+        seed_stock_info(conn, symbols)
+        seed_stocks(conn, df)
+        seed_users(conn)
+    finally:
+        conn.close()
+
+    print(f"Seeded {len(df)} price rows, {len(symbols)} symbols, {USER_COUNT} users.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+stub_app.py
+
+The API app with the ShareHub news upstream replaced by a local stub,
+so load tests never call the real site. Models are served from the
+load-test registry written by seed.py unless MODEL_DIR is set.
+
+    DB_NAME=stock_data_loadtest uvicorn benchmarks.loadtest.stub_app:app --port 8000
+(run from the backend folder)
+"""
+import os
+from datetime import datetime
+
+from benchmarks.loadtest.seed import LOADTEST_MODEL_DIR
+from utils import news_service
+
+# Set before the model registry is imported by the app
+os.environ.setdefault("MODEL_DIR", str(LOADTEST_MODEL_DIR))
+
+# Fake upstream: 500 posts with descending ids, served 12 per page
+STUB_POST_COUNT = 500
+
+
+def fake_news_page(last_post_id=None):
+    top = STUB_POST_COUNT if last_post_id is None else last_post_id - 1
+    return [
+        {
+            "id": post_id,
+            "title": f"SYM{post_id % 200:03d} announces results #{post_id}",
+            "slug": f"stub-post-{post_id}",
+            "publishedAt": datetime(2025, 1, 1).isoformat(),
+        }
+        for post_id in range(top, max(top - news_service.PAGE_SIZE, 0), -1)
+    ]
+
+
+# Patch before the app (and the news store) is imported
+news_service.fetch_news_page = fake_news_page
+
+from main import app  # noqa: E402,F401
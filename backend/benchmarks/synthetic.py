@@ -0,0 +1,53 @@
+"""
+synthetic.py
+
+Synthetic OHLC data for benchmarks and load tests.
+
+Prices follow a geometric random walk per symbol, on business days,
+with the same columns as the `stocks` table.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def generate_ohlc(n_symbols=10, years=5, seed=42, end_date="2025-12-31"):
+    """
+    Generate daily OHLC bars.
+
+    Args:
+        n_symbols (int): Number of symbols (named SYM000, SYM001, ...)
+        years (int): Years of history per symbol
+        seed (int): Random seed, so runs are comparable
+        end_date (str): Last trading day
+
+    Returns:
+        pd.DataFrame: date, symbol, open, high, low, close, close_norm
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end_date, periods=years * TRADING_DAYS_PER_YEAR)
+    n_days = len(dates)
+
+    # Daily log returns -> close prices, one column per symbol
+    returns = rng.normal(0.0003, 0.02, size=(n_days, n_symbols))
+    start_prices = rng.uniform(100, 2000, size=n_symbols)
+    close = start_prices * np.exp(np.cumsum(returns, axis=0))
+
+    # Open near the previous close, high/low around open and close
+    open_ = np.vstack([start_prices, close[:-1]]) * (1 + rng.normal(0, 0.003, size=close.shape))
+    spread = np.abs(rng.normal(0, 0.01, size=close.shape))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+
+    symbols = np.array([f"SYM{i:03d}" for i in range(n_symbols)])
+    df = pd.DataFrame({
+        "date": np.tile(dates.values, n_symbols),
+        "symbol": np.repeat(symbols, n_days),
+        "open": open_.T.ravel(),
+        "high": high.T.ravel(),
+        "low": low.T.ravel(),
+        "close": close.T.ravel(),
+    })
+    df["close_norm"] = df["close"] / df.groupby("symbol")["close"].transform("first")
+    return df.round(4)
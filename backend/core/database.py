@@ -1,6 +1,8 @@
 #===================================================
 # 1. Package Imports
 #===================================================
+import os
+
 # psycopg2 is used for executing raw SQL queries
 import psycopg2
 
@@ -13,12 +15,14 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 # 2. Database Configuration
 
 
+# Every value can be overridden with an environment variable
+# (e.g. DB_NAME=stock_data_loadtest for the load-test database)
 DB_CONFIG = {
-    "dbname": "stock_data",     # Name of the PostgreSQL database
-    "user": "postgres",         # Database username
-    "password": "root",         # Database password
-    "host": "localhost",        # Database host (local machine)
-    "port": "5433",             # PostgreSQL port number
+    "dbname": os.getenv("DB_NAME", "stock_data"),     # Name of the PostgreSQL database
+    "user": os.getenv("DB_USER", "postgres"),         # Database username
+    "password": os.getenv("DB_PASSWORD", "root"),     # Database password
+    "host": os.getenv("DB_HOST", "localhost"),        # Database host (local machine)
+    "port": os.getenv("DB_PORT", "5433"),             # PostgreSQL port number
 }
 
 
@@ -31,6 +35,12 @@ DB_CONFIG = {
 def get_db_connection():
     return psycopg2.connect(**DB_CONFIG)
 
+
+# Close prices of one symbol, oldest first (served by the covering
+# (symbol, date) index). Used by /api/predict and checked by
+# db/explain_check.py, which must not import TensorFlow.
+PRICE_HISTORY_SQL = "SELECT close FROM stocks WHERE symbol = UPPER(%s) ORDER BY date ASC"
+
 #===================================================
 # 4. SQLAlchemy Setup (ORM)
 #===================================================
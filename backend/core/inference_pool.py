@@ -0,0 +1,150 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.metrics import register_counter, register_gauge
+from core.profiling import profiled_call
+
+
+#===================================================
+# 2. Configuration
+#===================================================
+# /api/predict runs on its own small thread pool instead of FastAPI's
+# shared one, and TensorFlow is limited to a few threads, so a burst of
+# predictions cannot starve the cheap endpoints of threads or cores.
+
+# Threads running predictions at the same time
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+# Predictions waiting or running before new ones are rejected with 503
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "8"))
+# Default time a prediction may take, including time spent queued (seconds)
+INFERENCE_DEADLINE = float(os.getenv("INFERENCE_DEADLINE", "10"))
+
+# TensorFlow threads used inside one op / to run independent ops in parallel
+TF_INTRA_OP_THREADS = int(os.getenv("TF_INTRA_OP_THREADS", "2"))
+TF_INTER_OP_THREADS = int(os.getenv("TF_INTER_OP_THREADS", "1"))
+
+
+_tf_configured = False
+_tf_lock = threading.Lock()
+
+
+def configure_tensorflow():
+    """
+    Apply the TensorFlow thread limits. Must run before TensorFlow executes
+    its first op, so call it right before loading a model.
+    """
+    global _tf_configured
+    with _tf_lock:
+        if _tf_configured:
+            return
+        import tensorflow as tf
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+            tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+        except RuntimeError as e:
+            # TensorFlow was already initialized elsewhere in this process
+            print(f"Could not set TensorFlow thread counts: {e}")
+        _tf_configured = True
+
+
+#===================================================
+# 3. Bounded Inference Pool
+#===================================================
+
+class InferencePoolBusy(Exception):
+    """Raised when too many predictions are already queued or running."""
+
+
+class InferenceDeadlineExceeded(Exception):
+    """Raised when a prediction did not finish before its deadline."""
+
+
+class InferencePool:
+    """
+    Runs predictions on a dedicated, size-limited thread pool.
+
+    - At most `max_pending` jobs may be queued or running; extra requests
+      fail fast with InferencePoolBusy instead of piling up
+    - A job whose deadline passed while it was queued is skipped
+    - A caller stops waiting at its deadline; a job that already started
+      still finishes and keeps its slot until then, so the pending count
+      always reflects the real load
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rejected = 0
+        self.deadline_exceeded = 0
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created lazily so importing this module stays cheap
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, timeout=INFERENCE_DEADLINE):
+        """Run `fn(*args)` on the pool and await its result, for at most `timeout` seconds."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise InferencePoolBusy()
+            self._pending += 1
+            executor = self._get_executor()
+
+        deadline = time.monotonic() + timeout
+        # Keep the request's context (route label for spans, profiling session)
+        context = contextvars.copy_context()
+        # Register the pool thread with the request's profiling session, if any
+        call = profiled_call(fn)
+
+        def job():
+            if time.monotonic() >= deadline:
+                raise InferenceDeadlineExceeded()
+            return context.run(call, *args)
+
+        future = executor.submit(job)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.TimeoutError, InferenceDeadlineExceeded):
+            future.cancel()  # Only has an effect if the job has not started
+            with self._lock:
+                self.deadline_exceeded += 1
+            raise InferenceDeadlineExceeded()
+
+    @property
+    def pending(self) -> int:
+        """Number of predictions currently queued or running."""
+        return self._pending
+
+    def shutdown(self):
+        """Stop the worker threads, dropping queued jobs."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Shared pool used by the predictions router
+inference_pool = InferencePool(INFERENCE_WORKERS, INFERENCE_MAX_PENDING)
+
+register_gauge("inference_pending", "Predictions queued or running", lambda: inference_pool.pending)
+register_counter("inference_rejected_total", "Predictions rejected because the pool was full",
+                 lambda: inference_pool.rejected)
+register_counter("inference_deadline_exceeded_total", "Predictions that missed their deadline",
+                 lambda: inference_pool.deadline_exceeded)
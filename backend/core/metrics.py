@@ -0,0 +1,155 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import resource
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+#===================================================
+# 2. Histogram
+#===================================================
+# A small Prometheus-compatible histogram. Keeping it in-house avoids a
+# dependency for what is a handful of counters per metric.
+
+# Latency buckets in seconds (1 ms .. 30 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative histogram with one series per label combination."""
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels tuple -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(items):
+            label_text = ",".join(f'{n}="{v}"' for n, v in zip(self.label_names, labels))
+            prefix = f"{label_text}," if label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+
+#===================================================
+# 3. Metrics Used by the API
+#===================================================
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    ("method", "route", "status"),
+)
+
+SPAN_SECONDS = Histogram(
+    "hot_path_span_seconds",
+    "Time spent in each stage of a request (db_connect, query, inference, ...)",
+    ("route", "span"),
+)
+
+# Route of the request being handled, so spans know where they belong
+current_route: ContextVar[str] = ContextVar("current_route", default="background")
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time one stage of a request.
+
+        with span("query"):
+            cur.execute(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - start, current_route.get(), name)
+
+
+#===================================================
+# 4. Gauges and Counters (read when /metrics is scraped)
+#===================================================
+# Other modules register a callback returning {label value: number},
+# e.g. cache sizes or hit counts, instead of pushing updates.
+
+_gauges = {}  # name -> (help text, label name, callback, metric type)
+
+
+def register_gauge(name, help_text, callback, label_name=None):
+    """Register a gauge whose value(s) are computed on every scrape."""
+    _gauges[name] = (help_text, label_name, callback, "gauge")
+
+
+def register_counter(name, help_text, callback, label_name=None):
+    """
+    Register a value that only ever increases (name ending in _total).
+    Exported as a counter, so Prometheus rate() handles process restarts.
+    """
+    _gauges[name] = (help_text, label_name, callback, "counter")
+
+
+def process_memory_bytes():
+    """Resident memory of this process (current RSS on Linux, peak otherwise)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def render_metrics(extra_gauges=None):
+    """
+    Prometheus text exposition of every metric.
+
+    Args:
+        extra_gauges (dict): name -> (help text, value) computed by the caller
+    """
+    lines = []
+    lines += REQUEST_SECONDS.render()
+    lines += SPAN_SECONDS.render()
+
+    gauges = {
+        "process_resident_memory_bytes": ("Resident memory of the API process", process_memory_bytes()),
+    }
+    gauges.update(extra_gauges or {})
+    for name, (help_text, value) in gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+    for name, (help_text, label_name, callback, metric_type) in _gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        values = callback()
+        if isinstance(values, dict):
+            for label, value in values.items():
+                lines.append(f'{name}{{{label_name or "key"}="{label}"}} {value}')
+        else:
+            lines.append(f"{name} {values}")
+
+    return "\n".join(lines) + "\n"
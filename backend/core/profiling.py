@@ -0,0 +1,295 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import asyncio
+import cProfile
+import functools
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.routing import APIRoute
+
+
+#===================================================
+# 2. Configuration
+#===================================================
+# Profiling is only available when PROFILE_TOKEN is set. Without it,
+# install_profiling() does nothing: no middleware, no wrapped endpoints,
+# no debug routes, so there is no overhead at all.
+#
+# A request is profiled when it carries the token, either as a header
+#   X-Profile-Token: <token>
+# or as a query parameter
+#   /api/stocks?symbol=NABIL&timeframe=ALL&__profile=<token>
+#
+# X-Profile-Mode (or __profile_mode) chooses the profiler:
+#   sampling       stack samples -> .collapsed file for flamegraph tools (default)
+#   deterministic  cProfile     -> .prof file for pstats / snakeviz
+#   memory         tracemalloc  -> .txt with the allocations made by the request
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = Path(os.getenv(
+    "PROFILE_DIR",
+    Path(__file__).resolve().parent.parent.parent / "data" / "profiles",
+))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))  # seconds
+
+MODES = {"sampling", "deterministic", "memory"}
+
+
+#===================================================
+# 3. Profiling Sessions
+#===================================================
+
+class ProfileSession:
+    """State for one profiled request."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.thread_ids = set()
+        self.samples = Counter()   # collapsed stack -> count
+        self.profiler = cProfile.Profile() if mode == "deterministic" else None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    # --- sampling -------------------------------------------------
+    def start_sampler(self):
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+
+    def _sample_loop(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[collapse_stack(frame)] += 1
+
+    def stop_sampler(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+
+# Session of the request being handled (None when not profiling)
+active_session: ContextVar = ContextVar("active_session", default=None)
+
+
+def collapse_stack(frame) -> str:
+    """Turns a frame into "outer;...;inner" as used by flamegraph tools."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def profiled_call(call):
+    """
+    Wraps an endpoint so the thread that runs it is profiled when the
+    request has an active session. Sync endpoints stay sync (FastAPI
+    keeps running them on the thread pool), async ones stay async.
+    """
+    def enter(session):
+        session.thread_ids.add(threading.get_ident())
+        if session.profiler is not None:
+            session.profiler.enable()
+
+    def leave(session):
+        if session.profiler is not None:
+            session.profiler.disable()
+        session.thread_ids.discard(threading.get_ident())
+
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            session = active_session.get()
+            if session is None:
+                return await call(*args, **kwargs)
+            enter(session)
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                leave(session)
+        return async_wrapper
+
+    @functools.wraps(call)
+    def sync_wrapper(*args, **kwargs):
+        session = active_session.get()
+        if session is None:
+            return call(*args, **kwargs)
+        enter(session)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            leave(session)
+    return sync_wrapper
+
+
+#===================================================
+# 4. Writing Results
+#===================================================
+
+def profile_basename(request: Request) -> str:
+    """File name prefix such as 20260101-120000-api_stocks-NABIL-ALL."""
+    parts = [time.strftime("%Y%m%d-%H%M%S"), request.url.path.strip("/").replace("/", "_") or "root"]
+    for key in ("symbol", "timeframe"):
+        if key in request.query_params:
+            parts.append(request.query_params[key])
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", "-".join(parts))
+
+
+def save_session(session: ProfileSession, basename: str, memory_before=None) -> Path:
+    """Writes the profile of a finished request and returns the file path."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+
+    if session.mode == "deterministic":
+        path = PROFILE_DIR / f"{basename}.prof"
+        session.profiler.dump_stats(path)
+        return path
+
+    if session.mode == "memory":
+        path = PROFILE_DIR / f"{basename}.memory.txt"
+        diff = tracemalloc.take_snapshot().compare_to(memory_before, "lineno")
+        path.write_text("\n".join(str(stat) for stat in diff[:50]) + "\n")
+        return path
+
+    path = PROFILE_DIR / f"{basename}.collapsed"
+    path.write_text("".join(f"{stack} {count}\n" for stack, count in session.samples.most_common()))
+    return path
+
+
+#===================================================
+# 5. Memory Snapshots
+#===================================================
+# GET /debug/memory compares the current heap with the previous call,
+# which shows what keeps growing (cached models, DataFrames, ...).
+
+debug_router = APIRouter(prefix="/debug", tags=["Debug"])
+_last_snapshot = None
+
+# tracemalloc is process-wide: memory sessions (and /debug/memory) share
+# one tracer, started by the first user and stopped after the last one.
+# Overlapping memory profiles also see each other's allocations.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False   # False if tracemalloc was started outside this module
+
+
+def acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def has_profile_token(request: Request) -> bool:
+    """True if the request carries PROFILE_TOKEN (header or __profile query parameter)."""
+    token = request.headers.get("X-Profile-Token") or request.query_params.get("__profile")
+    # compare_digest avoids leaking the token through timing (bytes: it rejects non-ASCII str)
+    return bool(token) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def check_token(request: Request):
+    if not has_profile_token(request):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+@debug_router.get("/memory")
+def memory_snapshot(request: Request, limit: int = 25):
+    """Top allocation growth since the previous snapshot (starts tracemalloc on first call)."""
+    global _last_snapshot
+    check_token(request)
+
+    if _last_snapshot is None:
+        # Never released: tracing stays on for the following calls
+        acquire_tracing()
+        _last_snapshot = tracemalloc.take_snapshot()
+        return {"message": "tracemalloc started, call again to see growth", "top": []}
+
+    snapshot = tracemalloc.take_snapshot()
+    diff = snapshot.compare_to(_last_snapshot, "lineno")
+    _last_snapshot = snapshot
+
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    dump_path = PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.tracemalloc"
+    snapshot.dump(str(dump_path))
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "snapshot_file": str(dump_path),
+        "top": [str(stat) for stat in diff[:limit]],
+    }
+
+
+#===================================================
+# 6. Installation
+#===================================================
+
+def install_profiling(app):
+    """
+    Enables on-demand profiling on the app if PROFILE_TOKEN is set.
+    Call after all routers are included.
+    """
+    if not PROFILE_TOKEN:
+        return
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = profiled_call(route.dependant.call)
+    app.include_router(debug_router)
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if not has_profile_token(request):
+            return await call_next(request)
+
+        mode = request.headers.get("X-Profile-Mode") or request.query_params.get("__profile_mode") or "sampling"
+        if mode not in MODES:
+            mode = "sampling"
+
+        session = ProfileSession(mode)
+        memory_before = None
+        if mode == "memory":
+            acquire_tracing()
+            memory_before = tracemalloc.take_snapshot()
+        elif mode == "sampling":
+            session.start_sampler()
+
+        active_session.set(session)
+        try:
+            try:
+                response = await call_next(request)
+            finally:
+                session.stop_sampler()
+            path = save_session(session, profile_basename(request), memory_before)
+        finally:
+            if mode == "memory":
+                release_tracing()
+        response.headers["X-Profile-File"] = path.name
+        return response
+
+    print(f"Request profiling enabled, profiles are written to {PROFILE_DIR}")
@@ -0,0 +1,138 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Tool for hashing and verifying passwords securely
+from passlib.context import CryptContext
+# Exception to catch invalid or unknown password hashes
+from passlib.exc import UnknownHashError
+
+
+#===================================================
+# 2. Argon2 Configuration
+#===================================================
+# Argon2 cost parameters can be tuned per deployment.
+# When they change, existing hashes are upgraded on the
+# user's next successful login (see verify_and_update).
+
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))          # Number of iterations
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # Memory in KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))      # Lanes per hash
+
+# Worker processes dedicated to password hashing
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Maximum hashes waiting or running before new requests are rejected
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+
+#===================================================
+# 3. Hash Helpers (run inside the worker processes)
+#===================================================
+
+def hash_password(password: str) -> str:
+    """Turn a plain password into a secure hashed password"""
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Check if a plain password matches the hashed password.
+    If the hash is broken or unknown, return False.
+    """
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except UnknownHashError:
+        return False
+
+
+def verify_and_update(plain_password: str, hashed_password: str):
+    """
+    Check a password and, if the stored hash uses outdated Argon2
+    parameters, return a new hash made with the current ones.
+
+    Returns:
+        (bool, str or None): whether the password matched, and the
+        replacement hash (None if the stored hash is up to date)
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except UnknownHashError:
+        return False, None
+
+
+#===================================================
+# 4. Bounded Hashing Pool
+#===================================================
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordHashPool:
+    """
+    Runs password hashing on a dedicated process pool so that
+    a burst of logins cannot occupy the API's request threads.
+
+    At most `max_pending` jobs may be queued or running; extra
+    requests fail fast with PasswordPoolBusy instead of waiting.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # The pool is created lazily so importing this module stays cheap.
+        # "spawn" keeps the workers free of the parent's TensorFlow threads.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        """Run `fn(*args)` on the pool and await its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordPoolBusy()
+            self._pending += 1
+            executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @property
+    def pending(self) -> int:
+        """Number of hashes currently queued or running."""
+        return self._pending
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Shared pool used by the auth router
+password_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
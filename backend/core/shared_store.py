@@ -0,0 +1,380 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import json
+import os
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from core.metrics import register_gauge
+
+
+#===================================================
+# 2. Configuration
+#===================================================
+# With N uvicorn workers, every worker would otherwise load its own copy of
+# the price history, the model files and the TensorFlow runtime. Instead a
+# supervisor (serve.py) packs everything into shared memory once:
+#
+#   segment "<prefix>_<supervisor pid>_v<version>":
+#       [ dates (int64, days since epoch) | OHLC + close_norm (float64 x 5) | model weights (float32) ]
+#   manifest JSON (atomic rename): version, segment name, per-symbol offsets
+#
+# Workers attach read-only, and serve /api/predict with a NumPy LSTM that
+# reads the weights straight from shared memory (no TensorFlow needed).
+# A refresh writes a new version and swaps the manifest; workers pick it
+# up on their next request, and the old segment is unlinked after a grace period.
+
+MANIFEST_PATH = Path(os.getenv(
+    "SHARED_STORE_MANIFEST",
+    Path(tempfile.gettempdir()) / "stock_shared_store.json",
+))
+SEGMENT_PREFIX = os.getenv("SHARED_STORE_PREFIX", "stockstore")
+
+# How often a worker looks at the manifest for a new version (seconds)
+CHECK_INTERVAL = float(os.getenv("SHARED_STORE_CHECK_INTERVAL", "2"))
+# How long a worker keeps a replaced version mapped before closing it (seconds)
+RETIRE_SECONDS = float(os.getenv("SHARED_STORE_RETIRE_SECONDS", "30"))
+
+PRICE_FIELDS = ["open", "high", "low", "close", "close_norm"]
+
+
+#===================================================
+# 3. NumPy LSTM (inference on shared weights)
+#===================================================
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _lstm_layer(x, kernel, recurrent_kernel, bias, return_sequences):
+    """Keras LSTM forward pass (gate order i, f, c, o; tanh / sigmoid)."""
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+    h = np.zeros((batch, units), dtype=np.float32)
+    c = np.zeros((batch, units), dtype=np.float32)
+    # Input projections of every time step in one matrix product
+    projected = x @ kernel + bias
+    outputs = []
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        i = _sigmoid(z[:, :units])
+        f = _sigmoid(z[:, units:2 * units])
+        g = np.tanh(z[:, 2 * units:3 * units])
+        o = _sigmoid(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * np.tanh(c)
+        if return_sequences:
+            outputs.append(h)
+    return np.stack(outputs, axis=1) if return_sequences else h
+
+
+class NumpyLSTM:
+    """
+    Inference-only copy of ML/lstm_model.create_lstm:
+    LSTM(64, return_sequences) -> LSTM(32) -> Dense(1).
+    Called like a Keras model: model(x, training=False).
+    """
+
+    def __init__(self, weights):
+        (self.k1, self.r1, self.b1,
+         self.k2, self.r2, self.b2,
+         self.dense_kernel, self.dense_bias) = weights
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.float32)
+        h = _lstm_layer(x, self.k1, self.r1, self.b1, return_sequences=True)
+        h = _lstm_layer(h, self.k2, self.r2, self.b2, return_sequences=False)
+        return h @ self.dense_kernel + self.dense_bias
+
+
+#===================================================
+# 4. Building a Version (supervisor side)
+#===================================================
+
+def _untrack(segment):
+    """
+    Stop multiprocessing's resource tracker from unlinking the segment when
+    a process exits. Segment lifetime is managed by SharedStorePublisher.
+    """
+    if os.name != "posix":
+        return  # Windows frees the segment when its last handle closes
+    try:
+        resource_tracker.unregister(segment._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _load_prices():
+    import pandas as pd
+    from core.database import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        df = pd.read_sql(
+            f"SELECT symbol, date, {', '.join(PRICE_FIELDS)} FROM stocks ORDER BY symbol, date",
+            conn,
+        )
+    finally:
+        conn.close()
+    return df
+
+
+def _load_model_weights(previous=None):
+    """
+    {symbol: (file key, [weight arrays])} for every model of the live version.
+
+    Models whose file is unchanged since `previous` (same path and mtime)
+    are reused, so only new or retrained models are loaded with TensorFlow.
+    """
+    from ML.model_registry import list_symbols, model_path, read_manifest
+
+    previous = previous or {}
+    manifest = read_manifest()
+    weights = {}
+    for symbol in list_symbols(manifest):
+        path = model_path(symbol, manifest)
+        try:
+            key = (str(path), path.stat().st_mtime_ns)
+            if symbol in previous and previous[symbol][0] == key:
+                weights[symbol] = previous[symbol]
+                continue
+            import tensorflow as tf
+            model = tf.keras.models.load_model(path, compile=False)
+            weights[symbol] = (key, [w.astype(np.float32) for w in model.get_weights()])
+        except Exception as e:
+            print(f"Skipping model {symbol}: {e}")
+    return weights
+
+
+def build_version(version: int, model_weights=None):
+    """
+    Packs prices and model weights ({symbol: [arrays]}) into a new shared
+    memory segment and returns (segment, manifest dict). The caller owns the segment.
+    """
+    df = _load_prices()
+    values = df[PRICE_FIELDS].to_numpy(dtype=np.float64)
+    dates = df["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    model_weights = model_weights or {}
+
+    # Row ranges per symbol (rows are sorted by symbol)
+    symbols, starts, counts = np.unique(df["symbol"].to_numpy(), return_index=True, return_counts=True)
+
+    dates_bytes = dates.nbytes
+    values_bytes = values.nbytes
+    weight_bytes = sum(w.nbytes for ws in model_weights.values() for w in ws)
+    segment = shared_memory.SharedMemory(
+        name=f"{SEGMENT_PREFIX}_{os.getpid()}_v{version}",
+        create=True,
+        size=max(dates_bytes + values_bytes + weight_bytes, 1),
+    )
+    _untrack(segment)
+
+    buf = segment.buf
+    np.ndarray(dates.shape, np.int64, buf, 0)[:] = dates
+    np.ndarray(values.shape, np.float64, buf, dates_bytes)[:] = values
+
+    offset = dates_bytes + values_bytes
+    models = {}
+    for symbol, ws in model_weights.items():
+        entries = []
+        for w in ws:
+            np.ndarray(w.shape, np.float32, buf, offset)[:] = w
+            entries.append([offset, list(w.shape)])
+            offset += w.nbytes
+        models[symbol] = entries
+
+    manifest = {
+        "version": version,
+        "segment": segment.name,
+        "rows": len(df),
+        "values_offset": dates_bytes,
+        "symbols": {s: [int(a), int(n)] for s, a, n in zip(symbols, starts, counts)},
+        "models": models,
+        "created": time.time(),
+    }
+    return segment, manifest
+
+
+def write_manifest(manifest):
+    """Atomically replace the manifest so workers never read half a file."""
+    tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest))
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+class SharedStorePublisher:
+    """Builds versions and swaps them in (used by serve.py)."""
+
+    def __init__(self, grace_seconds=60, include_models=True):
+        self.grace_seconds = grace_seconds
+        self.include_models = include_models
+        self.version = 0
+        self.segment = None
+        self._model_weights = {}  # symbol -> (file key, weights), reused across refreshes
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            if self.include_models:
+                # Ingest events only change prices; models are reloaded when their file changes
+                self._model_weights = _load_model_weights(self._model_weights)
+            weights = {symbol: ws for symbol, (_, ws) in self._model_weights.items()}
+            new_segment, manifest = build_version(self.version + 1, weights)
+            write_manifest(manifest)
+            old_segment, self.segment = self.segment, new_segment
+            self.version += 1
+            print(f"Shared store version {self.version}: {manifest['rows']} rows, "
+                  f"{len(manifest['models'])} models, {new_segment.size / 1e6:.1f} MB")
+
+        if old_segment is not None:
+            # Workers that already attached keep their mapping after unlink
+            timer = threading.Timer(self.grace_seconds, self._release, args=(old_segment,))
+            timer.daemon = True
+            timer.start()
+
+    @staticmethod
+    def _release(segment):
+        segment.close()
+        if os.name == "posix":
+            # Unlink directly: the segment is not registered with the resource tracker
+            shared_memory._posixshmem.shm_unlink(segment._name)
+
+    def close(self):
+        if self.segment is not None:
+            self._release(self.segment)
+            self.segment = None
+        MANIFEST_PATH.unlink(missing_ok=True)
+
+
+#===================================================
+# 5. Attaching (worker side)
+#===================================================
+
+class SharedStore:
+    """
+    Read-only view of the newest published version.
+    All methods return None when no store is published, so callers can
+    fall back to the database and TensorFlow.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._manifest_mtime = None
+        self._state = None  # (manifest, segment, dates, values, model cache)
+        self._retired = []  # (retired at, segment) of replaced versions, closed after RETIRE_SECONDS
+
+    def _attach(self, manifest):
+        segment = shared_memory.SharedMemory(name=manifest["segment"])
+        # Only the publisher may unlink the segment
+        _untrack(segment)
+        rows = manifest["rows"]
+        dates = np.ndarray((rows,), np.int64, segment.buf, 0)
+        values = np.ndarray((rows, len(PRICE_FIELDS)), np.float64, segment.buf, manifest["values_offset"])
+        dates.flags.writeable = False
+        values.flags.writeable = False
+        return manifest, segment, dates, values, {}
+
+    def _retire(self, now):
+        """Drop the current state but keep its segment open for requests still using it."""
+        if self._state is not None:
+            self._retired.append((now, self._state[1]))
+            self._state = None
+
+    def _close_retired(self, now):
+        """
+        Close replaced segments after the grace period. A segment whose arrays
+        are still referenced cannot be closed yet (BufferError) and is retried
+        on the next check; dropping it instead would raise in SharedMemory.__del__.
+        """
+        still_open = []
+        for retired_at, segment in self._retired:
+            if now - retired_at < RETIRE_SECONDS:
+                still_open.append((retired_at, segment))
+                continue
+            try:
+                segment.close()
+            except BufferError:
+                still_open.append((retired_at, segment))
+        self._retired = still_open
+
+    def _current(self):
+        now = time.monotonic()
+        if now - self._last_check < CHECK_INTERVAL:
+            return self._state
+        with self._lock:
+            self._last_check = now
+            self._close_retired(now)
+            try:
+                mtime = MANIFEST_PATH.stat().st_mtime
+            except FileNotFoundError:
+                self._retire(now)
+                self._manifest_mtime = None
+                return None
+            if mtime != self._manifest_mtime:
+                try:
+                    manifest = json.loads(MANIFEST_PATH.read_text())
+                    state = self._attach(manifest)
+                    # Old arrays stay valid while requests still use them
+                    self._retire(now)
+                    self._state = state
+                    self._manifest_mtime = mtime
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Could not attach shared store: {e}")
+            return self._state
+
+    @property
+    def version(self):
+        state = self._current()
+        return state[0]["version"] if state else None
+
+    def prices(self, symbol):
+        """
+        Read-only arrays for one symbol, or None.
+        Returns dict with "date" (datetime64[D]) and open/high/low/close/close_norm.
+        """
+        state = self._current()
+        if state is None:
+            return None
+        manifest, _, dates, values, _ = state
+        span = manifest["symbols"].get(symbol.upper())
+        if span is None:
+            return None
+        start, count = span
+        block = values[start:start + count]
+        result = {"date": dates[start:start + count].astype("datetime64[D]")}
+        for i, field in enumerate(PRICE_FIELDS):
+            result[field] = block[:, i]
+        return result
+
+    def model(self, symbol):
+        """NumpyLSTM whose weights live in shared memory, or None."""
+        state = self._current()
+        if state is None:
+            return None
+        manifest, segment, _, _, cache = state
+        symbol = symbol.upper()
+        if symbol not in cache:
+            entries = manifest["models"].get(symbol)
+            if entries is None:
+                return None
+            weights = []
+            for offset, shape in entries:
+                w = np.ndarray(tuple(shape), np.float32, segment.buf, offset)
+                w.flags.writeable = False
+                weights.append(w)
+            cache[symbol] = NumpyLSTM(weights)
+        return cache[symbol]
+
+
+# One store per process
+shared_store = SharedStore()
+
+register_gauge("shared_store_version", "Shared memory data version used by this worker (0 = none)",
+               lambda: shared_store.version or 0)
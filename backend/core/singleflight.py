@@ -0,0 +1,143 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import asyncio
+import functools
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+from core.metrics import register_counter, register_gauge
+
+
+#===================================================
+# 2. Single-flight Groups
+#===================================================
+# When many identical requests arrive together (a trending symbol), only
+# the first one runs the load-fetch-compute pipeline; the others wait for
+# it and receive the same result object. Nothing is cached: once the call
+# finishes, the next request computes again.
+#
+#     @router.get("/stocks")
+#     @coalesce("stocks", key=lambda symbol="NEPSE", timeframe="1Y": (symbol.upper(), timeframe))
+#     def get_stock(symbol: str = "NEPSE", timeframe: str = "1Y"):
+#         ...
+#
+# A decorated sync endpoint becomes async: the leader runs in the
+# threadpool and followers wait on the event loop, so a burst of identical
+# requests takes one worker thread instead of one per request.
+#
+# Shared results must be treated as read-only by callers.
+
+_groups = []
+
+
+class _Call:
+    """One in-flight sync call that other threads can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls with the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executions = 0   # calls that actually ran
+        self.coalesced = 0    # calls that shared another call's result
+        self._calls = {}      # key -> _Call (sync callers, any thread)
+        self._tasks = {}      # key -> asyncio.Task (async callers, event loop)
+        self._lock = threading.Lock()
+        _groups.append(self)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless an identical call is running; then wait for it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """Async version of do(); fn is a coroutine function."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            self.executions += 1
+
+            def finished(t):
+                if self._tasks.get(key) is t:
+                    del self._tasks[key]
+                # Mark the exception as retrieved even if every waiter left
+                if not t.cancelled():
+                    t.exception()
+
+            task.add_done_callback(finished)
+        else:
+            self.coalesced += 1
+        # A disconnecting client must not cancel the work others wait for
+        return await asyncio.shield(task)
+
+
+def coalesce(name: str, key):
+    """
+    Decorator that puts a sync or async function behind a SingleFlight group.
+    `key` receives the same arguments as the function and returns a hashable
+    key made of the normalized parameters.
+
+    The wrapper is always a coroutine function; sync functions run in the
+    threadpool (as FastAPI would run them), only once per key.
+    """
+    group = SingleFlight(name)
+
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await group.do_async(key(*args, **kwargs), fn, *args, **kwargs)
+            async_wrapper.singleflight = group
+            return async_wrapper
+
+        @functools.wraps(fn)
+        async def sync_wrapper(*args, **kwargs):
+            return await group.do_async(key(*args, **kwargs), run_in_threadpool, fn, *args, **kwargs)
+        sync_wrapper.singleflight = group
+        return sync_wrapper
+
+    return decorator
+
+
+#===================================================
+# 3. Metrics
+#===================================================
+
+register_counter("singleflight_executions_total", "Calls that ran the computation",
+                 lambda: {g.name: g.executions for g in _groups}, label_name="group")
+register_counter("singleflight_coalesced_total", "Calls that shared an in-flight result",
+                 lambda: {g.name: g.coalesced for g in _groups}, label_name="group")
+register_gauge("singleflight_in_flight", "Computations currently running",
+               lambda: {g.name: len(g._calls) + len(g._tasks) for g in _groups}, label_name="group")
@@ -0,0 +1,182 @@
+#===================================================
+# 1. Package Imports
+#===================================================
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from pathlib import Path
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel
+
+
+#===================================================
+# 2. Token Configuration
+#===================================================
+# Tokens are signed with HMAC-SHA256, so checking one is a hash
+# computation and needs neither a database query nor Argon2.
+
+# Used when AUTH_SECRET_KEY is not set. Every worker (and every restart)
+# must sign with the same key, so a generated key is kept in this file.
+AUTH_SECRET_FILE = Path(os.getenv(
+    "AUTH_SECRET_FILE",
+    Path(__file__).resolve().parents[2] / "data" / "auth_secret",
+))
+
+
+def _load_secret_key() -> str:
+    key = os.getenv("AUTH_SECRET_KEY")
+    if key:
+        return key
+
+    AUTH_SECRET_FILE.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # O_EXCL: exactly one process creates the key, the others read it
+        fd = os.open(AUTH_SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # The creating worker may not have written it yet
+        for _ in range(50):
+            key = AUTH_SECRET_FILE.read_text().strip()
+            if key:
+                return key
+            time.sleep(0.1)
+        raise RuntimeError(f"{AUTH_SECRET_FILE} is empty; set AUTH_SECRET_KEY instead")
+
+    key = secrets.token_urlsafe(32)
+    with os.fdopen(fd, "w") as f:
+        f.write(key)
+    print(f"AUTH_SECRET_KEY is not set, generated a key in {AUTH_SECRET_FILE}")
+    return key
+
+
+SECRET_KEY = _load_secret_key()
+SECRET_KEY_BYTES = SECRET_KEY.encode()
+
+ACCESS_TOKEN_TTL = int(os.getenv("ACCESS_TOKEN_TTL", "900"))        # 15 minutes
+REFRESH_TOKEN_TTL = int(os.getenv("REFRESH_TOKEN_TTL", "604800"))   # 7 days
+
+
+#===================================================
+# 3. Encoding Helpers
+#===================================================
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(SECRET_KEY_BYTES, payload.encode(), hashlib.sha256).digest())
+
+
+#===================================================
+# 4. Create and Verify Tokens
+#===================================================
+
+class InvalidToken(Exception):
+    """Raised when a token is malformed, tampered with or expired."""
+
+
+def create_token(user, token_type: str, ttl: int) -> str:
+    """
+    Create a signed token for a user.
+
+    The token is "<payload>.<signature>" where payload is base64 JSON
+    holding the user id, name, email, token type and expiry time.
+    """
+    now = int(time.time())
+    claims = {
+        "sub": user.id,
+        "name": user.full_name,
+        "email": user.email,
+        "type": token_type,
+        "iat": now,
+        "exp": now + ttl,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def decode_token(token: str, token_type: str) -> dict:
+    """
+    Verify a token's signature, type and expiry and return its claims.
+    Raises InvalidToken if anything is wrong.
+    """
+    try:
+        payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+
+    # compare_digest avoids leaking the signature through timing. It only
+    # accepts ASCII str, so compare bytes: a non-ASCII token is just invalid.
+    if not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+        raise InvalidToken("Invalid signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if not isinstance(claims, dict):
+        raise InvalidToken("Malformed token")
+
+    if claims.get("type") != token_type:
+        raise InvalidToken("Wrong token type")
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("Token expired")
+    return claims
+
+
+def issue_tokens(user) -> dict:
+    """Create an access token and a refresh token for a user."""
+    return {
+        "access_token": create_token(user, "access", ACCESS_TOKEN_TTL),
+        "refresh_token": create_token(user, "refresh", REFRESH_TOKEN_TTL),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL,
+    }
+
+
+#===================================================
+# 5. FastAPI Dependency
+#===================================================
+
+class CurrentUser(BaseModel):
+    """User identity taken from a verified access token."""
+    id: int
+    full_name: str
+    email: str
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> CurrentUser:
+    """
+    Dependency for user-scoped endpoints.
+    Reads "Authorization: Bearer <access token>" and returns the user.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        claims = decode_token(credentials.credentials, "access")
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=401,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return CurrentUser(id=claims["sub"], full_name=claims["name"], email=claims["email"])
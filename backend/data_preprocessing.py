@@ -1,67 +1,173 @@
-import pandas as pd
+"""
+data_preprocessing.py
 
-# -----------------------------
-# Step 1: Load OHLC CSV
-# -----------------------------
-ohlc = pd.read_csv('../data/raw/OHLC.csv')
+Builds the cleaned stock dataset (data/clean/merged_stock_nepse.csv)
+from the raw OHLC CSV and the NEPSE Excel sheet.
 
-# Standardize column names
-ohlc.columns = ohlc.columns.str.lower()
-ohlc = ohlc[['date', 'symbol', 'open', 'high', 'low', 'close']]
+- Parsed inputs are cached as Parquet files keyed by the source file's
+  hash, so unchanged inputs are never parsed twice
+- Large OHLC files are read and cleaned in chunks
+- close_norm is computed with one vectorized pass over all symbols
 
-# Clean numeric data
-ohlc.replace('###', pd.NA, inplace=True)
-ohlc[['open','high','low','close']] = ohlc[['open','high','low','close']].apply(pd.to_numeric, errors='coerce')
+Usage:
+    python data_preprocessing.py
+    python data_preprocessing.py --ohlc ../data/raw/OHLC.csv --output ../data/clean/out.csv
 
-# Convert date column
-ohlc['date'] = pd.to_datetime(ohlc['date'], errors='coerce')
-ohlc.dropna(subset=['date','close'], inplace=True)
+or from Python:
+    from data_preprocessing import run_preprocessing
+    combined = run_preprocessing()
+"""
+import argparse
+import hashlib
+from pathlib import Path
 
-print("Cleaned Stock OHLC Data:")
-print(ohlc.head())
+import pandas as pd
 
 # -----------------------------
-# Step 2: Load NEPSE Excel
+# Default paths (relative to this file, not the working directory)
 # -----------------------------
-# Skip first row (title) and use second row as header
-nepse = pd.read_excel('../data/raw/nepseinfo.xlsx', header=1)
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_OHLC_PATH = DATA_DIR / "raw" / "OHLC.csv"
+DEFAULT_NEPSE_PATH = DATA_DIR / "raw" / "nepseinfo.xlsx"
+DEFAULT_OUTPUT_PATH = DATA_DIR / "clean" / "merged_stock_nepse.csv"
+DEFAULT_CACHE_DIR = DATA_DIR / "cache"
 
-# Standardize column names
-nepse.columns = nepse.columns.str.lower().str.replace(' ', '_')
+# Rows of OHLC.csv cleaned at a time
+DEFAULT_CHUNKSIZE = 200_000
 
-# Keep only relevant columns
-nepse = nepse[['symbol', 'date', 'open', 'high', 'low', 'close']]
+PRICE_COLS = ["open", "high", "low", "close"]
 
-# Clean numeric data
-nepse.replace('###', pd.NA, inplace=True)
-nepse[['open','high','low','close']] = nepse[['open','high','low','close']].apply(pd.to_numeric, errors='coerce')
-
-# Convert date column
-nepse['date'] = pd.to_datetime(nepse['date'], errors='coerce')
-nepse.dropna(subset=['date','close'], inplace=True)
-
-# Add NEPSE as a symbol (already symbol column, but normalize casing)
-nepse['symbol'] = nepse['symbol'].str.upper()
-
-print("\nCleaned NEPSE Data:")
-print(nepse.head())
 
 # -----------------------------
-# Step 3: Combine OHLC + NEPSE
+# Stage cache
 # -----------------------------
-combined = pd.concat([ohlc, nepse], ignore_index=True)
+def file_hash(path) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_stage(name, source_path, build, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Returns the result of `build(source_path)`, cached as Parquet.
+
+    The cache file name contains the source file's hash, so editing
+    the source file automatically invalidates the cached result.
+    """
+    cache_dir = Path(cache_dir)
+    cache_path = cache_dir / f"{name}-{file_hash(source_path)[:16]}.parquet"
+    if cache_path.exists():
+        print(f"Using cached {name}: {cache_path.name}")
+        return pd.read_parquet(cache_path)
+
+    df = build(source_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Old cache files of this stage are no longer needed
+    for old in cache_dir.glob(f"{name}-*.parquet"):
+        old.unlink()
+    df.to_parquet(cache_path, index=False)
+    return df
+
 
 # -----------------------------
-# Step 4: Normalize closing prices per symbol
+# Cleaning helpers
 # -----------------------------
-# Use transform to keep same index
-combined['close_norm'] = combined.groupby('symbol')['close'].transform(lambda x: x / x.iloc[0])
+def clean_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shared cleaning for both sources:
+    - '###' and other non-numeric prices become NaN
+    - dates are parsed
+    - rows without a date or close price are dropped
+    """
+    df = df.replace("###", pd.NA)
+    df[PRICE_COLS] = df[PRICE_COLS].apply(pd.to_numeric, errors="coerce")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df.dropna(subset=["date", "close"])
+
+
+def load_ohlc(path, chunksize=DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """Step 1: Load and clean the OHLC CSV chunk by chunk."""
+    chunks = []
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        # Standardize column names
+        chunk.columns = chunk.columns.str.lower()
+        chunks.append(clean_prices(chunk[["date", "symbol", "open", "high", "low", "close"]]))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_nepse(path) -> pd.DataFrame:
+    """Step 2: Load and clean the NEPSE Excel sheet."""
+    # Skip first row (title) and use second row as header
+    nepse = pd.read_excel(path, header=1)
+
+    # Standardize column names
+    nepse.columns = nepse.columns.str.lower().str.replace(" ", "_")
+
+    # Keep only relevant columns
+    nepse = clean_prices(nepse[["symbol", "date", "open", "high", "low", "close"]])
+
+    # Normalize symbol casing
+    nepse["symbol"] = nepse["symbol"].str.upper()
+    return nepse
+
+
+def add_close_norm(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Step 4: Normalize closing prices per symbol.
+
+    close_norm = close / first close of the symbol. The first close is
+    broadcast to every row with groupby().transform("first"), which runs
+    in vectorized code instead of a Python lambda per group.
+    """
+    df = df.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+    first_close = df.groupby("symbol", sort=False)["close"].transform("first")
+    df["close_norm"] = df["close"] / first_close
+    return df
 
-# Sort by symbol and date
-combined.sort_values(by=['symbol','date'], inplace=True)
 
 # -----------------------------
-# Step 5: Save Cleaned Data
+# Pipeline
 # -----------------------------
-combined.to_csv('../data/clean/merged_stock_nepse.csv', index=False)
-print("\nCombined Stock + NEPSE data saved to 'data/clean/merged_stock_nepse.csv'")
+def run_preprocessing(
+    ohlc_path=DEFAULT_OHLC_PATH,
+    nepse_path=DEFAULT_NEPSE_PATH,
+    output_path=DEFAULT_OUTPUT_PATH,
+    cache_dir=DEFAULT_CACHE_DIR,
+    chunksize=DEFAULT_CHUNKSIZE,
+) -> pd.DataFrame:
+    """
+    Runs the full preprocessing pipeline and returns the combined DataFrame.
+    Set output_path=None to skip writing the CSV.
+    """
+    ohlc = cached_stage("ohlc", ohlc_path, lambda p: load_ohlc(p, chunksize), cache_dir)
+    print(f"Cleaned Stock OHLC Data: {len(ohlc)} rows")
+
+    nepse = cached_stage("nepse", nepse_path, load_nepse, cache_dir)
+    print(f"Cleaned NEPSE Data: {len(nepse)} rows")
+
+    # Step 3: Combine OHLC + NEPSE
+    combined = pd.concat([ohlc, nepse[ohlc.columns]], ignore_index=True)
+    combined = add_close_norm(combined)
+
+    # Step 5: Save Cleaned Data
+    if output_path is not None:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        combined.to_csv(output_path, index=False)
+        print(f"Combined Stock + NEPSE data saved to '{output_path}'")
+
+    return combined
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the cleaned stock dataset")
+    parser.add_argument("--ohlc", default=str(DEFAULT_OHLC_PATH), help="Raw OHLC CSV")
+    parser.add_argument("--nepse", default=str(DEFAULT_NEPSE_PATH), help="NEPSE Excel file")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT_PATH), help="Cleaned CSV to write")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Parquet cache folder")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="OHLC rows per chunk")
+    args = parser.parse_args()
+
+    run_preprocessing(args.ohlc, args.nepse, args.output, args.cache_dir, args.chunksize)
@@ -0,0 +1,92 @@
+"""
+explain_check.py
+
+Checks that the per-symbol router queries are served by an index.
+
+Each query is run through EXPLAIN (FORMAT JSON) and the plan is searched
+for sequential scans on the large tables. Small lookup tables such as
+stock_info are not checked, since a seq scan is the cheapest plan there.
+Run it against a database with realistic data; on a near-empty table the
+planner will always prefer a seq scan.
+
+Usage:
+    python explain_check.py            # exits with status 1 if a query seq-scans
+    python explain_check.py --symbol NABIL
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import json
+import argparse
+
+import psycopg2
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from core.database import DB_CONFIG, PRICE_HISTORY_SQL  # Shared database configuration and queries
+from routers.analysis import ROLLUP_HISTORY_SQL, STOCK_HISTORY_SQL
+from routers.technical_status import TECHNICAL_STATUS_SQL
+
+# Tables that must never be read with a sequential scan by per-symbol queries
+CHECKED_TABLES = {"stocks", "stock_rollups"}
+
+
+def router_queries(symbol):
+    """(name, sql, params) for every per-symbol query used by the routers."""
+    return [
+        ("analysis.get_stock", STOCK_HISTORY_SQL, (symbol,)),
+        ("analysis.get_stock (interval=1W)", ROLLUP_HISTORY_SQL, (symbol, "1W")),
+        ("technical_status.technical_status", TECHNICAL_STATUS_SQL, (symbol,)),
+        ("predictions.predict", PRICE_HISTORY_SQL, (symbol,)),
+    ]
+
+
+def walk_plan(node):
+    """Yields every node of an EXPLAIN JSON plan tree."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def explain(cur, sql, params):
+    """Returns the list of (node type, relation) pairs of a query plan."""
+    cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return [
+        (node["Node Type"], node.get("Relation Name"))
+        for node in walk_plan(plan[0]["Plan"])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check router queries for sequential scans")
+    parser.add_argument("--symbol", default="NEPSE", help="Symbol used as the query parameter")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    failures = 0
+    try:
+        with conn.cursor() as cur:
+            for name, sql, params in router_queries(args.symbol):
+                nodes = explain(cur, sql, params)
+                scans = [f"{t} on {r}" for t, r in nodes if r]
+                seq_scans = [r for t, r in nodes if t == "Seq Scan" and r in CHECKED_TABLES]
+                status = "FAIL" if seq_scans else "ok"
+                failures += bool(seq_scans)
+                print(f"[{status}] {name}: {', '.join(scans)}")
+    finally:
+        conn.close()
+
+    if failures:
+        print(f"{failures} queries use a sequential scan. Run db/migrate.py to create the indexes.")
+        sys.exit(1)
+    print("All router queries use an index.")
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
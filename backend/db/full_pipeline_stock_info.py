@@ -1,16 +1,12 @@
+import sys
 from pathlib import Path  # For handling file paths easily
 import pandas as pd       # For reading CSVs and data manipulation
 import psycopg2           # For connecting to PostgreSQL using raw SQL
 from psycopg2.extras import execute_values  # For batch inserting/updating efficiently
 
-# Database configuration
-DB_CONFIG = {
-    "dbname": "stock_data",  # Database name
-    "user": "postgres",      # Username
-    "password": "root",      # Password
-    "host": "localhost",     # Database host
-    "port": "5433"           # Port number
-}
+# Make backend folder discoverable so the shared database configuration can be imported
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from core.database import DB_CONFIG  # Database configuration
 
 def run_stock_info_pipeline(
     merged_stock_path=None,  # Path to merged stock CSV
@@ -0,0 +1,215 @@
+"""
+ingest_daemon.py
+
+Incremental daily ingestion.
+
+Watches a drop folder for new daily OHLC files (CSV with date, symbol,
+open, high, low, close) and appends them to `stocks`:
+
+- only rows newer than each symbol's stored max date (its watermark) are kept
+- close_norm = close / the symbol's stored first close, so nothing is recomputed
+- each file is loaded in one transaction (COPY into staging + merge)
+- the weekly/monthly/quarterly rollups of the touched periods are rebuilt
+  in the same transaction (db/rollups.py)
+- the sector indices are extended with the new days (db/sector_indices.py)
+- after commit, a "symbols updated" event is published (utils/events.py)
+
+Processed files move to <drop dir>/processed, bad files to <drop dir>/failed.
+Only *.csv files untouched for --settle seconds are picked up; writers should
+write to a temporary name (e.g. .tmp) and rename to .csv when done.
+If the database is unreachable, files stay in the drop folder for the next pass.
+
+Usage:
+    python ingest_daemon.py                      # watch data/incoming
+    python ingest_daemon.py --once               # process pending files and exit
+    python ingest_daemon.py --drop-dir /srv/drop --interval 30 --settle 10 --columnar
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import argparse
+import io
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from core.database import DB_CONFIG
+from data_preprocessing import load_ohlc
+from db.load_csv_to_db import COLUMNS, COPY_SQL, CREATE_STAGING_SQL, MERGE_SQL
+from db.migrate import run_migrations
+from db.rollups import refresh_rollups
+from db.sector_indices import extend_sector_indices
+from utils.events import dispatch, on_symbols_updated, publish_symbols_updated
+
+DEFAULT_DROP_DIR = Path(PARENT_DIR).parent / "data" / "incoming"
+
+# A file must be unmodified this long before it is read (still being written otherwise)
+DEFAULT_SETTLE_SECONDS = 5
+
+# Stored watermark (max date) and first close of each symbol in the batch
+WATERMARK_SQL = """
+SELECT w.symbol, w.max_date, f.close AS first_close
+FROM (
+    SELECT symbol, MAX(date) AS max_date
+    FROM stocks
+    WHERE symbol = ANY(%s)
+    GROUP BY symbol
+) w
+JOIN LATERAL (
+    SELECT close FROM stocks
+    WHERE symbol = w.symbol AND close IS NOT NULL
+    ORDER BY date ASC
+    LIMIT 1
+) f ON TRUE
+"""
+
+
+def read_daily_file(path: Path) -> pd.DataFrame:
+    """Load and clean one drop file (same cleaning as data_preprocessing.py)."""
+    # Drop missing symbols before astype(str), which would turn them into "NAN"
+    df = load_ohlc(path).dropna(subset=["symbol"])
+    df["symbol"] = df["symbol"].astype(str).str.strip().str.upper()
+    df = df[df["symbol"] != ""]
+    return df.sort_values(["symbol", "date"]).drop_duplicates(["symbol", "date"], keep="last")
+
+
+def new_rows(conn, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keeps only rows past each symbol's watermark and adds close_norm
+    from the stored first close (or the batch's first close for new symbols).
+    """
+    with conn.cursor() as cur:
+        cur.execute(WATERMARK_SQL, (list(df["symbol"].unique()),))
+        marks = pd.DataFrame(cur.fetchall(), columns=["symbol", "max_date", "first_close"])
+
+    df = df.merge(marks, on="symbol", how="left")
+    df = df[df["max_date"].isna() | (df["date"] > pd.to_datetime(df["max_date"]))].copy()
+
+    batch_first = df.groupby("symbol")["close"].transform("first")
+    first_close = df["first_close"].astype(float).fillna(batch_first)
+    df["close_norm"] = df["close"] / first_close
+    return df[COLUMNS]
+
+
+def ingest_file(conn, path: Path):
+    """
+    Appends one file in a single transaction.
+
+    Returns:
+        dict or None: the published event (None if nothing was new)
+    """
+    rows = new_rows(conn, read_daily_file(path))
+    if rows.empty:
+        conn.rollback()
+        return None
+
+    buffer = io.StringIO()
+    rows.assign(date=rows["date"].dt.strftime("%Y-%m-%d")).to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_STAGING_SQL)
+            cur.copy_expert(COPY_SQL, buffer)
+            cur.execute(MERGE_SQL)
+            refresh_rollups(cur, rows["symbol"].unique(), since=rows["date"].min().date())
+            extend_sector_indices(cur, from_date=rows["date"].min().date())
+            event = publish_symbols_updated(cur, rows["symbol"].unique(), rows["date"].max().date())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    print(f"{path.name}: {len(rows)} new rows for {len(event['symbols'])} symbols")
+    return event
+
+
+def ready_files(drop_dir: Path, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """CSV files in the drop folder that are no longer being written, oldest first."""
+    cutoff = time.time() - settle_seconds
+    files = [(p.stat().st_mtime, p) for p in drop_dir.glob("*.csv")]
+    return [p for mtime, p in sorted(files) if mtime <= cutoff]
+
+
+def process_pending(drop_dir: Path, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """
+    Ingest every file waiting in the drop folder, oldest first.
+
+    Each pass opens its own connection, so a connection dropped by the
+    server only costs one pass instead of failing every later file.
+    """
+    files = ready_files(drop_dir, settle_seconds)
+    if not files:
+        return
+
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+    except psycopg2.OperationalError as e:
+        print(f"Database unavailable, retrying next pass: {e}")
+        return
+
+    try:
+        for path in files:
+            try:
+                event = ingest_file(conn, path)
+                target = drop_dir / "processed"
+            except Exception as e:
+                if conn.closed:
+                    # The connection is gone, not the file's fault: keep it for the next pass
+                    print(f"{path.name}: database connection lost, retrying next pass ({e})")
+                    return
+                print(f"{path.name}: failed ({e})")
+                event = None
+                target = drop_dir / "failed"
+            target.mkdir(exist_ok=True)
+            shutil.move(str(path), target / path.name)
+            # Local subscribers run only after the rows are committed
+            if event:
+                dispatch(event)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and append new daily OHLC files")
+    parser.add_argument("--drop-dir", default=str(DEFAULT_DROP_DIR), help="Folder to watch")
+    parser.add_argument("--interval", type=float, default=10, help="Seconds between scans")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help="Seconds a file must be unmodified before it is read")
+    parser.add_argument("--once", action="store_true", help="Process pending files and exit")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Refresh the Parquet replica of updated symbols")
+    args = parser.parse_args()
+
+    drop_dir = Path(args.drop_dir)
+    drop_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.columnar:
+        from utils.columnar_store import export_from_postgres
+        on_symbols_updated(lambda event: export_from_postgres(event["symbols"]))
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+
+    print(f"Watching {drop_dir} for new daily files")
+    while True:
+        # --once also takes files written just now
+        process_pending(drop_dir, 0 if args.once else args.settle)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
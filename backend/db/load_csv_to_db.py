@@ -1,77 +1,161 @@
+"""
+load_csv_to_db.py
+
+Bulk loader for the cleaned stock CSV (data/clean/merged_stock_nepse.csv).
+
+- The CSV is streamed in chunks, so memory use stays constant
+- Each chunk is sent with COPY into a temporary staging table
+- Staging rows are merged into `stocks` with ON CONFLICT (symbol, date),
+  so running the loader again updates rows instead of duplicating them
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import io
+import time
+import argparse
+from pathlib import Path  # For handling file paths easily
+
 # Import pandas library for reading and handling CSV data
 import pandas as pd
 
 # Import psycopg2 to connect Python with PostgreSQL
 import psycopg2
 
-# Import execute_values for fast bulk insert into PostgreSQL
-from psycopg2.extras import execute_values
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
 
+from core.database import DB_CONFIG  # Shared database configuration
+from utils.columnar_store import export_from_postgres  # Optional Parquet/DuckDB replica
+from db.migrate import run_migrations  # Creates the unique (symbol, date) index used below
+from db.rollups import refresh_rollups  # Weekly/monthly/quarterly bars
+from db.sector_indices import rebuild_sector_indices  # Equal-weighted sector indices
 
-# Path to the cleaned CSV file (relative path)
-csv_file = '../../data/clean/merged_stock_nepse.csv'
 
+# Path to the cleaned CSV file (relative to this script)
+DEFAULT_CSV = Path(__file__).parent / "../../data/clean/merged_stock_nepse.csv"
 
-# -------------------------------
-# Load CSV into a pandas DataFrame
-# -------------------------------
-# parse_dates converts the 'date' column into pandas datetime format
-df = pd.read_csv(csv_file, parse_dates=['date'])
+# Number of CSV rows sent to the database per COPY
+DEFAULT_CHUNKSIZE = 100_000
 
-# PostgreSQL prefers Python date objects instead of pandas Timestamp
-df['date'] = df['date'].dt.date
+# Columns loaded into the stocks table, in CSV order
+COLUMNS = ["date", "symbol", "open", "high", "low", "close", "close_norm"]
 
 # List of columns that should contain numeric values
-numeric_cols = ['open', 'high', 'low', 'close', 'close_norm']
-
-# Convert each value to native Python float
-# If value is missing (NaN), convert it to None
-for col in numeric_cols:
-    df[col] = df[col].apply(lambda x: float(x) if pd.notnull(x) else None)
+NUMERIC_COLS = ["open", "high", "low", "close", "close_norm"]
 
 
 # --------------------------------------------------
-# Convert DataFrame rows into list of tuples
-# --------------------------------------------------
-values = [tuple(row) for row in df.itertuples(index=False, name=None)]
-
-
-# -------------------------------
-# Connect to PostgreSQL database
-# -------------------------------
-conn = psycopg2.connect(
-    dbname='stock_data',   # Database name
-    user='postgres',       # Database username
-    password='root',       # Database password
-    host='localhost',      # Database host
-    port='5433'            # Database port
-)
-
-# Create a cursor to execute SQL commands
-cur = conn.cursor()
-
+# SQL statements
 # --------------------------------------------------
-# Insert data into the database efficiently
-# --------------------------------------------------
-execute_values(
-    cur,
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE stocks_staging (
+    date DATE,
+    symbol TEXT,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    close_norm DOUBLE PRECISION
+) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY stocks_staging ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# DISTINCT ON keeps a single row per key if the CSV itself contains duplicates
+MERGE_SQL = """
+INSERT INTO stocks (date, symbol, open, high, low, close, close_norm)
+SELECT DISTINCT ON (symbol, date) date, symbol, open, high, low, close, close_norm
+FROM stocks_staging
+ORDER BY symbol, date
+ON CONFLICT (symbol, date) DO UPDATE SET
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    close_norm = EXCLUDED.close_norm
+"""
+
+def clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
     """
-    INSERT INTO stocks (date, symbol, open, high, low, close, close_norm)
-    VALUES %s
-    """,
-    values
-)
-
-
-# Save (commit) all changes to the database
-conn.commit()
+    Vectorized cleaning of one CSV chunk:
+    - dates parsed and written as ISO strings
+    - symbols trimmed and upper-cased
+    - numeric columns converted (bad values become NULL)
+    """
+    # Drop missing symbols before astype(str), which would turn them into "NAN"
+    chunk = chunk[COLUMNS].dropna(subset=["symbol"]).copy()
+    chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    chunk["symbol"] = chunk["symbol"].astype(str).str.strip().str.upper()
+    chunk[NUMERIC_COLS] = chunk[NUMERIC_COLS].apply(pd.to_numeric, errors="coerce")
+    chunk = chunk[chunk["symbol"] != ""]
+    return chunk.dropna(subset=["date"])
 
-# Close the cursor
-cur.close()
 
-# Close the database connection
-conn.close()
+def load_csv_to_db(csv_file=DEFAULT_CSV, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Streams a cleaned stock CSV into the `stocks` table.
 
+    Args:
+        csv_file (str or Path): CSV with date, symbol, open, high, low, close, close_norm
+        chunksize (int): Rows read and copied per chunk
 
-# Success message
-print("CSV imported successfully!")
+    Returns:
+        int: Number of rows read from the CSV
+    """
+    conn = psycopg2.connect(**DB_CONFIG)
+    # ON CONFLICT (symbol, date) needs the unique index from the migrations
+    run_migrations(conn)
+
+    start = time.perf_counter()
+    total_rows = 0
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_STAGING_SQL)
+
+            for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+                chunk = clean_chunk(chunk)
+
+                # Write the chunk as CSV into memory and COPY it to staging
+                buffer = io.StringIO()
+                chunk.to_csv(buffer, index=False, header=False)
+                buffer.seek(0)
+                cur.copy_expert(COPY_SQL, buffer)
+
+                # Merge this chunk and empty the staging table for the next one
+                cur.execute(MERGE_SQL)
+                cur.execute("TRUNCATE stocks_staging")
+
+                total_rows += len(chunk)
+                elapsed = time.perf_counter() - start
+                print(f"{total_rows} rows loaded ({total_rows / elapsed:,.0f} rows/sec)")
+
+            # Rebuild the weekly/monthly/quarterly bars and sector indices in the same transaction
+            refresh_rollups(cur)
+            rebuild_sector_indices(cur)
+
+        # Everything is committed at once, so a failed run leaves the table untouched
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"CSV imported successfully! {total_rows} rows in {elapsed:.2f}s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    return total_rows
+
+
+# Run the loader if this script is executed directly
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the cleaned stock CSV into PostgreSQL")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Path to the cleaned CSV file")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per COPY chunk")
+    parser.add_argument("--columnar", action="store_true", help="Also rebuild the Parquet replica")
+    args = parser.parse_args()
+    load_csv_to_db(args.csv, args.chunksize)
+    if args.columnar:
+        export_from_postgres()
@@ -0,0 +1,104 @@
+"""
+migrate.py
+
+Applies the SQL migrations in db/migrations to the database.
+
+- Files are applied in name order (001_..., 002_...), each in its own transaction
+- Applied versions are recorded in `schema_migrations`, so running it again is safe
+- db/migrations/optional holds migrations that are only applied on request
+
+Usage:
+    python migrate.py                      # apply pending migrations
+    python migrate.py --partition-by-year  # also partition stocks by year
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import argparse
+from pathlib import Path
+
+import psycopg2
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from core.database import DB_CONFIG  # Shared database configuration
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+OPTIONAL_DIR = MIGRATIONS_DIR / "optional"
+
+
+def applied_versions(conn):
+    """Returns the set of migration names already applied."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {r[0] for r in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def apply_migration(conn, path: Path, version: str):
+    """Runs one migration file and records it, all in one transaction."""
+    with conn.cursor() as cur:
+        cur.execute(path.read_text())
+        cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+    conn.commit()
+    print(f"Applied migration {version}")
+
+
+def run_migrations(conn, optional=()):
+    """
+    Applies pending migrations on an open connection.
+
+    Args:
+        conn: psycopg2 connection
+        optional (iterable): names of optional migrations to apply as well
+                             (file names in db/migrations/optional without .sql)
+
+    Returns:
+        list: versions applied by this call
+    """
+    done = applied_versions(conn)
+    pending = [(p, p.stem) for p in sorted(MIGRATIONS_DIR.glob("*.sql"))]
+    pending += [(OPTIONAL_DIR / f"{name}.sql", f"optional/{name}") for name in optional]
+
+    applied = []
+    for path, version in pending:
+        if version in done:
+            continue
+        try:
+            apply_migration(conn, path, version)
+        except Exception:
+            conn.rollback()
+            print(f"Migration {version} failed")
+            raise
+        applied.append(version)
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--partition-by-year", action="store_true",
+                        help="Also convert stocks into yearly range partitions")
+    args = parser.parse_args()
+
+    optional = ["partition_stocks_by_year"] if args.partition_by_year else []
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        applied = run_migrations(conn, optional)
+    finally:
+        conn.close()
+    print(f"{len(applied)} migrations applied." if applied else "Database is up to date.")
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+migration_check.py
+
+Checks that the router queries run on a freshly migrated database.
+
+A scratch database is created next to the configured one, every migration
+is applied, a few days of prices are loaded (with their rollups and sector
+indices), and each query is executed once. The scratch database is
+dropped afterwards. This catches schema drift between db/migrations and
+the live database, e.g. a function that exists for NUMERIC but not for
+DOUBLE PRECISION columns.
+
+Usage:
+    python migration_check.py          # exits with status 1 if a query fails
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+
+import psycopg2
+from psycopg2 import sql as pgsql
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from core.database import DB_CONFIG, PRICE_HISTORY_SQL  # Shared database configuration and queries
+from db.migrate import run_migrations
+from db.rollups import refresh_rollups
+from db.sector_indices import rebuild_sector_indices
+from routers.analysis import ROLLUP_HISTORY_SQL, STOCK_HISTORY_SQL
+from routers.market_movers import MARKET_MOVERS_SQL
+from routers.sectors import LATEST_SECTORS_SQL, SECTOR_HISTORY_SQL
+from routers.technical_status import TECHNICAL_STATUS_SQL
+
+SCRATCH_DB = f"{DB_CONFIG['dbname']}_migration_check"
+
+SAMPLE_INFO = [
+    ("NABIL", "Nabil Bank Limited", "Commercial Banks"),
+    ("NICA", "NIC Asia Bank Limited", "Commercial Banks"),
+]
+
+# (date, symbol, open, high, low, close, close_norm)
+SAMPLE_PRICES = [
+    ("2024-01-01", "NABIL", 500.0, 510.0, 495.0, 505.0, 1.0),
+    ("2024-01-02", "NABIL", 505.0, 520.0, 500.0, 515.0, 1.0198),
+    ("2024-01-03", "NABIL", 515.0, 516.0, 490.0, 495.5, 0.9812),
+    ("2024-01-01", "NICA", 700.0, 705.0, 690.0, 702.0, 1.0),
+    ("2024-01-02", "NICA", 702.0, 702.0, 680.0, 688.0, 0.9801),
+    ("2024-01-03", "NICA", 688.0, 710.0, 688.0, 709.25, 1.0103),
+]
+
+
+def router_queries():
+    """(name, sql, params) for the queries served by the routers."""
+    return [
+        ("market_movers.market_movers", MARKET_MOVERS_SQL, None),
+        ("analysis.get_stock", STOCK_HISTORY_SQL, ("NABIL",)),
+        ("analysis.get_stock (interval=1W)", ROLLUP_HISTORY_SQL, ("NABIL", "1W")),
+        ("technical_status.technical_status", TECHNICAL_STATUS_SQL, ("NABIL",)),
+        ("predictions.predict", PRICE_HISTORY_SQL, ("NABIL",)),
+        ("sectors.list_sectors", LATEST_SECTORS_SQL, None),
+        ("sectors.sector_history", SECTOR_HISTORY_SQL, {"name": "Commercial Banks", "days": 365}),
+    ]
+
+
+def admin_execute(statement):
+    """Runs CREATE/DROP DATABASE, which cannot run inside a transaction."""
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(statement)
+    finally:
+        conn.close()
+
+
+def load_sample(conn):
+    """Loads the sample rows and builds their rollups and sector indices."""
+    with conn.cursor() as cur:
+        cur.executemany("INSERT INTO stock_info (symbol, company_name, category) VALUES (%s, %s, %s)", SAMPLE_INFO)
+        cur.executemany(
+            "INSERT INTO stocks (date, symbol, open, high, low, close, close_norm) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            SAMPLE_PRICES,
+        )
+        refresh_rollups(cur)
+        rebuild_sector_indices(cur)
+    conn.commit()
+
+
+def main():
+    name = pgsql.Identifier(SCRATCH_DB)
+    admin_execute(pgsql.SQL("DROP DATABASE IF EXISTS {}").format(name))
+    admin_execute(pgsql.SQL("CREATE DATABASE {}").format(name))
+
+    failures = 0
+    try:
+        conn = psycopg2.connect(**{**DB_CONFIG, "dbname": SCRATCH_DB})
+        try:
+            run_migrations(conn)
+            load_sample(conn)
+            for query_name, sql, params in router_queries():
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(sql, params)
+                        rows = cur.fetchall()
+                    print(f"[ok] {query_name}: {len(rows)} rows")
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    failures += 1
+                    print(f"[FAIL] {query_name}: {str(e).strip()}")
+        finally:
+            conn.close()
+    finally:
+        admin_execute(pgsql.SQL("DROP DATABASE IF EXISTS {}").format(name))
+
+    if failures:
+        print(f"{failures} queries failed on a freshly migrated database.")
+        sys.exit(1)
+    print("All router queries run on a freshly migrated database.")
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
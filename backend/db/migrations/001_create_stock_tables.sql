@@ -0,0 +1,20 @@
+-- Base tables for prices and company info.
+-- IF NOT EXISTS keeps existing databases (created before the migrations) as they are.
+-- Prices are NUMERIC, like the production database; queries such as
+-- ROUND(x, 2) in routers/market_movers.py have no double precision variant.
+
+CREATE TABLE IF NOT EXISTS stock_info (
+    symbol TEXT PRIMARY KEY,
+    company_name TEXT,
+    category TEXT
+);
+
+CREATE TABLE IF NOT EXISTS stocks (
+    date DATE NOT NULL,
+    symbol TEXT NOT NULL,
+    open NUMERIC,
+    high NUMERIC,
+    low NUMERIC,
+    close NUMERIC,
+    close_norm NUMERIC
+);
@@ -0,0 +1,17 @@
+-- Unique (symbol, date) key for stocks, used by ON CONFLICT in the loaders.
+-- INCLUDE makes it a covering index: price queries for one symbol are
+-- answered from the index alone (index-only scan).
+
+-- Remove duplicate rows left by earlier loads (keeps one row per key)
+DELETE FROM stocks a
+USING stocks b
+WHERE a.symbol = b.symbol
+  AND a.date = b.date
+  AND a.ctid < b.ctid;
+
+-- Replace the plain unique index created by older loader versions
+DROP INDEX IF EXISTS stocks_symbol_date_key;
+
+CREATE UNIQUE INDEX stocks_symbol_date_key
+    ON stocks (symbol, date)
+    INCLUDE (open, high, low, close, close_norm);
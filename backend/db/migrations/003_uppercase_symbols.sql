@@ -0,0 +1,44 @@
+-- Store every symbol in upper case, so routers can compare with
+-- symbol = UPPER(%s) (which uses the index) instead of LOWER(symbol) = LOWER(%s).
+
+-- Keep one row per (upper-case symbol, date) across all case variants
+-- (e.g. "nabil" and "Nabil" on the same day with no "NABIL" row),
+-- preferring the row that is already upper case
+DELETE FROM stocks a
+USING (
+    SELECT ctid, ROW_NUMBER() OVER (
+        PARTITION BY UPPER(TRIM(symbol)), date
+        ORDER BY symbol = UPPER(TRIM(symbol)) DESC, symbol
+    ) AS n
+    FROM stocks
+) d
+WHERE a.ctid = d.ctid
+  AND d.n > 1;
+
+UPDATE stocks
+SET symbol = UPPER(TRIM(symbol))
+WHERE symbol <> UPPER(TRIM(symbol));
+
+DELETE FROM stock_info a
+USING (
+    SELECT ctid, ROW_NUMBER() OVER (
+        PARTITION BY UPPER(TRIM(symbol))
+        ORDER BY symbol = UPPER(TRIM(symbol)) DESC, symbol
+    ) AS n
+    FROM stock_info
+) d
+WHERE a.ctid = d.ctid
+  AND d.n > 1;
+
+UPDATE stock_info
+SET symbol = UPPER(TRIM(symbol))
+WHERE symbol <> UPPER(TRIM(symbol));
+
+-- Keep it that way
+ALTER TABLE stocks
+    ADD CONSTRAINT stocks_symbol_upper CHECK (symbol = UPPER(symbol));
+ALTER TABLE stock_info
+    ADD CONSTRAINT stock_info_symbol_upper CHECK (symbol = UPPER(symbol));
+
+-- Used by /api/companies-by-category
+CREATE INDEX IF NOT EXISTS stock_info_category_idx ON stock_info (category);
@@ -0,0 +1,33 @@
+-- Weekly, monthly and quarterly OHLC bars per symbol, so long-range charts
+-- read a few hundred pre-aggregated rows instead of resampling every day.
+-- Kept up to date by db/load_csv_to_db.py and db/ingest_daemon.py (see db/rollups.py).
+
+CREATE TABLE IF NOT EXISTS stock_rollups (
+    symbol TEXT NOT NULL,
+    bucket TEXT NOT NULL CHECK (bucket IN ('1W', '1M', '1Q')),
+    period_start DATE NOT NULL,   -- Monday / first day of the month / quarter
+    period_end DATE NOT NULL,     -- last trading day in the period
+    open NUMERIC,
+    high NUMERIC,
+    low NUMERIC,
+    close NUMERIC,
+    close_norm NUMERIC,
+    PRIMARY KEY (symbol, bucket, period_start)
+);
+
+-- Build the rollups of the rows already loaded
+INSERT INTO stock_rollups (symbol, bucket, period_start, period_end, open, high, low, close, close_norm)
+SELECT
+    s.symbol,
+    b.bucket,
+    date_trunc(b.unit, s.date::timestamp)::date AS period_start,
+    MAX(s.date),
+    (ARRAY_AGG(s.open ORDER BY s.date) FILTER (WHERE s.open IS NOT NULL))[1],
+    MAX(s.high),
+    MIN(s.low),
+    (ARRAY_AGG(s.close ORDER BY s.date DESC) FILTER (WHERE s.close IS NOT NULL))[1],
+    (ARRAY_AGG(s.close_norm ORDER BY s.date DESC) FILTER (WHERE s.close_norm IS NOT NULL))[1]
+FROM stocks s
+CROSS JOIN (VALUES ('1W', 'week'), ('1M', 'month'), ('1Q', 'quarter')) AS b(bucket, unit)
+GROUP BY s.symbol, b.bucket, period_start
+ON CONFLICT (symbol, bucket, period_start) DO NOTHING;
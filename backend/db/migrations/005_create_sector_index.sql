@@ -0,0 +1,11 @@
+-- Equal-weighted index per sector (stock_info.category), one row per trading day.
+-- Built and extended by db/sector_indices.py; served by /api/sectors.
+
+CREATE TABLE IF NOT EXISTS sector_index (
+    category TEXT NOT NULL,
+    date DATE NOT NULL,
+    value DOUBLE PRECISION NOT NULL,        -- starts at 100 on the sector's first day
+    daily_return DOUBLE PRECISION NOT NULL, -- mean close_norm return of the members that traded
+    members INTEGER NOT NULL,               -- members with a return on this day
+    PRIMARY KEY (category, date)
+);
@@ -0,0 +1,47 @@
+-- Optional: turn stocks into a table partitioned by year.
+-- Queries for recent timeframes then only touch the latest partitions.
+-- Run with: python migrate.py --partition-by-year
+
+CREATE TABLE stocks_partitioned (
+    date DATE NOT NULL,
+    symbol TEXT NOT NULL CHECK (symbol = UPPER(symbol)),
+    open NUMERIC,
+    high NUMERIC,
+    low NUMERIC,
+    close NUMERIC,
+    close_norm NUMERIC
+) PARTITION BY RANGE (date);
+
+-- One partition per year present in the data, plus the next year
+DO $$
+DECLARE
+    y INT;
+    first_year INT;
+    last_year INT;
+BEGIN
+    SELECT COALESCE(EXTRACT(YEAR FROM MIN(date)), EXTRACT(YEAR FROM NOW())),
+           COALESCE(EXTRACT(YEAR FROM MAX(date)), EXTRACT(YEAR FROM NOW())) + 1
+    INTO first_year, last_year
+    FROM stocks;
+
+    FOR y IN first_year..last_year LOOP
+        EXECUTE format(
+            'CREATE TABLE stocks_y%s PARTITION OF stocks_partitioned FOR VALUES FROM (%L) TO (%L)',
+            y, make_date(y, 1, 1), make_date(y + 1, 1, 1)
+        );
+    END LOOP;
+END $$;
+
+-- Rows outside the yearly partitions (e.g. future years) land here
+CREATE TABLE stocks_default PARTITION OF stocks_partitioned DEFAULT;
+
+INSERT INTO stocks_partitioned (date, symbol, open, high, low, close, close_norm)
+SELECT date, symbol, open, high, low, close, close_norm FROM stocks;
+
+ALTER TABLE stocks RENAME TO stocks_unpartitioned;
+ALTER INDEX stocks_symbol_date_key RENAME TO stocks_unpartitioned_symbol_date_key;
+ALTER TABLE stocks_partitioned RENAME TO stocks;
+
+CREATE UNIQUE INDEX stocks_symbol_date_key
+    ON stocks (symbol, date)
+    INCLUDE (open, high, low, close, close_norm);
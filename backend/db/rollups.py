@@ -0,0 +1,102 @@
+"""
+rollups.py
+
+Maintains `stock_rollups`: weekly (1W), monthly (1M) and quarterly (1Q)
+OHLC bars per symbol, served by /api/stocks?interval=...
+
+Bars use the same aggregation as resample() in routers/analysis.py:
+first open, max high, min low, last close / close_norm (NULLs skipped).
+Weeks run Monday to Sunday.
+
+The loaders call refresh_rollups() inside their own transaction, so the
+rollups change together with the daily rows:
+- db/load_csv_to_db.py rebuilds every symbol
+- db/ingest_daemon.py only rebuilds the periods touched by new rows
+
+Usage:
+    python rollups.py                    # rebuild everything
+    python rollups.py --symbols NABIL    # rebuild some symbols
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import argparse
+import time
+
+import psycopg2
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from core.database import DB_CONFIG
+from db.migrate import run_migrations
+
+# Rollup name -> date_trunc unit
+BUCKETS = {"1W": "week", "1M": "month", "1Q": "quarter"}
+
+# Recompute the rollups of some symbols (NULL = all) from the period
+# containing `since` (NULL = all history) onwards
+REFRESH_ROLLUPS_SQL = """
+INSERT INTO stock_rollups (symbol, bucket, period_start, period_end, open, high, low, close, close_norm)
+SELECT
+    s.symbol,
+    b.bucket,
+    date_trunc(b.unit, s.date::timestamp)::date AS period_start,
+    MAX(s.date),
+    (ARRAY_AGG(s.open ORDER BY s.date) FILTER (WHERE s.open IS NOT NULL))[1],
+    MAX(s.high),
+    MIN(s.low),
+    (ARRAY_AGG(s.close ORDER BY s.date DESC) FILTER (WHERE s.close IS NOT NULL))[1],
+    (ARRAY_AGG(s.close_norm ORDER BY s.date DESC) FILTER (WHERE s.close_norm IS NOT NULL))[1]
+FROM stocks s
+CROSS JOIN (VALUES ('1W', 'week'), ('1M', 'month'), ('1Q', 'quarter')) AS b(bucket, unit)
+WHERE (%(symbols)s::text[] IS NULL OR s.symbol = ANY(%(symbols)s::text[]))
+  AND (%(since)s::date IS NULL OR s.date >= date_trunc(b.unit, %(since)s::date::timestamp)::date)
+GROUP BY s.symbol, b.bucket, period_start
+ON CONFLICT (symbol, bucket, period_start) DO UPDATE SET
+    period_end = EXCLUDED.period_end,
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    close_norm = EXCLUDED.close_norm
+"""
+
+
+def refresh_rollups(cur, symbols=None, since=None):
+    """
+    Recompute rollups on the caller's cursor (and transaction).
+
+    Args:
+        cur: psycopg2 cursor
+        symbols (list): symbols to refresh (None = all)
+        since (date or str): first new trading day (None = full history)
+    """
+    cur.execute(REFRESH_ROLLUPS_SQL, {
+        "symbols": list(symbols) if symbols is not None else None,
+        "since": str(since) if since is not None else None,
+    })
+    return cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the weekly/monthly/quarterly rollups")
+    parser.add_argument("--symbols", nargs="*", help="Symbols to rebuild (default: all)")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        run_migrations(conn)
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            rows = refresh_rollups(cur, [s.upper() for s in args.symbols] if args.symbols else None)
+        conn.commit()
+        print(f"Rebuilt {rows} rollup rows in {time.perf_counter() - start:.2f}s")
+    finally:
+        conn.close()
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+sector_indices.py
+
+Maintains `sector_index`: one equal-weighted index per sector
+(stock_info.category).
+
+Each day, the sector's return is the average close_norm return of its
+members that traded that day (a member's return is measured against its
+previous bar, so gaps do not drop moves). The index starts at 100 and
+compounds those returns:
+
+    value[t] = value[t-1] * (1 + mean member return[t])
+
+All sectors are computed together: the (days x symbols) returns matrix is
+multiplied by a (symbols x sectors) membership matrix, which gives every
+sector's sum of returns and member count in one product.
+
+- db/load_csv_to_db.py rebuilds the whole table
+- db/ingest_daemon.py recomputes the days touched by the new rows (a day
+  may arrive in several files), chaining from the last stored value before them
+
+Usage:
+    python sector_indices.py             # rebuild everything
+"""
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from core.database import DB_CONFIG
+from db.migrate import run_migrations
+
+# Value of every index on its first day
+BASE_VALUE = 100.0
+
+# Member prices for a full rebuild
+ALL_PRICES_SQL = """
+    SELECT s.date, s.symbol, si.category, s.close_norm
+    FROM stocks s
+    JOIN stock_info si ON si.symbol = s.symbol
+    WHERE s.close_norm IS NOT NULL AND si.category IS NOT NULL
+"""
+
+# Member prices after `since`, plus each member's last bar on or before it
+# (the reference price for its first new return)
+PRICES_SINCE_SQL = """
+    SELECT s.date, s.symbol, si.category, s.close_norm
+    FROM stocks s
+    JOIN stock_info si ON si.symbol = s.symbol
+    WHERE s.date > %(since)s AND s.close_norm IS NOT NULL AND si.category IS NOT NULL
+    UNION ALL
+    SELECT last.date, si.symbol, si.category, last.close_norm
+    FROM stock_info si
+    JOIN LATERAL (
+        SELECT date, close_norm FROM stocks
+        WHERE symbol = si.symbol AND date <= %(since)s AND close_norm IS NOT NULL
+        ORDER BY date DESC
+        LIMIT 1
+    ) last ON TRUE
+    WHERE si.category IS NOT NULL
+"""
+
+# Last stored value of every sector before a date (NULL = latest)
+LAST_VALUES_SQL = """
+    SELECT DISTINCT ON (category) category, date, value
+    FROM sector_index
+    WHERE %(before)s::date IS NULL OR date < %(before)s::date
+    ORDER BY category, date DESC
+"""
+
+UPSERT_SQL = """
+    INSERT INTO sector_index (category, date, value, daily_return, members)
+    VALUES %s
+    ON CONFLICT (category, date) DO UPDATE SET
+        value = EXCLUDED.value,
+        daily_return = EXCLUDED.daily_return,
+        members = EXCLUDED.members
+"""
+
+
+def sector_returns(df: pd.DataFrame):
+    """
+    Daily equal-weighted returns of every sector.
+
+    Args:
+        df (pd.DataFrame): date, symbol, category, close_norm
+
+    Returns:
+        dates (pd.Index), categories (list), returns (days x sectors),
+        members (days x sectors), traded (days x sectors, members with a bar)
+    """
+    prices = df.pivot(index="date", columns="symbol", values="close_norm").sort_index()
+    symbol_category = df.drop_duplicates("symbol").set_index("symbol")["category"]
+    categories = sorted(symbol_category.unique())
+
+    # Membership matrix: symbols x sectors
+    codes = pd.Categorical(symbol_category.reindex(prices.columns), categories=categories).codes
+    membership = np.zeros((len(codes), len(categories)))
+    membership[np.arange(len(codes)), codes] = 1.0
+
+    values = prices.to_numpy(dtype=np.float64)
+    has_bar = ~np.isnan(values)
+    # Return against the member's previous bar, however old
+    previous = pd.DataFrame(values).ffill().shift(1).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = values / previous - 1
+    valid = has_bar & np.isfinite(returns)
+
+    sums = np.where(valid, returns, 0.0) @ membership
+    members = valid.astype(np.float64) @ membership
+    traded = has_bar.astype(np.float64) @ membership
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_returns = np.where(members > 0, sums / members, 0.0)
+    return prices.index, categories, mean_returns, members.astype(np.int64), traded
+
+
+def index_rows(dates, categories, mean_returns, members, start_values, keep):
+    """
+    Compound the returns into index values.
+
+    Args:
+        start_values (np.ndarray): value before the first day, per sector
+        keep (np.ndarray): days x sectors mask of rows to store
+
+    Returns:
+        list: (category, date, value, daily_return, members) tuples
+    """
+    values = start_values * np.cumprod(1 + mean_returns, axis=0)
+    day_idx, sector_idx = np.nonzero(keep)
+    return [
+        (categories[s], dates[d], float(values[d, s]), float(mean_returns[d, s]), int(members[d, s]))
+        for d, s in zip(day_idx, sector_idx)
+    ]
+
+
+def read_frame(cur, sql, params=None):
+    cur.execute(sql, params)
+    return pd.DataFrame.from_records(
+        cur.fetchall(), columns=["date", "symbol", "category", "close_norm"], coerce_float=True
+    )
+
+
+def rebuild_sector_indices(cur):
+    """Recompute every sector index from the full history (caller's transaction)."""
+    df = read_frame(cur, ALL_PRICES_SQL)
+    cur.execute("DELETE FROM sector_index")
+    if df.empty:
+        return 0
+
+    dates, categories, mean_returns, members, traded = sector_returns(df)
+    # A sector starts on the first day any member traded
+    started = np.cumsum(traded, axis=0) > 0
+    rows = index_rows(dates, categories, mean_returns, members, np.full(len(categories), BASE_VALUE), started)
+    execute_values(cur, UPSERT_SQL, rows, page_size=5000)
+    return len(rows)
+
+
+def extend_sector_indices(cur, from_date=None):
+    """
+    Recompute the days from `from_date` on (default: the days after the
+    last stored one) in the caller's transaction.
+    Falls back to a full rebuild when there is nothing to chain from.
+    """
+    cur.execute(LAST_VALUES_SQL, {"before": str(from_date) if from_date else None})
+    last = {category: (day, value) for category, day, value in cur.fetchall()}
+    if not last:
+        return rebuild_sector_indices(cur)
+
+    since = max(day for day, _ in last.values())
+    df = read_frame(cur, PRICES_SINCE_SQL, {"since": since})
+    if df.empty or not (df["date"] > since).any():
+        return 0
+
+    dates, categories, mean_returns, members, traded = sector_returns(df)
+    new_days = np.asarray(dates > since)
+    dates = dates[new_days]
+    mean_returns, members, traded = mean_returns[new_days], members[new_days], traded[new_days]
+
+    # Known sectors continue from their last value; a new sector starts at
+    # BASE_VALUE on its first traded day (a full rebuild also adds its history)
+    start_values = np.array([last.get(c, (None, BASE_VALUE))[1] for c in categories])
+    known = np.array([c in last for c in categories])
+    keep = known[np.newaxis, :] | (np.cumsum(traded, axis=0) > 0)
+    rows = index_rows(dates, categories, mean_returns, members, start_values, keep)
+    execute_values(cur, UPSERT_SQL, rows, page_size=5000)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the sector indices")
+    parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        run_migrations(conn)
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            rows = rebuild_sector_indices(cur)
+        conn.commit()
+        print(f"Rebuilt {rows} sector index rows in {time.perf_counter() - start:.2f}s")
+    finally:
+        conn.close()
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
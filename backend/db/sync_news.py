@@ -0,0 +1,40 @@
+import sys  # Provides access to system-specific parameters and functions
+import os   # Provides functions to interact with the operating system
+import time
+import argparse
+
+# Make backend folder discoverable so Python can import modules from parent directories
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory of this script
+PARENT_DIR = os.path.dirname(BASE_DIR)                 # Backend directory
+sys.path.append(PARENT_DIR)
+
+from utils.news_store import ensure_news_tables, sync_news  # Incremental news sync
+
+
+def main():
+    """
+    Sync job for the local news archive.
+
+    Examples:
+    python sync_news.py                      # fetch only posts newer than the archive
+    python sync_news.py --backfill           # page back into older history
+    python sync_news.py --interval 300       # keep syncing every 5 minutes
+    """
+    parser = argparse.ArgumentParser(description="Sync ShareHub Nepal news into the local archive")
+    parser.add_argument("--max-pages", type=int, default=50, help="Maximum upstream pages per run")
+    parser.add_argument("--backfill", action="store_true", help="Fetch posts older than the archive")
+    parser.add_argument("--interval", type=int, default=0, help="Repeat every N seconds (0 = run once)")
+    args = parser.parse_args()
+
+    ensure_news_tables()
+    while True:
+        stored = sync_news(max_pages=args.max_pages, backfill=args.backfill)
+        print(f"{stored} news posts stored.")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+# Run main() if this script is executed directly
+if __name__ == "__main__":
+    main()
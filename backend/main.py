@@ -1,9 +1,24 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
+from starlette.routing import Match
 from fastapi.middleware.cors import CORSMiddleware
 from routers import analysis, stocks, auth, technical_status
 from routers.predictions import router as lstm_predict  # Router for LSTM predictions
+from routers.predictions import model_cache  # Loaded models, hot-reloaded from the model registry
 from routers.market_movers import router as market_movers_router  # Router for market movers
 from routers.news import router as news_router  # Router for news endpoints
+from routers.stream import router as stream_router  # Router for WebSocket/SSE streaming
+from routers.compare import router as compare_router  # Router for multi-symbol overlays
+from routers.correlations import router as correlations_router  # Router for return correlations
+from routers.sectors import router as sectors_router  # Router for sector indices
+from core.security import password_pool  # Process pool used for password hashing
+from core.inference_pool import inference_pool  # Thread pool used for predictions
+from core.metrics import REQUEST_SECONDS, current_route  # Request timing for /metrics
+from routers.metrics import router as metrics_router  # Prometheus scrape endpoint
+from core.profiling import install_profiling  # On-demand request profiling (needs PROFILE_TOKEN)
+from utils.events import start_event_listener, stop_event_listener  # "symbols updated" events from ingest
+from utils.news_store import ensure_news_tables  # News archive tables
 
 # Create FastAPI app instance
 app = FastAPI()
@@ -16,6 +31,27 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Time every request and label it with its route template (e.g. /api/stocks)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    route = "unmatched"
+    for r in app.routes:
+        match, _ = r.matches(request.scope)
+        if match == Match.FULL:
+            route = r.path
+            break
+    # Spans recorded inside the endpoint are labelled with this route
+    current_route.set(route)
+
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route, str(status))
+
 # Include router (handles  endpoints)
 app.include_router(analysis.router)
 app.include_router(stocks.router)
@@ -27,3 +63,33 @@ app.include_router(lstm_predict, prefix="/api")
 app.include_router(market_movers_router, prefix="/api")
 # Include news router (fetches news, no API prefix)
 app.include_router(news_router)  # no redirect_slashes parameter
+# Include streaming router (live bars, indicators and movers)
+app.include_router(stream_router)
+# Include compare router (aligned multi-symbol series)
+app.include_router(compare_router)
+# Include correlations router (market-wide correlation matrix and peers)
+app.include_router(correlations_router)
+# Include sectors router (equal-weighted sector indices)
+app.include_router(sectors_router)
+# Include metrics router (Prometheus scrape endpoint at /metrics)
+app.include_router(metrics_router)
+
+# Enable on-demand profiling; does nothing unless PROFILE_TOKEN is set
+install_profiling(app)
+
+
+# Create the news archive tables, listen for "symbols updated" events so
+# caches can refresh, and watch for newly published model versions
+@app.on_event("startup")
+def startup_event_listener():
+    ensure_news_tables()
+    start_event_listener()
+    model_cache.start_watching()
+
+# Stop the password hashing and inference workers and the event listener when the server shuts down
+@app.on_event("shutdown")
+def shutdown_background_workers():
+    password_pool.shutdown()
+    inference_pool.shutdown()
+    stop_event_listener()
+    model_cache.stop_watching()
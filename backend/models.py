@@ -3,7 +3,7 @@ Each class represents a table in the database.
 Columns in the class represent fields in the table.
 """
 # Import required SQLAlchemy classes for defining database columns and types
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Date, Float, Text, Index, func
 
 # Import the Base class from your core database setup
 # Base is the declarative base class that all models inherit from
@@ -33,3 +33,109 @@ class User(Base):
 
     # Timestamp when the user was last updated, automatically updates on row update
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Define a StockInfo model that represents the "stock_info" table
+class StockInfo(Base):
+    """
+    StockInfo holds one row per listed company.
+    """
+    __tablename__ = "stock_info"
+
+    # Stock symbol, always stored in upper case (e.g. NABIL)
+    symbol = Column(Text, primary_key=True)
+
+    # Company name, "Unknown Company" if it is not in the company list
+    company_name = Column(Text)
+
+    # Sector of the company, "Others" if unknown
+    category = Column(Text, index=True)
+
+
+# Define a Stock model that represents the "stocks" table (daily prices)
+class Stock(Base):
+    """
+    Stock holds one daily OHLC bar per symbol.
+    (symbol, date) is unique; see db/migrations for the index definitions.
+    """
+    __tablename__ = "stocks"
+    __table_args__ = (
+        # Unique key used by ON CONFLICT. INCLUDE makes it a covering index,
+        # so price queries for one symbol are answered by index-only scans.
+        Index(
+            "stocks_symbol_date_key",
+            "symbol",
+            "date",
+            unique=True,
+            postgresql_include=["open", "high", "low", "close", "close_norm"],
+        ),
+    )
+
+    # Stock symbol, always stored in upper case
+    symbol = Column(Text, primary_key=True)
+
+    # Trading day
+    date = Column(Date, primary_key=True)
+
+    # Daily prices
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+
+    # Close divided by the symbol's first close (1.0 on the first day)
+    close_norm = Column(Float)
+
+
+# Define a StockRollup model that represents the "stock_rollups" table
+class StockRollup(Base):
+    """
+    StockRollup holds weekly (1W), monthly (1M) and quarterly (1Q) OHLC
+    bars per symbol, maintained by db/rollups.py.
+    """
+    __tablename__ = "stock_rollups"
+
+    # Stock symbol, always stored in upper case
+    symbol = Column(Text, primary_key=True)
+
+    # Rollup size: 1W, 1M or 1Q
+    bucket = Column(Text, primary_key=True)
+
+    # First calendar day of the period (Monday for weeks)
+    period_start = Column(Date, primary_key=True)
+
+    # Last trading day in the period
+    period_end = Column(Date, nullable=False)
+
+    # Period prices: first open, highest high, lowest low, last close
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+
+    # close_norm of the last trading day
+    close_norm = Column(Float)
+
+
+# Define a SectorIndex model that represents the "sector_index" table
+class SectorIndex(Base):
+    """
+    SectorIndex holds one equal-weighted index value per sector and
+    trading day, maintained by db/sector_indices.py.
+    """
+    __tablename__ = "sector_index"
+
+    # Sector name (stock_info.category)
+    category = Column(Text, primary_key=True)
+
+    # Trading day
+    date = Column(Date, primary_key=True)
+
+    # Index value, 100 on the sector's first day
+    value = Column(Float, nullable=False)
+
+    # Mean close_norm return of the members that traded this day
+    daily_return = Column(Float, nullable=False)
+
+    # Number of members with a return this day
+    members = Column(Integer, nullable=False)
@@ -7,12 +7,26 @@ based on timeframe, and calculates technical indicators
 like RSI, EMA, and Bollinger Bands.
 """
 
+from typing import Optional
+
 # Import FastAPI router to define API routes
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
 # Import database connection helper
 from core.database import get_db_connection
 
+# Timing spans exported on /metrics
+from core.metrics import span
+
+# Identical concurrent requests share one computation
+from core.singleflight import coalesce
+
+# Thins long histories down to what a chart can draw
+from utils import downsampling
+
+# Days covered by each timeframe (shared by all routers)
+from utils.timeframes import TIMEFRAME_DAYS
+
 import pandas as pd
 
 import numpy as np
@@ -20,6 +34,24 @@ import numpy as np
 # Create an API router with a URL prefix and tag
 router = APIRouter(prefix="/api", tags=["Analysis"])
 
+# SQL query to fetch stock data
+# Symbols are stored in upper case, so UPPER(%s) lets Postgres use
+# the (symbol, date) index instead of lower-casing every row
+STOCK_HISTORY_SQL = """
+    SELECT date, symbol, open, high, low, close, close_norm
+    FROM stocks
+    WHERE symbol = UPPER(%s)
+    ORDER BY date ASC
+"""
+
+# Pre-aggregated weekly / monthly / quarterly bars (see db/rollups.py),
+# labelled with the first day of each period
+ROLLUP_HISTORY_SQL = """
+    SELECT period_start AS date, symbol, open, high, low, close, close_norm, period_end
+    FROM stock_rollups
+    WHERE symbol = UPPER(%s) AND bucket = %s
+    ORDER BY period_start ASC
+"""
 
 # -------------------------------------------------------------------
 # Helper Functions
@@ -93,14 +125,6 @@ def resample_data(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
     df = df.sort_values("date")
     df.set_index("date", inplace=True)
 
-    days_map = {
-        "1D": 1,
-        "6M": 180,
-        "1Y": 365,
-        "3Y": 1095,
-        "5Y": 1825
-    }
-
     if timeframe == "1W":
         df_resampled = df.resample("W").agg({
             "open": "first",
@@ -119,14 +143,30 @@ def resample_data(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
             "close_norm": "last"
         })
         df_resampled = df_resampled.tail(30)  # last 30 days only
-    elif timeframe in days_map:
-        df_resampled = df.tail(days_map[timeframe])
+    elif timeframe in TIMEFRAME_DAYS:
+        # Calendar days up to the latest bar, like fetch_rollups() and the SQL windows
+        cutoff = df.index.max() - pd.Timedelta(days=TIMEFRAME_DAYS[timeframe])
+        df_resampled = df[df.index > cutoff].copy()
     else:
         df_resampled = df.copy()  # ALL data
 
-    # -------------------------
-    # Technical Indicators
-    # -------------------------
+    df_resampled = add_indicators(df_resampled)
+
+    df_resampled.reset_index(inplace=True)
+    return clean_dataframe(df_resampled)
+
+
+"""
+This function adds the technical indicators to OHLC bars
+(daily bars or pre-aggregated rollups):
+- Average price
+- Price change %
+- Moving averages
+- EMA
+- RSI
+- Bollinger Bands
+"""
+def add_indicators(df_resampled: pd.DataFrame) -> pd.DataFrame:
     df_resampled["avg_price"] = (df_resampled["high"] + df_resampled["low"]) / 2
     df_resampled["price_change"] = df_resampled["close"].pct_change(fill_method=None) * 100
     df_resampled["price_change"] = df_resampled["price_change"].replace([np.inf, -np.inf, np.nan], 0)
@@ -135,9 +175,32 @@ def resample_data(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
     df_resampled["EMA26"] = df_resampled["close"].ewm(span=26).mean()
     df_resampled["RSI14"] = calculate_rsi(df_resampled["close"])
     df_resampled["BB_UPPER"], df_resampled["BB_LOWER"], df_resampled["BB_MA20"] = calculate_bollinger(df_resampled["close"])
+    return df_resampled
 
-    df_resampled.reset_index(inplace=True)
-    return clean_dataframe(df_resampled)
+
+"""
+This function reads pre-aggregated bars from the rollup table and
+keeps the periods that fall inside the timeframe.
+"""
+def fetch_rollups(symbol: str, interval: str, timeframe: str) -> pd.DataFrame:
+    with span("db_connect"):
+        conn = get_db_connection()
+    with span("query"):
+        cur = conn.cursor()
+        cur.execute(ROLLUP_HISTORY_SQL, (symbol, interval))
+        rows = cur.fetchall()
+        columns = [c[0] for c in cur.description]
+        cur.close()
+        conn.close()
+    with span("dataframe_build"):
+        df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+    # Calendar days covered by the timeframe (others = ALL)
+    if df.empty or timeframe not in TIMEFRAME_DAYS:
+        return df
+    period_end = pd.to_datetime(df["period_end"])
+    cutoff = period_end.max() - pd.Timedelta(days=TIMEFRAME_DAYS[timeframe])
+    return df[period_end > cutoff].reset_index(drop=True)
 
 
 
@@ -152,32 +215,71 @@ GET /api/stocks
 Query Parameters:
 - symbol: Stock symbol (default: NEPSE)
 - timeframe: Time range for data (default: 1Y)
+- interval: Optional bar size 1W, 1M or 1Q, served from the
+  pre-aggregated rollup table instead of daily rows
+- max_points: Optional maximum number of records; longer results are
+  downsampled after the indicators are computed
+- downsample: "lttb" (keeps the visually important rows, for line charts)
+  or "ohlc" (merges rows into bars, for candlesticks)
 
 Returns:
 - List of stock records with technical indicators
 """
 @router.get("/stocks")
-def get_stock(symbol: str = "NEPSE", timeframe: str = "1Y"):
-    conn = get_db_connection()
-
-    # SQL query to fetch stock data
-    query = """
-        SELECT date, symbol, open, high, low, close, close_norm
-        FROM stocks
-        WHERE LOWER(symbol) = LOWER(%s)
-        ORDER BY date ASC
-    """
-
-    # Load SQL result into a Pandas DataFrame
-    df = pd.read_sql(query, conn, params=(symbol,))
-    conn.close()
+@coalesce(
+    "stocks",
+    key=lambda symbol="NEPSE", timeframe="1Y", interval=None, max_points=None, downsample="lttb":
+        (symbol.upper(), timeframe, interval, max_points, downsample),
+)
+def get_stock(
+    symbol: str = "NEPSE",
+    timeframe: str = "1Y",
+    interval: Optional[str] = Query(None, pattern="^(1W|1M|1Q)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    downsample: str = Query("lttb", pattern="^(lttb|ohlc)$"),
+):
+    if interval:
+        df = fetch_rollups(symbol, interval, timeframe)
+        if df.empty:
+            return {"message": f"No data found for symbol {symbol}", "records": []}
+        with span("indicators"):
+            df_filtered = clean_dataframe(add_indicators(df))
+        return serialize_records(df_filtered, max_points, downsample)
+
+    with span("db_connect"):
+        conn = get_db_connection()
+
+    # Run the query, then load the rows into a Pandas DataFrame
+    with span("query"):
+        cur = conn.cursor()
+        cur.execute(STOCK_HISTORY_SQL, (symbol,))
+        rows = cur.fetchall()
+        columns = [c[0] for c in cur.description]
+        cur.close()
+        conn.close()
+    with span("dataframe_build"):
+        df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
 
     # Handle case when no data is found
     if df.empty:
         return {"message": f"No data found for symbol {symbol}", "records": []}
 
     # Apply resampling and indicator calculations
-    df_filtered = resample_data(df, timeframe)
+    with span("indicators"):
+        df_filtered = resample_data(df, timeframe)
 
-    # Convert DataFrame to JSON-friendly format
-    return {"records": df_filtered.to_dict(orient="records")}
+    return serialize_records(df_filtered, max_points, downsample)
+
+
+"""
+This function downsamples the records if max_points is set
+and converts them to a JSON-friendly format.
+"""
+def serialize_records(df: pd.DataFrame, max_points=None, method="lttb"):
+    if max_points and len(df) > max_points:
+        with span("downsample"):
+            df = clean_dataframe(downsampling.downsample(df, max_points, method))
+
+    with span("serialization"):
+        records = df.to_dict(orient="records")
+    return {"records": records}
@@ -1,18 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException  # FastAPI tools: APIRouter to group routes, Depends for dependencies, HTTPException to raise errors
+from starlette.concurrency import run_in_threadpool  # Run blocking DB calls without blocking the event loop
 from sqlalchemy.orm import Session  # SQLAlchemy session to interact with the database
 from core.database import SessionLocal  # Function to create a new database session
+from core.security import (  # Argon2 hashing, run on a dedicated process pool
+    hash_password,
+    verify_and_update,
+    password_pool,
+    PasswordPoolBusy,
+)
+from core.tokens import (  # Signed access/refresh tokens
+    CurrentUser,
+    InvalidToken,
+    decode_token,
+    get_current_user,
+    issue_tokens,
+)
 from models import User  # Import User model which represents users in the database
-from schemas import UserCreate, UserResponse, UserLogin  # Schemas for input/output validation for signup/login
-from passlib.context import CryptContext  # Tool for hashing and verifying passwords securely
-from passlib.exc import UnknownHashError  # Exception to catch invalid or unknown password hashes
+from schemas import (  # Schemas for input/output validation for signup/login
+    UserCreate,
+    UserResponse,
+    UserLogin,
+    LoginResponse,
+    RefreshRequest,
+    TokenResponse,
+)
 
 router = APIRouter(prefix="/auth", tags=["Auth"])  # Create a group of routes for authentication
 
-# ------------------------
-# Password hashing setup
-# ------------------------
-# Use Argon2 to safely store passwords
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")  # This will hash and verify passwords
+# Seconds a client should wait before retrying when the hashing pool is full
+RETRY_AFTER_SECONDS = "1"
 
 # ------------------------
 # Database dependency
@@ -26,60 +42,108 @@ def get_db():
         db.close()  # Close the session when done
 
 # ------------------------
-# Hash password safely
-# ------------------------
-def hash_password(password: str) -> str:
-    """Turn a plain password into a secure hashed password"""
-    return pwd_context.hash(password)  # Hash the password with Argon2
-
-# ------------------------
-# Verify password safely
+# Run a hashing job on the password pool
 # ------------------------
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def run_hashing(fn, *args):
     """
-    Check if a plain password matches the hashed password.
-    If the hash is broken or unknown, return False.
+    Run Argon2 work on the password pool.
+    If too many hashes are already queued, answer 503 instead of waiting.
     """
     try:
-        return pwd_context.verify(plain_password, hashed_password)  # Check password
-    except UnknownHashError:
-        # If the hash is invalid, don't crash, just say False
-        return False
+        return await password_pool.run(fn, *args)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": RETRY_AFTER_SECONDS},
+        )
 
 # ------------------------
 # Signup endpoint
 # ------------------------
 @router.post("/signup", response_model=UserResponse)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
     """Create a new user account"""
-    existing_user = db.query(User).filter(User.email == user.email).first()  # Check if email exists
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == user.email).first()
+    )  # Check if email exists
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")  # Stop if email taken
 
     new_user = User(
         full_name=user.full_name,
         email=user.email,
-        password=hash_password(user.password)  # Hash password before saving
+        password=await run_hashing(hash_password, user.password)  # Hash password before saving
     )
 
-    db.add(new_user)  # Add the new user to the database
-    db.commit()  # Save changes
-    db.refresh(new_user)  # Get updated user info from the database
+    def save():
+        db.add(new_user)  # Add the new user to the database
+        db.commit()  # Save changes
+        db.refresh(new_user)  # Get updated user info from the database
+
+    await run_in_threadpool(save)
 
     return new_user  # Return the created user
 
 # ------------------------
 # Login endpoint
 # ------------------------
-@router.post("/login", response_model=UserResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=LoginResponse)
+async def login(user: UserLogin, db: Session = Depends(get_db)):
     """
     Log in a user using email and password.
-    Returns user info if correct, error if wrong.
+    Returns user info plus access and refresh tokens if correct, error if wrong.
+    The password is only checked here; later requests send the access token.
     """
-    db_user = db.query(User).filter(User.email == user.email).first()  # Find user by email
+    db_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == user.email).first()
+    )  # Find user by email
+
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Invalid credentials")  # Stop if email is unknown
+
+    valid, new_hash = await run_hashing(verify_and_update, user.password, db_user.password)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid credentials")  # Stop if wrong password
+
+    # The stored hash used old Argon2 parameters, so upgrade it transparently
+    if new_hash:
+        def rehash():
+            db_user.password = new_hash
+            db.commit()
+            db.refresh(db_user)
+
+        await run_in_threadpool(rehash)
 
-    if not db_user or not verify_password(user.password, db_user.password):
-        raise HTTPException(status_code=400, detail="Invalid credentials")  # Stop if wrong password or email
+    # Return the logged-in user together with its tokens
+    return {
+        "id": db_user.id,
+        "full_name": db_user.full_name,
+        "email": db_user.email,
+        **issue_tokens(db_user),
+    }
 
-    return db_user  # Return the logged-in user
+# ------------------------
+# Refresh endpoint
+# ------------------------
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(body: RefreshRequest):
+    """
+    Exchange a valid refresh token for a new access token (and a new refresh token).
+    No password and no database access needed.
+    """
+    try:
+        claims = decode_token(body.refresh_token, "refresh")
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    user = CurrentUser(id=claims["sub"], full_name=claims["name"], email=claims["email"])
+    return issue_tokens(user)
+
+# ------------------------
+# Current user endpoint
+# ------------------------
+@router.get("/me", response_model=UserResponse)
+def me(current_user: CurrentUser = Depends(get_current_user)):
+    """Return the user identified by the access token."""
+    return current_user
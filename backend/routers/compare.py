@@ -0,0 +1,106 @@
+"""
+compare.py
+
+Overlay of several stocks on one chart.
+
+GET /api/compare?symbols=NABIL,NICA,NEPSE&timeframe=1Y fetches every
+series in one query, aligns them on a shared date index and rebases
+close_norm so each series starts at 1.0 on the first day of the window.
+"""
+from fastapi import APIRouter, HTTPException, Query
+import numpy as np
+import pandas as pd
+
+from core.database import get_db_connection
+from core.metrics import span  # Timing spans exported on /metrics
+from utils.timeframes import TIMEFRAME_DAYS  # Days covered by each timeframe (others = ALL)
+
+router = APIRouter(prefix="/api", tags=["Analysis"])
+
+# Maximum number of symbols in one comparison
+MAX_COMPARE_SYMBOLS = 20
+
+# close_norm of all requested symbols in one query. The window ends at the
+# latest date of any of them; a NULL number of days means all history.
+COMPARE_SQL = """
+    SELECT date, symbol, close_norm
+    FROM stocks
+    WHERE symbol = ANY(%(symbols)s)
+      AND close_norm IS NOT NULL
+      AND (%(days)s::int IS NULL OR date > (
+          SELECT MAX(date) FROM stocks WHERE symbol = ANY(%(symbols)s)
+      ) - %(days)s::int)
+    ORDER BY date ASC
+"""
+
+
+def parse_symbols(symbols: str):
+    """Comma separated symbols -> unique upper-case list, in request order."""
+    parsed = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(parsed) > MAX_COMPARE_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_SYMBOLS} symbols can be compared")
+    return parsed
+
+
+def align_series(df: pd.DataFrame, symbols):
+    """
+    Long rows (date, symbol, close_norm) -> one column per symbol on the
+    union of all dates. Gaps after a symbol's first bar are forward-filled
+    (no trade that day = unchanged price); days before its first bar stay empty.
+    Each column is then divided by its first value, so every series starts at 1.0.
+    """
+    wide = df.pivot(index="date", columns="symbol", values="close_norm")
+    wide = wide.reindex(columns=symbols).ffill()
+    first_values = wide.bfill().iloc[0]
+    return wide / first_values
+
+
+@router.get("/compare")
+def compare(
+    symbols: str = Query(..., description="Comma separated symbols, e.g. NABIL,NICA"),
+    timeframe: str = "1Y",
+):
+    """
+    Aligned, rebased close_norm series of several symbols.
+
+    Returns a columnar payload:
+        {"dates": [...], "series": {"NABIL": [...], "NICA": [...]}, "missing": [...]}
+    Values are null on days before a symbol's first bar in the window.
+    """
+    symbol_list = parse_symbols(symbols)
+
+    with span("db_connect"):
+        conn = get_db_connection()
+    try:
+        with span("query"):
+            cur = conn.cursor()
+            cur.execute(COMPARE_SQL, {"symbols": symbol_list, "days": TIMEFRAME_DAYS.get(timeframe)})
+            rows = cur.fetchall()
+            cur.close()
+    finally:
+        conn.close()
+
+    with span("dataframe_build"):
+        df = pd.DataFrame.from_records(rows, columns=["date", "symbol", "close_norm"], coerce_float=True)
+
+    found = [s for s in symbol_list if s in set(df["symbol"])]
+    missing = [s for s in symbol_list if s not in found]
+    if not found:
+        return {"dates": [], "series": {}, "missing": missing}
+
+    with span("align"):
+        wide = align_series(df, found)
+
+    with span("serialization"):
+        values = wide.to_numpy()
+        payload = {
+            "dates": [d.isoformat() for d in wide.index],
+            "series": {
+                symbol: np.where(np.isnan(values[:, i]), None, np.round(values[:, i], 6)).tolist()
+                for i, symbol in enumerate(found)
+            },
+            "missing": missing,
+        }
+    return payload
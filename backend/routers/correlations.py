@@ -0,0 +1,180 @@
+"""
+correlations.py
+
+Market-wide correlation and covariance of daily returns.
+
+GET /api/correlations                          full matrix for all symbols
+GET /api/correlations?category=Hydro Power     only one sector
+GET /api/correlations?symbol=NABIL&top_k=10    most correlated peers of one symbol
+
+The matrix only changes when a new trading day is loaded, so results are
+cached per (category, timeframe) together with the latest trading date,
+and dropped when the ingest daemon reports new rows.
+"""
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+import numpy as np
+import pandas as pd
+
+from core.database import get_db_connection
+from core.metrics import register_gauge, span
+from core.singleflight import SingleFlight
+from utils.correlation import pairwise_stats, top_peers
+from utils.events import on_symbols_updated
+from utils.timeframes import TIMEFRAME_DAYS
+
+router = APIRouter(prefix="/api", tags=["Analysis"])
+
+# Peers kept per symbol when a matrix is built (upper bound for top_k)
+MAX_PEERS = 50
+
+# Pairs sharing fewer trading days than this get no correlation
+MIN_SHARED_DAYS = 30
+
+LATEST_DATE_SQL = "SELECT MAX(date) FROM stocks"
+
+# Closes of every symbol (optionally one category) inside the window
+RETURNS_SQL = """
+    SELECT s.date, s.symbol, s.close
+    FROM stocks s
+    WHERE s.close IS NOT NULL
+      AND s.date > %(latest)s::date - %(days)s::int
+      AND (%(category)s::text IS NULL OR s.symbol IN (
+          SELECT symbol FROM stock_info WHERE category = %(category)s
+      ))
+"""
+
+
+class CorrelationCache:
+    """Matrices keyed by (category, timeframe), valid for one trading day."""
+
+    def __init__(self):
+        self._entries = {}   # key -> (latest date, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, latest):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == latest:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, latest, result):
+        with self._lock:
+            self._entries[key] = (latest, result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = CorrelationCache()
+
+# Concurrent cache misses for the same matrix build it once
+builds = SingleFlight("correlations")
+
+# New bars make every cached matrix stale
+on_symbols_updated(lambda event: cache.clear())
+
+register_gauge("correlation_cache", "Correlation cache lookups",
+               lambda: {"hit": cache.hits, "miss": cache.misses}, label_name="result")
+
+
+def build_matrices(latest, category, days):
+    """Aligned returns matrix -> covariance, correlation and top peers."""
+    with span("db_connect"):
+        conn = get_db_connection()
+    try:
+        with span("query"):
+            cur = conn.cursor()
+            cur.execute(RETURNS_SQL, {"latest": latest, "days": days, "category": category})
+            rows = cur.fetchall()
+            cur.close()
+    finally:
+        conn.close()
+
+    with span("align"):
+        df = pd.DataFrame.from_records(rows, columns=["date", "symbol", "close"], coerce_float=True)
+        closes = df.pivot(index="date", columns="symbol", values="close").sort_index()
+        # No fill: a day without a bar has no return, and each pair only
+        # uses the days where both symbols have one
+        returns = closes.pct_change(fill_method=None).iloc[1:]
+        returns = returns.replace([np.inf, -np.inf], np.nan)
+
+    with span("correlation"):
+        symbols = list(returns.columns)
+        cov, corr, _ = pairwise_stats(returns.to_numpy(dtype=np.float64), MIN_SHARED_DAYS)
+        peers = top_peers(corr, symbols, MAX_PEERS)
+
+    return {
+        "as_of": str(latest),
+        "symbols": symbols,
+        "index": {s: i for i, s in enumerate(symbols)},
+        "cov": cov,
+        "corr": corr,
+        "peers": peers,
+    }
+
+
+def matrix_payload(matrix):
+    """NaN -> None so the matrix is valid JSON."""
+    rounded = np.round(matrix, 6)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
+
+
+@router.get("/correlations")
+def correlations(
+    category: Optional[str] = None,
+    timeframe: str = Query("1Y", pattern="^(1M|6M|1Y|3Y|5Y)$"),
+    kind: str = Query("corr", pattern="^(corr|cov)$"),
+    symbol: Optional[str] = None,
+    top_k: int = Query(10, ge=1, le=MAX_PEERS),
+):
+    """
+    Correlation (or covariance) of daily returns over the timeframe.
+
+    Without `symbol`: {"as_of", "symbols", "matrix"} for every symbol.
+    With `symbol`: {"as_of", "symbol", "peers"}, its top_k most correlated symbols.
+    """
+    with span("db_connect"):
+        conn = get_db_connection()
+    try:
+        with span("query"):
+            cur = conn.cursor()
+            cur.execute(LATEST_DATE_SQL)
+            latest = cur.fetchone()[0]
+            cur.close()
+    finally:
+        conn.close()
+
+    if latest is None:
+        raise HTTPException(status_code=404, detail="No price data available")
+
+    key = (category, timeframe)
+    result = cache.get(key, latest)
+    if result is None:
+        result = builds.do(key + (latest,), build_matrices, latest, category, TIMEFRAME_DAYS[timeframe])
+        cache.put(key, latest, result)
+
+    if not result["symbols"]:
+        raise HTTPException(status_code=404, detail="No symbols found for this category")
+
+    if symbol:
+        symbol = symbol.upper()
+        if symbol not in result["index"]:
+            raise HTTPException(status_code=404, detail=f"No returns for symbol {symbol}")
+        return {"as_of": result["as_of"], "symbol": symbol, "peers": result["peers"][symbol][:top_k]}
+
+    with span("serialization"):
+        payload = {
+            "as_of": result["as_of"],
+            "symbols": result["symbols"],
+            "matrix": matrix_payload(result[kind]),
+        }
+    return payload
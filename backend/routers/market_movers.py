@@ -1,19 +1,18 @@
+import os
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException  # FastAPI tools: APIRouter to create routes, HTTPException to raise API errors
 from pydantic import BaseModel  # BaseModel to define input/output data structure (schemas)
 from sqlalchemy import create_engine, text  # SQLAlchemy tools to connect to DB and run SQL queries
 import pandas as pd 
+from utils.columnar_store import columnar_available, query_df  # Optional Parquet/DuckDB replica
+from core.metrics import span  # Timing spans exported on /metrics
 
 router = APIRouter()  # Create a new router for market-movers endpoints
 
 # --- Database config ---
-# Store database connection info
-DB_CONFIG = {
-    "dbname": "stock_data",
-    "user": "postgres",
-    "password": "root",
-    "host": "localhost",
-    "port": "5433",
-}
+# Shared PostgreSQL connection settings
+from core.database import DB_CONFIG
 
 # --- Response models ---
 class StockData(BaseModel):
@@ -38,80 +37,117 @@ class MarketMoversResponse(BaseModel):
 DB_URL = f"postgresql+psycopg2://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
 engine = create_engine(DB_URL, echo=False, future=True)  # echo=False disables SQL logging, future=True uses latest SQLAlchemy API
 
+# Engine used for whole-market queries: "postgres" (default) or "duckdb"
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "postgres")
+
+# --- Queries ---
+# Latest price, change % against the previous close, and all closes (newest first).
+# The same SQL runs on Postgres and on the DuckDB replica, so both paths
+# return the same rows. The ::numeric cast keeps ROUND(x, 2) valid on
+# databases whose price columns are still DOUBLE PRECISION.
+MARKET_MOVERS_SQL = """
+    WITH ranked AS (
+        SELECT
+            s.symbol,
+            COALESCE(si.company_name, s.symbol) AS company_name,
+            s.close,
+            LAG(s.close) OVER (PARTITION BY s.symbol ORDER BY s.date) AS prev_close,
+            ROW_NUMBER() OVER (PARTITION BY s.symbol ORDER BY s.date DESC) AS rn
+        FROM stocks s
+        LEFT JOIN stock_info si ON s.symbol = si.symbol
+        WHERE s.close IS NOT NULL
+    ),
+    latest AS (
+        SELECT *
+        FROM ranked
+        WHERE rn = 1
+    ),
+    last_days AS (
+        SELECT
+            s.symbol,
+            ARRAY_AGG(s.close ORDER BY s.date DESC) AS all_closes
+        FROM stocks s
+        GROUP BY s.symbol
+    )
+    SELECT
+        l.symbol,
+        l.company_name,
+        l.close AS current_price,
+        ROUND(
+            (((l.close - l.prev_close) / NULLIF(l.prev_close, 0)) * 100)::numeric
+        , 2) AS change_percent,
+        ld.all_closes
+    FROM latest l
+    LEFT JOIN last_days ld ON l.symbol = ld.symbol
+    ORDER BY change_percent DESC;
+"""
+
+def fetch_market_snapshot(engine_name: str) -> pd.DataFrame:
+    """
+    Runs the market movers query on the selected engine.
+    DuckDB scans the Parquet replica without touching the OLTP database.
+    """
+    if engine_name == "duckdb":
+        with span("query"):
+            df = query_df(MARKET_MOVERS_SQL)
+        df["change_percent"] = df["change_percent"].astype(float)
+        return df
+
+    with span("db_connect"):
+        conn = engine.connect()  # Open a connection to the database
+    try:
+        with span("query"):
+            return pd.read_sql(text(MARKET_MOVERS_SQL), conn)  # Read SQL query results into a pandas DataFrame
+    finally:
+        conn.close()
+
 # --- Endpoint ---
 @router.get("/market-movers", response_model=MarketMoversResponse)
-def market_movers():
+def market_movers(engine_name: Optional[str] = None):
     """
     Get top 10 gainers and losers in the stock market
+
+    engine_name: "postgres" or "duckdb" (defaults to ANALYTICS_ENGINE).
+    DuckDB is only used when the columnar replica has been built.
     """
+    engine_name = engine_name or ANALYTICS_ENGINE
+    if engine_name == "duckdb" and not columnar_available():
+        engine_name = "postgres"
+
     try:
-        with engine.connect() as conn:  # Open a connection to the database
-            query = text("""
-                WITH ranked AS (
-                    SELECT
-                        s.symbol,
-                        COALESCE(si.company_name, s.symbol) AS company_name,
-                        s.close,
-                        LAG(s.close) OVER (PARTITION BY s.symbol ORDER BY s.date) AS prev_close,
-                        ROW_NUMBER() OVER (PARTITION BY s.symbol ORDER BY s.date DESC) AS rn
-                    FROM stocks s
-                    LEFT JOIN stock_info si ON s.symbol = si.symbol
-                    WHERE s.close IS NOT NULL
-                ),
-                latest AS (
-                    SELECT *
-                    FROM ranked
-                    WHERE rn = 1
-                ),
-                last_days AS (
-                    SELECT
-                        s.symbol,
-                        ARRAY_AGG(s.close ORDER BY s.date DESC) AS all_closes
-                    FROM stocks s
-                    GROUP BY s.symbol
-                )
-                SELECT
-                    l.symbol,
-                    l.company_name,
-                    l.close AS current_price,
-                    ROUND(
-                        ((l.close - l.prev_close) / NULLIF(l.prev_close, 0)) * 100
-                    , 2) AS change_percent,
-                    ld.all_closes
-                FROM latest l
-                LEFT JOIN last_days ld ON l.symbol = ld.symbol
-                ORDER BY change_percent DESC;
-            """)  # SQL query to calculate latest stock prices, change %, and last 7 days of closes
-
-            df = pd.read_sql(query, conn)  # Read SQL query results into a pandas DataFrame
-
-            if df.empty:
-                # Raise 404 error if no data found
-                raise HTTPException(status_code=404, detail="No stock data available")
-
-            # Only keep last 7 days of closing prices in Python
-            df["last_7_days"] = df["all_closes"].apply(lambda x: x[:7] if x else [])
-
-            # Top 10 gainers
-            gainers_df = df[df["change_percent"] > 0].nlargest(10, "change_percent")  # Sort descending
-            gainers = gainers_df.to_dict(orient="records")  # Convert DataFrame to list of dicts
-
-            # Top 10 losers
-            losers_df = df[df["change_percent"] < 0].nsmallest(10, "change_percent")  # Sort ascending
-            losers = losers_df.to_dict(orient="records")  # Convert DataFrame to list of dicts
-
-            # Clean up dicts to match Pydantic model
-            for g in gainers:
-                g["last_7_days"] = g.pop("last_7_days")  # Ensure key matches model
-            for l in losers:
-                l["last_7_days"] = l.pop("last_7_days")  # Ensure key matches model
-
-            # Return final response
-            return {
-                "gainers": gainers,
-                "losers": losers
-            }
+        df = fetch_market_snapshot(engine_name)
+
+        if df.empty:
+            # Raise 404 error if no data found
+            raise HTTPException(status_code=404, detail="No stock data available")
+
+        # Only keep last 7 days of closing prices in Python
+        df["last_7_days"] = df["all_closes"].apply(
+            lambda x: [float(v) for v in x[:7]] if x is not None else []
+        )
+
+        # Top 10 gainers
+        gainers_df = df[df["change_percent"] > 0].nlargest(10, "change_percent")  # Sort descending
+        gainers = gainers_df.to_dict(orient="records")  # Convert DataFrame to list of dicts
+
+        # Top 10 losers
+        losers_df = df[df["change_percent"] < 0].nsmallest(10, "change_percent")  # Sort ascending
+        losers = losers_df.to_dict(orient="records")  # Convert DataFrame to list of dicts
+
+        # Clean up dicts to match Pydantic model
+        for g in gainers:
+            g["last_7_days"] = g.pop("last_7_days")  # Ensure key matches model
+        for l in losers:
+            l["last_7_days"] = l.pop("last_7_days")  # Ensure key matches model
+
+        # Return final response
+        return {
+            "gainers": gainers,
+            "losers": losers
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Catch all exceptions and return 500 Internal Server Error
         raise HTTPException(status_code=500, detail=f"SQL ERROR: {e}")
@@ -0,0 +1,28 @@
+from anyio import to_thread  # Thread pool that runs FastAPI's sync endpoints
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import render_metrics  # Prometheus text format
+from core.security import password_pool  # Password hashing pool (queue depth)
+
+# Router for the Prometheus scrape endpoint
+router = APIRouter(tags=["Metrics"])
+
+
+# Async on purpose: it must run on the event loop to read the thread limiter,
+# and it keeps answering even when every worker thread is busy
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics: request and span latency histograms,
+    process memory, thread-pool usage and cache statistics.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    extra = {
+        "threadpool_threads_limit": ("Size of the request thread pool", limiter.total_tokens),
+        "threadpool_threads_busy": ("Request threads currently in use", stats.borrowed_tokens),
+        "threadpool_queue_depth": ("Requests waiting for a free thread", stats.tasks_waiting),
+        "password_pool_pending": ("Password hashes queued or running", password_pool.pending),
+    }
+    return render_metrics(extra)
@@ -1,13 +1,49 @@
-from fastapi import APIRouter  
-from utils.news_service import fetch_all_news  # Import a function that fetches news from a utility module
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from utils.news_store import query_news, sync_news  # Local news archive (see utils/news_store.py)
+from core.tokens import CurrentUser, get_current_user  # Signed access tokens
+
+# Upstream pages one API call may fetch; longer syncs belong in db/sync_news.py
+MAX_SYNC_PAGES = 20
 
 # Create a new router for news-related endpoints
 # prefix="/api/news" means all routes here will start with /api/news
-# tags=["News"] helps categorize this route in API documentation 
+# tags=["News"] helps categorize this route in API documentation
 router = APIRouter(prefix="/api/news", tags=["News"])
 
 # Define a GET endpoint to get all news
 # The empty string "" means this will respond to /api/news
 @router.get("")
-async def get_all_news():  
-    return fetch_all_news()  
+def get_all_news(
+    symbol: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(36, ge=1, le=200),
+):
+    """
+    Returns archived news, newest first.
+
+    Examples:
+    /api/news
+    /api/news?symbol=NABIL
+    /api/news?before_id=12345   (next page, older than post 12345)
+    """
+    news = query_news(symbol=symbol, before_id=before_id, limit=limit)
+
+    # Fill an empty archive on the first request so the page is never blank
+    if not news and symbol is None and before_id is None:
+        sync_news(max_pages=3)
+        news = query_news(limit=limit)
+
+    return news
+
+
+# Pull posts newer than the stored high-water id into the archive
+# (backfill=true pages further back into history instead). Logged-in users only.
+@router.post("/sync")
+def sync(
+    backfill: bool = False,
+    max_pages: int = Query(5, ge=1, le=MAX_SYNC_PAGES),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    return {"stored": sync_news(max_pages=max_pages, backfill=backfill)}
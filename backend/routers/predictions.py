@@ -1,23 +1,71 @@
-from fastapi import APIRouter, HTTPException  # FastAPI router and exception handling
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query  # FastAPI router and exception handling
 from pydantic import BaseModel  # For request/response data validation
 import sys
 import os
 import numpy as np
 import pandas as pd
-import tensorflow as tf  # TensorFlow for LSTM model loading
 from utils.preprocessing import scale_data  # Custom scaling utility
-from sqlalchemy import create_engine  # SQLAlchemy engine for DB connection
+from core.metrics import span  # Timing spans exported on /metrics
+from core.singleflight import coalesce  # Identical concurrent requests share one computation
+from core.shared_store import shared_store  # Prices and models shared by all workers (see serve.py)
+from core.inference_pool import (  # Dedicated, bounded executor for predictions
+    INFERENCE_DEADLINE, InferenceDeadlineExceeded, InferencePoolBusy, configure_tensorflow, inference_pool,
+)
+from core.database import PRICE_HISTORY_SQL, get_db_connection  # Price query and raw SQL connection
 
 # Add parent directory to sys.path
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
-from ML.train_lstm import DB_CONFIG  # Database configuration for fetching stock data
+from ML.inference import batched_rollout  # Runs many rollouts as one batched tensor
+from ML.model_registry import ModelCache  # Loaded models, reloaded when a new version is published
+from core.metrics import register_counter, register_gauge
 
 # Initialize FastAPI router
 router = APIRouter()
 
+# Prediction horizons in days
+HORIZONS = {
+    "very_short_term": 3,
+    "short_term": 7,
+    "mid_term": 20,
+    "long_term": 60
+}
+
+# Seconds clients should wait before retrying when the inference pool is full
+RETRY_AFTER_SECONDS = "1"
+
+# Quantiles reported for each horizon when samples are requested
+QUANTILES = {"p05": 5, "p25": 25, "p50": 50, "p75": 75, "p95": 95}
+
+def load_keras_model(path):
+    """Load a model file without compile to avoid Keras metric issues."""
+    print("Loading model from:", path)
+    configure_tensorflow()  # Thread limits must be set before TensorFlow starts
+    import tensorflow as tf  # TensorFlow for LSTM model loading (only without the shared store)
+    return tf.keras.models.load_model(path, compile=False)
+
+# Models of the live version, shared by all requests of this process
+model_cache = ModelCache(load_keras_model)
+
+register_gauge("models_loaded", "LSTM models held in memory", lambda: model_cache.loaded_count)
+register_counter("model_reloads_total", "Models reloaded after a new version was published",
+                 lambda: model_cache.reloads)
+
 # --- Response model ---
+class HorizonBand(BaseModel):
+    """
+    Predicted price distribution for one horizon, from the sampled rollouts.
+    """
+    p05: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+    prob_up: float  # Share of rollouts that end above the current price
+
 class TechnicalPredictionResponse(BaseModel):
     """
     Pydantic model to define the structure of the API response.
@@ -28,6 +76,7 @@ class TechnicalPredictionResponse(BaseModel):
     mid_term: str
     long_term: str
     confidence: float
+    bands: Optional[dict[str, HorizonBand]] = None  # Only when samples > 0
 
 # --- Helper functions ---
 
@@ -72,72 +121,115 @@ def iterative_prediction(model, last_window, days):
         window = np.append(window, pred_scaled[-1])  # Append prediction to window
     return window[-1]  # Return last predicted value
 
-# --- Endpoint ---
-@router.get("/predict", response_model=TechnicalPredictionResponse)
-def predict(symbol: str):
+def perturbed_windows(last_window, samples, noise, rng):
     """
-    Endpoint to predict stock trends for a given symbol.
-    
+    Build the rollout inputs: the real window first, then `samples` copies
+    with Gaussian noise scaled to the window's own day-to-day volatility.
+
+    Returns:
+        np.array: shape (samples + 1, window_size)
+    """
+    window = last_window.reshape(-1)
+    daily_std = np.std(np.diff(window)) if len(window) > 1 else 0.0
+    noisy = window + rng.normal(0.0, noise * daily_std, size=(samples, len(window)))
+    return np.vstack([window, noisy])
+
+def uncertainty_bands(sampled_prices, current_close):
+    """
+    Quantiles of the sampled prices for every horizon.
+
+    Args:
+        sampled_prices (np.array): shape (samples, max horizon), real prices
+        current_close (float): Latest closing price
+    """
+    bands = {}
+    for key, days in HORIZONS.items():
+        at_horizon = sampled_prices[:, days - 1]
+        band = {
+            name: round(float(value), 2)
+            for name, value in zip(QUANTILES, np.percentile(at_horizon, list(QUANTILES.values())))
+        }
+        band["prob_up"] = round(float(np.mean(at_horizon > current_close)), 3)
+        bands[key] = band
+    return bands
+
+def run_prediction(symbol, samples, noise):
+    """
+    Load the model and prices, and roll the model forward.
+    Runs on the inference pool (see predict).
+
     Args:
         symbol (str): Stock symbol to predict
-    
+        samples (int): Number of perturbed rollouts for uncertainty bands (0 = none)
+        noise (float): Input noise, as a multiple of the window's daily volatility
+
     Returns:
         dict: Predicted trends and confidence for multiple horizons
     """
-    # Model path
-    MODEL_DIR = os.path.join(BASE_DIR, "ML", "models")
-    model_path = os.path.join(MODEL_DIR, f"{symbol}_model.h5")
-    print("Loading model from:", model_path)
+    # Prefer the shared memory store: weights and prices are already in
+    # memory and inference runs in NumPy, so the worker never loads TensorFlow
+    model = shared_store.model(symbol)
+    prices = shared_store.prices(symbol) if model is not None else None
 
-    # Check if model exists
-    if not os.path.exists(model_path):
-        raise HTTPException(status_code=404, detail="Model not found. Train LSTM first.")
+    if model is None:
+        # Model of the live version (loaded once, then kept in memory)
+        try:
+            with span("model_load"):
+                model = model_cache.get(symbol)
+        except Exception as e:
+            print("Error loading model:", e)
+            raise HTTPException(status_code=500, detail=f"Error loading model: {e}")
 
-    # Load model without compile to avoid Keras metric issues
-    try:
-        model = tf.keras.models.load_model(model_path, compile=False)
-    except Exception as e:
-        print("Error loading model:", e)
-        raise HTTPException(status_code=500, detail=f"Error loading model: {e}")
-
-    # SQLAlchemy engine to avoid pandas warning
-    try:
-        DB_URL = f"postgresql+psycopg2://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
-        engine = create_engine(DB_URL)
+        # Check if model exists
+        if model is None:
+            raise HTTPException(status_code=404, detail="Model not found. Train LSTM first.")
 
-        # Fetch historical closing prices for the symbol
-        query = "SELECT close FROM stocks WHERE symbol=%s ORDER BY date ASC"
-        df = pd.read_sql(query, engine, params=(symbol,))
-        print(f"Data fetched for {symbol}, shape:", df.shape)
-    except Exception as e:
-        print("Database error:", e)
-        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    if prices is not None:
+        df = pd.DataFrame({"close": prices["close"]})
+    else:
+        try:
+            with span("db_connect"):
+                conn = get_db_connection()
+            try:
+                # Fetch historical closing prices for the symbol
+                with span("query"):
+                    cur = conn.cursor()
+                    cur.execute(PRICE_HISTORY_SQL, (symbol,))
+                    rows = cur.fetchall()
+                    cur.close()
+            finally:
+                conn.close()
+            df = pd.DataFrame.from_records(rows, columns=["close"], coerce_float=True)
+            print(f"Data fetched for {symbol}, shape:", df.shape)
+        except Exception as e:
+            print("Database error:", e)
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
     # Check if data exists
     if df.empty:
         raise HTTPException(status_code=404, detail="Symbol not found or no data available")
 
     # Prepare data for prediction
-    data = df["close"].values.reshape(-1, 1)  # Extract closing prices
-    scaled, scaler = scale_data(data)  # Scale prices
+    with span("scaling"):
+        data = df["close"].values.reshape(-1, 1)  # Extract closing prices
+        scaled, scaler = scale_data(data)  # Scale prices
     last_window = scaled[-60:].reshape(-1, 1)  # Last 60 days for prediction
     current_close = df["close"].iloc[-1]  # Current closing price
 
-    # Define prediction horizons in days
-    horizons = {
-        "very_short_term": 3,
-        "short_term": 7,
-        "mid_term": 20,
-        "long_term": 60
-    }
-
     trends = {}  # Store trends for each horizon
     confidences = []  # Store confidence values
 
+    # One batched rollout covers every horizon: row 0 is the real window,
+    # rows 1..samples are perturbed copies (the models have no dropout
+    # layers, so input noise is used for the ensemble)
+    windows = perturbed_windows(last_window, samples, noise, np.random.default_rng())
+    with span("inference"):
+        rollouts = batched_rollout(model, windows, max(HORIZONS.values()))
+    rollout_prices = scaler.inverse_transform(rollouts.reshape(-1, 1)).reshape(rollouts.shape)
+
     # Generate predictions for each horizon
-    for key, days in horizons.items():
-        predicted_scaled = iterative_prediction(model, last_window, days)
-        predicted_price = scaler.inverse_transform(np.array([[predicted_scaled]]))[0][0]
+    for key, days in HORIZONS.items():
+        predicted_price = rollout_prices[0, days - 1]
         # confidence is calculated here
         trend, conf = determine_trend(current_close, predicted_price)
         trends[key] = trend
@@ -152,4 +244,44 @@ def predict(symbol: str):
         "symbol": symbol,
         **trends,
         "confidence": round(float(overall_confidence), 2),
+        "bands": uncertainty_bands(rollout_prices[1:], current_close) if samples else None,
     }
+
+# --- Endpoint ---
+@router.get("/predict", response_model=TechnicalPredictionResponse)
+# The deadline is part of the key: a request never waits on (or gets the
+# 504 of) a call made with a different timeout
+@coalesce("predict", key=lambda symbol, samples=0, noise=1.0, timeout=INFERENCE_DEADLINE: (symbol.upper(), samples, noise, timeout))
+async def predict(
+    symbol: str,
+    samples: int = Query(0, ge=0, le=1000),
+    noise: float = Query(1.0, ge=0.0, le=10.0),
+    timeout: float = Query(INFERENCE_DEADLINE, gt=0, le=60),
+):
+    """
+    Endpoint to predict stock trends for a given symbol.
+
+    Predictions run on a dedicated pool so they cannot slow down other
+    endpoints: 503 (with Retry-After) when the pool is full, 504 when
+    the result is not ready within `timeout` seconds.
+
+    Args:
+        symbol (str): Stock symbol to predict
+        samples (int): Number of perturbed rollouts for uncertainty bands (0 = none)
+        noise (float): Input noise, as a multiple of the window's daily volatility
+        timeout (float): Deadline for this request in seconds, including queueing
+
+    Returns:
+        dict: Predicted trends and confidence for multiple horizons
+    """
+    try:
+        # Upper-cased like the coalescing key, so every waiter gets the same answer
+        return await inference_pool.run(run_prediction, symbol.upper(), samples, noise, timeout=timeout)
+    except InferencePoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many predictions in progress, please retry",
+            headers={"Retry-After": RETRY_AFTER_SECONDS},
+        )
+    except InferenceDeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Prediction did not finish in time")
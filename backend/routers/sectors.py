@@ -0,0 +1,105 @@
+"""
+sectors.py
+
+Sector indices built by db/sector_indices.py (equal-weighted, base 100).
+
+GET /api/sectors          latest value and daily change of every sector
+GET /api/sectors/{name}   index history of one sector
+"""
+from fastapi import APIRouter, HTTPException
+
+from core.database import get_db_connection
+from core.metrics import span  # Timing spans exported on /metrics
+from utils.timeframes import TIMEFRAME_DAYS  # Days covered by each timeframe (others = ALL)
+
+router = APIRouter(prefix="/api", tags=["Sectors"])
+
+# Latest row of every sector, with the value a year earlier for the 1Y change.
+# The year-ago lookup runs once per sector (one index probe on the
+# (category, date) key), not once per stored sector-day row.
+LATEST_SECTORS_SQL = """
+    WITH latest AS (
+        SELECT DISTINCT ON (category)
+            category, date, value, daily_return, members
+        FROM sector_index
+        ORDER BY category, date DESC
+    )
+    SELECT l.category, l.date, l.value, l.daily_return, l.members, y.value AS value_1y_ago
+    FROM latest l
+    LEFT JOIN LATERAL (
+        SELECT value FROM sector_index
+        WHERE category = l.category AND date <= l.date - 365
+        ORDER BY date DESC
+        LIMIT 1
+    ) y ON TRUE
+    ORDER BY l.category
+"""
+
+# History of one sector; a NULL number of days means all history
+SECTOR_HISTORY_SQL = """
+    SELECT date, value, daily_return, members
+    FROM sector_index
+    WHERE category = %(name)s
+      AND (%(days)s::int IS NULL OR date > (
+          SELECT MAX(date) FROM sector_index WHERE category = %(name)s
+      ) - %(days)s::int)
+    ORDER BY date ASC
+"""
+
+
+def fetch_all(sql, params=None):
+    with span("db_connect"):
+        conn = get_db_connection()
+    try:
+        with span("query"):
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            cur.close()
+    finally:
+        conn.close()
+    return rows
+
+
+@router.get("/sectors")
+def list_sectors():
+    """
+    Every sector with its latest index value.
+
+    Example:
+    /api/sectors
+    """
+    rows = fetch_all(LATEST_SECTORS_SQL)
+    return [
+        {
+            "name": name,
+            "date": day.isoformat(),
+            "value": round(value, 2),
+            "change_percent": round(daily_return * 100, 2),
+            "change_1y_percent": round((value / value_1y - 1) * 100, 2) if value_1y else None,
+            "members": members,
+        }
+        for name, day, value, daily_return, members, value_1y in rows
+    ]
+
+
+@router.get("/sectors/{name:path}")
+def sector_history(name: str, timeframe: str = "1Y"):
+    """
+    Index history of one sector (columnar, like /api/compare).
+
+    Example:
+    /api/sectors/Commercial Banks?timeframe=5Y
+    """
+    rows = fetch_all(SECTOR_HISTORY_SQL, {"name": name, "days": TIMEFRAME_DAYS.get(timeframe)})
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Sector {name} not found")
+
+    dates, values, returns, members = zip(*rows)
+    return {
+        "name": name,
+        "dates": [d.isoformat() for d in dates],
+        "values": [round(v, 4) for v in values],
+        "daily_returns": [round(r, 6) for r in returns],
+        "members": list(members),
+    }
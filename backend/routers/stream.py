@@ -0,0 +1,151 @@
+"""
+stream.py
+
+Streaming endpoints for live bars, indicators and market movers.
+
+WebSocket:  /api/stream/ws
+    send {"symbols": ["NABIL", "NICA"], "movers": true} at any time to
+    (re)subscribe; events arrive as JSON messages. An invalid message gets
+    an {"type": "error"} event and the connection stays open.
+
+SSE:        /api/stream/sse?symbols=NABIL,NICA&movers=true
+
+Replay:     POST /api/stream/replay/start?start_date=2024-01-01&speed=5   (logged-in users)
+            POST /api/stream/replay/stop                                  (logged-in users)
+            GET  /api/stream/replay/status
+"""
+import asyncio
+import json
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from core.tokens import CurrentUser, get_current_user  # Signed access tokens
+from utils.streaming import ReplayFeed, StreamClient, hub
+
+router = APIRouter(prefix="/api/stream", tags=["Stream"])
+
+# Seconds between SSE keep-alive comments when there are no events
+SSE_KEEPALIVE_SECONDS = 15
+
+# The replay feed currently playing (only one at a time)
+replay_feed: Optional[ReplayFeed] = None
+
+
+def parse_symbols(symbols: Optional[str]):
+    return [s.strip() for s in symbols.split(",") if s.strip()] if symbols else []
+
+
+def parse_subscription(text: str):
+    """(symbols, movers) from a WebSocket message; raises ValueError if it is invalid."""
+    try:
+        message = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError("Message is not valid JSON")
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+
+    symbols = message.get("symbols")
+    movers = message.get("movers")
+    if symbols is not None and not (isinstance(symbols, list) and all(isinstance(s, str) for s in symbols)):
+        raise ValueError("symbols must be a list of strings")
+    if movers is not None and not isinstance(movers, bool):
+        raise ValueError("movers must be true or false")
+    return symbols, movers
+
+
+# -----------------------------
+# WebSocket endpoint
+# -----------------------------
+@router.websocket("/ws")
+async def stream_ws(websocket: WebSocket):
+    await websocket.accept()
+    client = StreamClient()
+    hub.subscribe(client)
+
+    async def receive_subscriptions():
+        while True:
+            try:
+                symbols, movers = parse_subscription(await websocket.receive_text())
+            except ValueError as e:
+                # Queued like any event, so only the main loop sends on the socket
+                client.offer({"type": "error", "detail": str(e)})
+                continue
+            hub.update_subscription(client, symbols=symbols, movers=movers)
+
+    receiver = asyncio.create_task(receive_subscriptions())
+    try:
+        while True:
+            sender = asyncio.create_task(client.queue.get())
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                sender.cancel()
+                receiver.result()  # raises WebSocketDisconnect when the client left
+            await websocket.send_json(sender.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(client)
+
+
+# -----------------------------
+# Server-Sent Events endpoint
+# -----------------------------
+@router.get("/sse")
+async def stream_sse(symbols: Optional[str] = None, movers: bool = False):
+    client = StreamClient(parse_symbols(symbols), movers)
+    hub.subscribe(client)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(client.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(client)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# -----------------------------
+# Replay feed control
+# -----------------------------
+# The replay feeds every subscriber, so starting and stopping it needs a login
+@router.post("/replay/start")
+async def start_replay(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    speed: float = Query(1.0, gt=0, le=1000),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Play historical rows from `stocks` at `speed` trading days per second."""
+    global replay_feed
+    if replay_feed is not None and replay_feed.running:
+        raise HTTPException(status_code=409, detail="A replay is already running")
+    hub.reset_market()
+    replay_feed = ReplayFeed(start_date, end_date, speed)
+    replay_feed.start()
+    return {"status": "started", "speed": speed}
+
+
+@router.post("/replay/stop")
+async def stop_replay(current_user: CurrentUser = Depends(get_current_user)):
+    if replay_feed is not None:
+        replay_feed.stop()
+    return {"status": "stopped"}
+
+
+@router.get("/replay/status")
+async def replay_status():
+    return {
+        "running": replay_feed is not None and replay_feed.running,
+        "current_date": str(replay_feed.current_date) if replay_feed and replay_feed.current_date else None,
+        "clients": hub.client_count,
+    }
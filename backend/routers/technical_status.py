@@ -4,19 +4,22 @@ from pydantic import BaseModel
 import psycopg2
 import pandas as pd
 import numpy as np
+from core.metrics import span  # Timing spans exported on /metrics
 
 # Initialize API router
 router = APIRouter()
 
 # --- Database config ---
-# PostgreSQL connection settings
-DB_CONFIG = {
-    "dbname": "stock_data",
-    "user": "postgres",
-    "password": "root",
-    "host": "localhost",
-    "port": "5433",
-}
+# Shared PostgreSQL connection settings
+from core.database import DB_CONFIG
+
+# SQL query to fetch historical stock data
+TECHNICAL_STATUS_SQL = """
+    SELECT date, close, open, high, low, close_norm
+    FROM stocks
+    WHERE symbol = UPPER(%s)
+    ORDER BY date ASC
+"""
 
 # --- Response model ---
 class TrendResponse(BaseModel):
@@ -107,18 +110,12 @@ def technical_status(symbol: str):
     """
     try:
         # Establish database connection
-        conn = psycopg2.connect(**DB_CONFIG)
-
-        # SQL query to fetch historical stock data
-        query = """
-            SELECT date, close, open, high, low, close_norm
-            FROM stocks
-            WHERE symbol = %s
-            ORDER BY date ASC
-        """
+        with span("db_connect"):
+            conn = psycopg2.connect(**DB_CONFIG)
 
         # Load query results into a DataFrame
-        df = pd.read_sql(query, conn, params=(symbol,))
+        with span("query"):
+            df = pd.read_sql(TECHNICAL_STATUS_SQL, conn, params=(symbol,))
         conn.close()
     except Exception as e:
         # Handle database-related errors
@@ -132,7 +129,8 @@ def technical_status(symbol: str):
         )
 
     # Compute trend indicators
-    trends = compute_trends(df)
+    with span("indicators"):
+        trends = compute_trends(df)
 
     # Return trend analysis response
     return trends
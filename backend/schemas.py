@@ -31,3 +31,27 @@ class UserResponse(BaseModel):
 class UserLogin(BaseModel):
     email: str  # Email used to log in
     password: str  # Password used to log in
+
+# -----------------------------
+# Schema returned after a successful login
+# -----------------------------
+class LoginResponse(UserResponse):
+    access_token: str  # Short-lived token sent as "Authorization: Bearer <token>"
+    refresh_token: str  # Long-lived token used to get a new access token
+    token_type: str  # Always "bearer"
+    expires_in: int  # Access token lifetime in seconds
+
+# -----------------------------
+# Schema for refreshing an access token
+# -----------------------------
+class RefreshRequest(BaseModel):
+    refresh_token: str  # Refresh token received from login
+
+# -----------------------------
+# Schema returned when tokens are refreshed
+# -----------------------------
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+    expires_in: int
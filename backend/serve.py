@@ -0,0 +1,109 @@
+"""
+serve.py
+
+Runs the API with several uvicorn workers that share one copy of the
+price history and model weights (see core/shared_store.py).
+
+The supervisor process:
+  1. loads every symbol's OHLC arrays and every model's weights once,
+     into a shared memory segment (version 1)
+  2. starts the uvicorn workers, which attach to it read-only
+  3. publishes a new version when the ingest daemon reports new rows,
+     when training publishes a new model version (ML/model_registry.py),
+     or every --refresh-interval seconds; workers switch on their next
+     request and the old segment is freed after a grace period.
+     Prices are re-read every time, but only models whose file changed
+     are loaded again with TensorFlow.
+
+Usage (from backend/):
+    python serve.py --workers 4
+    python serve.py --workers 4 --refresh-interval 3600 --port 8000
+"""
+import argparse
+import os
+import threading
+
+import uvicorn
+
+from core.shared_store import SharedStorePublisher
+from ML.model_registry import MODEL_WATCH_INTERVAL, current_version
+from utils.events import on_symbols_updated, start_event_listener, stop_event_listener
+
+# Wait this long after an update event before rebuilding, so a burst of
+# ingested files produces one new version instead of many
+REFRESH_DEBOUNCE_SECONDS = float(os.getenv("SHARED_STORE_DEBOUNCE", "10"))
+
+
+class RefreshScheduler:
+    """Debounced, non-overlapping refreshes of the shared store."""
+
+    def __init__(self, publisher: SharedStorePublisher):
+        self.publisher = publisher
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def schedule(self, delay=REFRESH_DEBOUNCE_SECONDS):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        try:
+            self.publisher.refresh()
+        except Exception as e:
+            # Workers keep serving the previous version
+            print(f"Shared store refresh failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with shared memory data across workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--refresh-interval", type=float, default=0,
+                        help="Also rebuild every N seconds (0 = only on ingest events)")
+    parser.add_argument("--no-models", action="store_true",
+                        help="Share prices only; workers load models with TensorFlow")
+    parser.add_argument("--grace", type=float, default=60,
+                        help="Seconds an old version stays available after a swap")
+    args = parser.parse_args()
+
+    publisher = SharedStorePublisher(grace_seconds=args.grace, include_models=not args.no_models)
+    publisher.refresh()
+
+    scheduler = RefreshScheduler(publisher)
+    on_symbols_updated(lambda event: scheduler.schedule())
+    start_event_listener()
+
+    stop = threading.Event()
+
+    if args.refresh_interval > 0:
+        def periodic():
+            while not stop.wait(args.refresh_interval):
+                scheduler.schedule(delay=0)
+        threading.Thread(target=periodic, daemon=True).start()
+
+    if not args.no_models:
+        # Newly published model versions go into the next shared version
+        def watch_models():
+            seen = current_version()
+            while not stop.wait(MODEL_WATCH_INTERVAL):
+                version = current_version()
+                if version != seen:
+                    seen = version
+                    scheduler.schedule(delay=0)
+        threading.Thread(target=watch_models, daemon=True).start()
+
+    try:
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        stop.set()
+        stop_event_listener()
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
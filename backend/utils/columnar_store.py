@@ -0,0 +1,158 @@
+"""
+columnar_store.py
+
+Optional columnar replica of the `stocks` and `stock_info` tables for
+market-wide analytics.
+
+- Prices are stored as Parquet, one file per symbol
+  (data/columnar/stocks/<symbol>.parquet)
+- Queries run on an embedded DuckDB engine, which memory-maps the files
+  and scans them with vectorized, multi-threaded operators
+- Postgres stays the source of truth; the replica is rebuilt on ingest
+  (db/load_csv_to_db.py --columnar) or with `python -m utils.columnar_store`
+
+pyarrow and duckdb are only needed when the replica is used.
+"""
+import os
+import threading
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+from core.database import get_db_connection
+
+# Folder that holds the replica (can be moved with COLUMNAR_DIR)
+COLUMNAR_DIR = Path(os.getenv(
+    "COLUMNAR_DIR",
+    Path(__file__).resolve().parent.parent.parent / "data" / "columnar",
+))
+STOCKS_DIR = COLUMNAR_DIR / "stocks"
+STOCK_INFO_PATH = COLUMNAR_DIR / "stock_info.parquet"
+
+# Threads DuckDB may use for one query (0 = DuckDB default, all cores)
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+
+STOCK_COLUMNS = ["date", "symbol", "open", "high", "low", "close", "close_norm"]
+
+
+# -------------------------------------------------------------------
+# Writing the replica
+# -------------------------------------------------------------------
+
+def symbol_path(symbol: str) -> Path:
+    """Parquet file of one symbol (symbols such as GBD80/81 contain '/')."""
+    return STOCKS_DIR / f"{quote(symbol, safe='')}.parquet"
+
+
+def _atomic_write(df: pd.DataFrame, path: Path):
+    # Write to a temporary file first so readers never see half a file
+    tmp_path = path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def write_symbol(symbol: str, df: pd.DataFrame):
+    """Replace the replica file of one symbol."""
+    STOCKS_DIR.mkdir(parents=True, exist_ok=True)
+    df = df[STOCK_COLUMNS].copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df[STOCK_COLUMNS[2:]] = df[STOCK_COLUMNS[2:]].astype(float)
+    _atomic_write(df.sort_values("date"), symbol_path(symbol))
+
+
+def write_stock_info(df: pd.DataFrame):
+    """Replace the replica of stock_info."""
+    COLUMNAR_DIR.mkdir(parents=True, exist_ok=True)
+    _atomic_write(df[["symbol", "company_name", "category"]], STOCK_INFO_PATH)
+
+
+def export_from_postgres(symbols=None):
+    """
+    Builds (or refreshes) the replica from Postgres.
+
+    Args:
+        symbols (list): Only refresh these symbols (default: all)
+
+    Returns:
+        int: Number of symbols written
+    """
+    conn = get_db_connection()
+    try:
+        write_stock_info(pd.read_sql("SELECT symbol, company_name, category FROM stock_info", conn))
+
+        if symbols is None:
+            with conn.cursor() as cur:
+                cur.execute("SELECT DISTINCT symbol FROM stocks")
+                symbols = [r[0] for r in cur.fetchall()]
+
+        # One symbol at a time keeps memory bounded by the largest history
+        for symbol in symbols:
+            df = pd.read_sql(
+                f"SELECT {', '.join(STOCK_COLUMNS)} FROM stocks WHERE symbol = %s ORDER BY date",
+                conn,
+                params=(symbol,),
+            )
+            if df.empty:
+                symbol_path(symbol).unlink(missing_ok=True)
+            else:
+                write_symbol(symbol, df)
+    finally:
+        conn.close()
+
+    print(f"Columnar replica updated for {len(symbols)} symbols in {COLUMNAR_DIR}")
+    return len(symbols)
+
+
+# -------------------------------------------------------------------
+# Querying the replica
+# -------------------------------------------------------------------
+
+_duckdb_conn = None
+_duckdb_lock = threading.Lock()
+
+
+def columnar_available() -> bool:
+    """True if duckdb is installed and the replica has been built."""
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return STOCK_INFO_PATH.exists() and any(STOCKS_DIR.glob("*.parquet"))
+
+
+def _get_duckdb():
+    """Shared in-process DuckDB database with `stocks` and `stock_info` views."""
+    global _duckdb_conn
+    with _duckdb_lock:
+        if _duckdb_conn is None:
+            import duckdb
+
+            conn = duckdb.connect(database=":memory:")
+            if DUCKDB_THREADS > 0:
+                conn.execute(f"SET threads = {DUCKDB_THREADS}")
+            # Views re-list the files on every query, so refreshed symbols are picked up
+            conn.execute(
+                f"CREATE VIEW stocks AS SELECT * FROM read_parquet('{STOCKS_DIR.as_posix()}/*.parquet')"
+            )
+            conn.execute(
+                f"CREATE VIEW stock_info AS SELECT * FROM read_parquet('{STOCK_INFO_PATH.as_posix()}')"
+            )
+            _duckdb_conn = conn
+        return _duckdb_conn
+
+
+def query_df(sql: str, params=None) -> pd.DataFrame:
+    """
+    Runs a read-only query on the replica and returns a DataFrame.
+    Each call uses its own cursor, so it is safe from request threads.
+    """
+    cursor = _get_duckdb().cursor()
+    try:
+        return cursor.execute(sql, params or []).df()
+    finally:
+        cursor.close()
+
+
+if __name__ == "__main__":
+    export_from_postgres()
@@ -0,0 +1,79 @@
+"""
+correlation.py
+
+Pairwise correlation / covariance of many return series at once.
+
+Symbols do not all trade on the same days, so the returns matrix has
+gaps. Dropping every day where any symbol is missing would throw most
+of the data away; instead each pair uses the days on which *both*
+symbols have a return (pairwise deletion, like pandas DataFrame.corr).
+All pairs are computed together with a few matrix products:
+
+    M = 1 where a return exists, X = returns with gaps set to 0
+    n   = M'M        days shared by each pair
+    Sx  = X'M        sum of x over the days shared with y
+    Sxx = (X*X)'M    sum of x^2 over the shared days
+    Sxy = X'X        sum of x*y (gaps contribute 0)
+"""
+import numpy as np
+
+
+def pairwise_stats(returns: np.ndarray, min_periods: int = 30):
+    """
+    Covariance and correlation matrices with pairwise missing-data handling.
+
+    Args:
+        returns (np.ndarray): (days, symbols) with NaN for missing returns
+        min_periods (int): pairs sharing fewer days get NaN
+
+    Returns:
+        (cov, corr, counts): (symbols, symbols) arrays
+    """
+    present = (~np.isnan(returns)).astype(np.float64)
+    x = np.nan_to_num(returns, nan=0.0)
+
+    n = present.T @ present
+    sx = x.T @ present          # sx[i, j] = sum of x_i on days where j exists
+    sxx = (x * x).T @ present
+    sxy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (sxy - sx * sx.T / n) / (n - 1)
+        var_i = (sxx - sx * sx / n) / (n - 1)     # variance of i over the shared days
+        corr = cov / np.sqrt(var_i * var_i.T)
+
+    too_few = n < min_periods
+    cov[too_few] = np.nan
+    corr[too_few] = np.nan
+    # Rounding can push values just past +-1
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+    return cov, corr, n.astype(np.int64)
+
+
+def top_peers(corr: np.ndarray, symbols, k: int):
+    """
+    The k most correlated other symbols of every symbol, computed once
+    so a lookup is a dict access.
+
+    Returns:
+        dict: symbol -> [{"symbol": peer, "correlation": value}, ...]
+    """
+    scores = np.where(np.isnan(corr), -np.inf, corr)
+    np.fill_diagonal(scores, -np.inf)
+    k = min(k, max(len(symbols) - 1, 0))
+    if k == 0:
+        return {symbol: [] for symbol in symbols}
+
+    # argpartition finds the k best per row without sorting everything
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1)
+    best = np.take_along_axis(best, order, axis=1)
+
+    return {
+        symbol: [
+            {"symbol": symbols[j], "correlation": round(float(corr[i, j]), 4)}
+            for j in best[i] if np.isfinite(scores[i, j])
+        ]
+        for i, symbol in enumerate(symbols)
+    }
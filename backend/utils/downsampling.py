@@ -0,0 +1,101 @@
+"""
+downsampling.py
+
+Reduces long price histories to what a chart can actually draw.
+
+- "lttb": Largest-Triangle-Three-Buckets on the close price. Keeps whole
+  rows (all indicator values) of the points that matter visually, so
+  peaks and troughs survive while flat stretches are thinned out.
+- "ohlc": merges consecutive rows into one bar per bucket (first open,
+  max high, min low, last close; other columns from the bucket's last row),
+  so no high or low is ever lost in candlestick charts.
+
+Both return at most `max_points` rows and keep the input columns.
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = ("lttb", "ohlc")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Row positions selected by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the points in between are
+    split into n_out - 2 buckets and the point forming the largest triangle
+    with the previously selected point and the next bucket's average is kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket b covers [edges[b], edges[b + 1]); every bucket has >= 1 point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+
+    # Average point of every bucket in one pass; the bucket after the last
+    # one is the final point itself
+    avg_x = np.add.reduceat(x[:n - 1], starts) / counts
+    avg_y = np.add.reduceat(y[:n - 1], starts) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    # Each bucket depends on the point chosen in the previous one, so the
+    # buckets are walked in order; the work inside a bucket is vectorized
+    for b in range(len(starts)):
+        lo, hi = starts[b], ends[b]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[b]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[b] - ay))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def ohlc_buckets(df: pd.DataFrame, n_out: int) -> pd.DataFrame:
+    """Merge consecutive rows into n_out OHLC bars."""
+    n = len(df)
+    starts = np.unique(np.linspace(0, n, n_out + 1).astype(np.int64)[:-1])
+    lasts = np.append(starts[1:], n) - 1
+
+    # Date of the bucket's first row, every other column from its last row
+    out = df.iloc[lasts].reset_index(drop=True)
+    out["date"] = df["date"].to_numpy()[starts]
+    out["open"] = df["open"].to_numpy()[starts]
+    # fmax / fmin skip missing values inside a bucket
+    out["high"] = np.fmax.reduceat(df["high"].to_numpy(dtype=float), starts)
+    out["low"] = np.fmin.reduceat(df["low"].to_numpy(dtype=float), starts)
+    return out
+
+
+def downsample(df: pd.DataFrame, max_points: int, method: str = "lttb") -> pd.DataFrame:
+    """
+    Downsample API records (date, OHLC and indicator columns).
+
+    Args:
+        df (pd.DataFrame): Rows in date order; missing values may be None
+        max_points (int): Maximum number of rows returned
+        method (str): "lttb" or "ohlc"
+
+    Returns:
+        pd.DataFrame: At most max_points rows (missing values are NaN)
+    """
+    if len(df) <= max_points:
+        return df
+
+    df = df.reset_index(drop=True)
+    for column in df.columns:
+        if column not in ("date", "symbol", "period_end"):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+
+    if method == "ohlc":
+        return ohlc_buckets(df, max_points)
+
+    x = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[D]").astype(np.float64)
+    # Gaps in the close would poison the triangle areas; carry the last price
+    y = df["close"].ffill().bfill().to_numpy(dtype=np.float64)
+    return df.iloc[lttb_indices(x, y, max_points)].reset_index(drop=True)
@@ -0,0 +1,104 @@
+"""
+events.py
+
+"Symbols updated" events between the ingestion daemon and the API.
+
+Events travel over Postgres LISTEN/NOTIFY on the `symbols_updated` channel.
+The notification is sent inside the ingest transaction, so listeners only
+hear about rows that were actually committed.
+
+Publisher (ingest):
+    publish_symbols_updated(cur, ["NABIL", "NICA"], "2025-01-05")
+
+Subscriber (caches, precomputed tables):
+    on_symbols_updated(lambda event: cache.invalidate(event["symbols"]))
+    start_event_listener()   # once, at app startup
+"""
+import json
+import select
+import threading
+
+from core.database import get_db_connection
+
+CHANNEL = "symbols_updated"
+
+# Postgres NOTIFY payloads are limited to 8000 bytes
+MAX_PAYLOAD_SYMBOLS = 500
+
+_handlers = []
+_listener = None
+
+
+def publish_symbols_updated(cur, symbols, max_date=None):
+    """
+    Queue a notification on the given cursor's transaction.
+    Large symbol lists are split over several notifications.
+    Returns the event, so the caller can dispatch() it locally after commit.
+    """
+    symbols = sorted(symbols)
+    for i in range(0, len(symbols), MAX_PAYLOAD_SYMBOLS):
+        payload = {"symbols": symbols[i:i + MAX_PAYLOAD_SYMBOLS],
+                   "max_date": str(max_date) if max_date else None}
+        cur.execute("SELECT pg_notify(%s, %s)", (CHANNEL, json.dumps(payload)))
+    return {"symbols": symbols, "max_date": str(max_date) if max_date else None}
+
+
+def on_symbols_updated(handler):
+    """Register a callback(event) for symbols-updated events."""
+    _handlers.append(handler)
+    return handler
+
+
+def dispatch(event):
+    """Call every local handler (errors are logged, not raised)."""
+    for handler in list(_handlers):
+        try:
+            handler(event)
+        except Exception as e:
+            print(f"symbols_updated handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+
+def _listen_forever(stop_event):
+    while not stop_event.is_set():
+        conn = None
+        try:
+            conn = get_db_connection()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            while not stop_event.is_set():
+                # Wake up every few seconds to check the stop flag
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    dispatch(json.loads(notify.payload))
+        except Exception as e:
+            print(f"symbols_updated listener error, reconnecting: {e}")
+            stop_event.wait(5)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def start_event_listener():
+    """
+    Start a background thread that receives notifications from other
+    processes (e.g. db/ingest_daemon.py). Does nothing if no handler is
+    registered or the listener already runs.
+    """
+    global _listener
+    if not _handlers or _listener is not None:
+        return
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_listen_forever, args=(stop_event,), daemon=True)
+    thread.start()
+    _listener = (thread, stop_event)
+
+
+def stop_event_listener():
+    global _listener
+    if _listener is not None:
+        _listener[1].set()
+        _listener = None
@@ -14,6 +14,59 @@ BASE_URL = "https://sharehubnepal.com"
 # Placeholder image used when no image is found in the API response
 PLACEHOLDER_IMAGE = "/placeholder.jpg"
 
+# Number of posts the API returns per page
+PAGE_SIZE = 12
+
+
+def normalize_news_item(item):
+    """
+    Converts one raw API post into the news format used by the frontend.
+    """
+    # Try multiple possible image fields
+    raw_image = item.get("mediaUrl") or item.get("image") or item.get("thumbnail")
+
+    # If image URL is relative (starts with '/'), convert to absolute URL
+    if raw_image and raw_image.startswith("/"):
+        image_url = f"{BASE_URL}{raw_image}"
+    else:
+        image_url = raw_image
+
+    # If no image exists, use placeholder image
+    if not image_url:
+        image_url = PLACEHOLDER_IMAGE
+
+    return {
+        "id": item.get("id"),
+        "title": item.get("title") or "No title",  # upstream may send "title": null
+        "summary": item.get("summary") or item.get("description") or "",
+        "source": item.get("sourceName", "ShareHub Nepal"),
+        "url": f"https://sharehubnepal.com/news/{item.get('slug')}",
+        "image": image_url,
+        "publishedAt": item.get("publishedAt") or datetime.now().isoformat()
+    }
+
+
+def fetch_news_page(last_post_id=None):
+    """
+    Fetches one page of raw news posts (newest first).
+    Returns None if the request fails (an empty list means no more posts).
+    """
+    # Default API parameters
+    params = {"MediaType": "News", "Size": PAGE_SIZE}
+    # If we already fetched posts, use LastPostId for pagination
+    if last_post_id:
+        params["LastPostId"] = last_post_id
+    try:
+        # Make GET request to the API with headers and parameters
+        res = requests.get(BASE_API, headers=HEADERS, params=params, timeout=10)
+        # Raise error if request fails (4xx or 5xx response)
+        res.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Error fetching news: {e}")
+        return None
+    # Extract news items list from response
+    return res.json().get("data", [])
+
 
 def fetch_all_news(max_pages=3):
     """
@@ -23,63 +76,50 @@ def fetch_all_news(max_pages=3):
     news_list = []
     # Stores the ID of the last fetched post (used for pagination)
     last_post_id = None
-    # Page counter to control pagination
-    page = 0
     # Loop until we reach the maximum number of pages
-    while page < max_pages:
-        # Default API parameters
-        params = {"MediaType": "News", "Size": 12}
-        # If we already fetched posts, use LastPostId for pagination
-        if last_post_id:
-            params["LastPostId"] = last_post_id
-        try:
-            # Make GET request to the API with headers and parameters
-            res = requests.get(BASE_API, headers=HEADERS, params=params, timeout=10)
-            # Raise error if request fails (4xx or 5xx response)
-            res.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error fetching news: {e}")
-            break
-        # Convert API response to JSON
-        payload = res.json()
-        # Extract news items list from response
-        items = payload.get("data", [])
+    for _ in range(max_pages):
+        items = fetch_news_page(last_post_id)
         # Stop loop if no news items are returned
         if not items:
             break
-        for item in items:
-            """
-            Attempt to find the image field from the API response.
-            Different APIs may use different keys for images.
-            """
-
-            # Try multiple possible image fields
-            raw_image = item.get("mediaUrl") or item.get("image") or item.get("thumbnail")
-
-            # If image URL is relative (starts with '/'), convert to absolute URL
-            if raw_image and raw_image.startswith("/"):
-                image_url = f"{BASE_URL}{raw_image}"
-            else:
-                image_url = raw_image
-
-            # If no image exists, use placeholder image
-            if not image_url:
-                image_url = PLACEHOLDER_IMAGE
-
-            # Append processed news item to the list
-            news_list.append({
-                "title": item.get("title", "No title"),
-                "source": item.get("sourceName", "ShareHub Nepal"),
-                "url": f"https://sharehubnepal.com/news/{item.get('slug')}",
-                "image": image_url,
-                "publishedAt": item.get("publishedAt") or datetime.now().isoformat()
-            })
-
-            # Update last_post_id for pagination
-            last_post_id = item.get("id")
-
-        # Move to the next page
-        page += 1
+        news_list.extend(normalize_news_item(item) for item in items)
+        # Update last_post_id for pagination
+        last_post_id = items[-1].get("id")
 
     # Return the complete list of fetched news
     return news_list
+
+
+def fetch_news_since(since_id=None, max_pages=50, start_before_id=None):
+    """
+    Fetches only the posts newer than `since_id` (the stored high-water id).
+
+    Pages are walked newest-first using LastPostId and the walk stops as soon
+    as a post we already have shows up, so a regular sync costs one request.
+    `start_before_id` starts the walk below a given id instead, which is used
+    to backfill older history and to resume an unfinished walk.
+
+    Returns:
+        (news_list, complete, pages): complete is False when the walk stopped
+        on max_pages or an upstream error before reaching since_id (or the
+        end of history); pages is the number of requests made
+    """
+    news_list = []
+    last_post_id = start_before_id
+    for page in range(1, max_pages + 1):
+        items = fetch_news_page(last_post_id)
+        if items is None:
+            return news_list, False, page
+        if not items:
+            return news_list, True, page
+
+        for item in items:
+            item_id = item.get("id")
+            # Everything from here on is already stored
+            if since_id is not None and item_id is not None and item_id <= since_id:
+                return news_list, True, page
+            news_list.append(normalize_news_item(item))
+
+        last_post_id = items[-1].get("id")
+
+    return news_list, False, max_pages
@@ -0,0 +1,323 @@
+"""
+news_store.py
+
+Local archive for news posts fetched from ShareHub Nepal.
+
+- `news` keeps every post we have ever fetched (keyed by the upstream id)
+- `news_symbols` tags each post with the stock symbols it mentions,
+  so news for one company can be read with a single index lookup
+- `sync_news` pulls only the posts newer than the stored high-water id
+- `news_sync_gaps` remembers where a sync stopped on max_pages before
+  reaching the old high-water id, so the next sync fills the hole
+"""
+import re
+
+from psycopg2.extras import execute_values
+
+from core.database import get_db_connection
+from utils.news_service import fetch_news_since
+
+# Company names that carry no information and would match everything
+IGNORED_COMPANY_NAMES = {"unknown company"}
+
+# Shortest company name we try to match inside a headline
+MIN_COMPANY_NAME_LENGTH = 6
+
+# Tables are created once at startup (API and sync job), so the archive
+# works on existing databases without running DDL on every request
+CREATE_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS news (
+    id BIGINT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT,
+    source TEXT,
+    url TEXT,
+    image TEXT,
+    published_at TEXT,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS news_symbols (
+    symbol TEXT NOT NULL,
+    news_id BIGINT NOT NULL REFERENCES news (id) ON DELETE CASCADE,
+    PRIMARY KEY (symbol, news_id)
+);
+CREATE INDEX IF NOT EXISTS idx_news_symbols_news_id ON news_symbols (news_id);
+-- Posts with after_id < id < before_id may be missing
+CREATE TABLE IF NOT EXISTS news_sync_gaps (
+    before_id BIGINT PRIMARY KEY,
+    after_id BIGINT NOT NULL
+);
+"""
+
+
+def ensure_news_tables():
+    """Create the news tables if they do not exist yet."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_TABLES_SQL)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# -------------------------------------------------------------------
+# Symbol tagging
+# -------------------------------------------------------------------
+
+def load_symbol_index(conn):
+    """
+    Loads stock symbols and company names from stock_info.
+
+    Returns:
+        symbols (set): all known symbols (upper case)
+        companies (list): (lower-case company name, symbol) pairs,
+                          longest names first so the most specific match wins
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT symbol, company_name FROM stock_info")
+        rows = cur.fetchall()
+
+    symbols = {r[0].strip().upper() for r in rows if r[0]}
+    companies = [
+        (r[1].strip().lower(), r[0].strip().upper())
+        for r in rows
+        if r[0] and r[1]
+        and r[1].strip().lower() not in IGNORED_COMPANY_NAMES
+        and len(r[1].strip()) >= MIN_COMPANY_NAME_LENGTH
+    ]
+    companies.sort(key=lambda c: len(c[0]), reverse=True)
+    return symbols, companies
+
+
+def tag_symbols(item, symbols, companies):
+    """
+    Finds the stock symbols mentioned by a news item.
+
+    Symbols are matched as whole upper-case words (so "NABIL" matches but the
+    word "nabil" inside a sentence does not), company names case-insensitively.
+    """
+    text = f"{item.get('title') or ''} {item.get('summary') or ''}"
+
+    # Whole-word, upper-case tokens such as NABIL or NICA
+    tokens = set(re.findall(r"\b[A-Z][A-Z0-9]+\b", text))
+    found = tokens & symbols
+
+    lowered = text.lower()
+    for name, symbol in companies:
+        if name in lowered:
+            found.add(symbol)
+
+    return sorted(found)
+
+
+# -------------------------------------------------------------------
+# Sync
+# -------------------------------------------------------------------
+
+def get_high_water_id(conn):
+    """Returns the newest stored post id, or None if the archive is empty."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT MAX(id) FROM news")
+        return cur.fetchone()[0]
+
+
+def get_low_water_id(conn):
+    """Returns the oldest stored post id, or None if the archive is empty."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(id) FROM news")
+        return cur.fetchone()[0]
+
+
+def save_news(conn, news_items):
+    """
+    Stores news items and their symbol tags.
+    Posts that are already stored are left untouched.
+    """
+    if not news_items:
+        return 0
+
+    symbols, companies = load_symbol_index(conn)
+
+    news_rows = []
+    tag_rows = []
+    for item in news_items:
+        if item.get("id") is None:
+            continue
+        news_rows.append((
+            item["id"],
+            item.get("title") or "No title",
+            item.get("summary"),
+            item.get("source"),
+            item.get("url"),
+            item.get("image"),
+            item.get("publishedAt"),
+        ))
+        for symbol in tag_symbols(item, symbols, companies):
+            tag_rows.append((symbol, item["id"]))
+
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO news (id, title, summary, source, url, image, published_at)
+            VALUES %s
+            ON CONFLICT (id) DO NOTHING
+            """,
+            news_rows,
+        )
+        if tag_rows:
+            execute_values(
+                cur,
+                """
+                INSERT INTO news_symbols (symbol, news_id)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+                """,
+                tag_rows,
+            )
+    conn.commit()
+    return len(news_rows)
+
+
+def _lowest_id(news_items):
+    ids = [item["id"] for item in news_items if item.get("id") is not None]
+    return min(ids) if ids else None
+
+
+def fill_gaps(conn, max_pages):
+    """
+    Continues walks that an earlier sync cut short, newest gap first.
+    A gap is deleted once its walk reaches after_id, otherwise it
+    shrinks to below the oldest post fetched now.
+
+    Returns:
+        int: Number of posts stored
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT before_id, after_id FROM news_sync_gaps ORDER BY before_id DESC")
+        gaps = cur.fetchall()
+
+    stored = 0
+    for before_id, after_id in gaps:
+        if max_pages <= 0:
+            break
+        news_items, complete, pages = fetch_news_since(
+            since_id=after_id, max_pages=max_pages, start_before_id=before_id
+        )
+        max_pages -= pages
+        stored += save_news(conn, news_items)
+
+        lowest = _lowest_id(news_items)
+        with conn.cursor() as cur:
+            if complete:
+                cur.execute("DELETE FROM news_sync_gaps WHERE before_id = %s", (before_id,))
+            elif lowest is not None:
+                cur.execute(
+                    "UPDATE news_sync_gaps SET before_id = %s WHERE before_id = %s",
+                    (lowest, before_id),
+                )
+        conn.commit()
+    return stored
+
+
+def sync_news(max_pages=50, backfill=False):
+    """
+    Pulls new posts from the upstream API into the local archive.
+
+    When more than max_pages of new posts arrived since the last sync,
+    the posts between the old high-water id and the oldest one fetched are
+    recorded as a gap and fetched by the following syncs (fill_gaps).
+
+    Args:
+        max_pages (int): Upper bound on upstream requests for this run
+        backfill (bool): Instead of fetching newer posts, continue paging
+                         back from the oldest stored post
+
+    Returns:
+        int: Number of posts stored
+    """
+    conn = get_db_connection()
+    try:
+        if backfill:
+            news_items, _, _ = fetch_news_since(
+                max_pages=max_pages, start_before_id=get_low_water_id(conn)
+            )
+            return save_news(conn, news_items)
+
+        high_water_id = get_high_water_id(conn)
+        news_items, complete, pages = fetch_news_since(
+            since_id=high_water_id, max_pages=max_pages
+        )
+        lowest = _lowest_id(news_items)
+        if not complete and high_water_id is not None and lowest is not None:
+            # Recorded before the posts move the high-water id past the hole
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO news_sync_gaps (before_id, after_id) VALUES (%s, %s) "
+                    "ON CONFLICT (before_id) DO NOTHING",
+                    (lowest, high_water_id),
+                )
+            conn.commit()
+        stored = save_news(conn, news_items)
+        return stored + fill_gaps(conn, max_pages - pages)
+    finally:
+        conn.close()
+
+
+# -------------------------------------------------------------------
+# Queries
+# -------------------------------------------------------------------
+
+def query_news(symbol=None, before_id=None, limit=36):
+    """
+    Reads news from the archive, newest first.
+
+    Args:
+        symbol (str): Only return posts tagged with this symbol
+        before_id (int): Keyset cursor, only posts older than this id
+        limit (int): Maximum number of posts to return
+    """
+    conditions = []
+    params = []
+    if symbol:
+        conditions.append("n.id IN (SELECT news_id FROM news_symbols WHERE symbol = %s)")
+        params.append(symbol.strip().upper())
+    if before_id is not None:
+        conditions.append("n.id < %s")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+
+    query = f"""
+        SELECT n.id, n.title, n.summary, n.source, n.url, n.image, n.published_at,
+               COALESCE(ARRAY_AGG(ns.symbol) FILTER (WHERE ns.symbol IS NOT NULL), '{{}}')
+        FROM news n
+        LEFT JOIN news_symbols ns ON ns.news_id = n.id
+        {where}
+        GROUP BY n.id
+        ORDER BY n.id DESC
+        LIMIT %s
+    """
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "id": r[0],
+            "title": r[1],
+            "summary": r[2],
+            "source": r[3],
+            "url": r[4],
+            "image": r[5],
+            "publishedAt": r[6],
+            "symbols": sorted(r[7]),
+        }
+        for r in rows
+    ]
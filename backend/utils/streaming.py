@@ -0,0 +1,320 @@
+"""
+streaming.py
+
+Fan-out of live price bars, indicator values and market-mover changes
+to WebSocket / SSE clients.
+
+- One producer (e.g. ReplayFeed) calls `hub.publish_day(bars)`
+- Every bar updates that symbol's indicators incrementally (O(1) per bar)
+  instead of recomputing them from the full history
+- Each client has its own bounded queue; a slow client only loses its
+  own oldest events and never slows down the producer or other clients
+"""
+import asyncio
+import math
+import os
+import threading
+from collections import deque
+from datetime import date as date_type
+
+from starlette.concurrency import run_in_threadpool
+
+from core.database import get_db_connection
+from core.metrics import register_counter, register_gauge
+
+# Events buffered per client before the oldest ones are dropped
+CLIENT_QUEUE_SIZE = int(os.getenv("STREAM_CLIENT_QUEUE_SIZE", "256"))
+
+# Number of gainers / losers in the movers list
+MOVERS_COUNT = 10
+
+
+# -------------------------------------------------------------------
+# Incremental indicators
+# -------------------------------------------------------------------
+
+class IndicatorState:
+    """
+    Keeps the indicators of routers/analysis.py up to date one bar at a time.
+    Values match the pandas versions computed over the same bars.
+    """
+
+    def __init__(self):
+        self.closes = deque(maxlen=20)   # for rolling mean / Bollinger bands
+        self.gains = deque(maxlen=14)    # for RSI
+        self.losses = deque(maxlen=14)
+        self.prev_close = None
+        # ewm(span=n, adjust=True) == weighted sum / sum of weights
+        self.ema = {12: [0.0, 0.0], 26: [0.0, 0.0]}
+
+    def update(self, bar):
+        close = bar["close"]
+        indicators = {"avg_price": (bar["high"] + bar["low"]) / 2}
+
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            # A 0 previous close gives inf/NaN in pandas, which the API replaces with 0
+            indicators["price_change"] = delta / self.prev_close * 100 if self.prev_close else 0.0
+            self.gains.append(max(delta, 0.0))
+            self.losses.append(max(-delta, 0.0))
+        else:
+            # The first bar has no change; pandas counts it as a 0 gain and 0 loss
+            indicators["price_change"] = 0.0
+            self.gains.append(0.0)
+            self.losses.append(0.0)
+        self.prev_close = close
+
+        self.closes.append(close)
+        mean = sum(self.closes) / len(self.closes)
+        indicators["rolling_mean_20"] = mean
+
+        for span, state in self.ema.items():
+            decay = 1 - 2 / (span + 1)
+            state[0] = state[0] * decay + close
+            state[1] = state[1] * decay + 1
+            indicators[f"EMA{span}"] = state[0] / state[1]
+
+        # RSI14 (same rolling-mean formula as calculate_rsi, 0 when there are no losses)
+        avg_gain = sum(self.gains) / len(self.gains)
+        avg_loss = sum(self.losses) / len(self.losses)
+        indicators["RSI14"] = 100 - 100 / (1 + avg_gain / avg_loss) if avg_loss else 0.0
+
+        # Bollinger bands need a full 20-bar window (0 before that, like the API)
+        if len(self.closes) == 20:
+            std = math.sqrt(sum((c - mean) ** 2 for c in self.closes) / 19)
+            indicators.update(BB_UPPER=mean + 2 * std, BB_LOWER=mean - 2 * std, BB_MA20=mean)
+        else:
+            indicators.update(BB_UPPER=0.0, BB_LOWER=0.0, BB_MA20=0.0)
+
+        return indicators
+
+
+# -------------------------------------------------------------------
+# Clients and hub
+# -------------------------------------------------------------------
+
+class StreamClient:
+    """One connected client with its own bounded event queue."""
+
+    def __init__(self, symbols=(), movers=False):
+        self.symbols = {s.upper() for s in symbols}
+        self.movers = movers
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+
+    def offer(self, event):
+        """Queue an event; if the client is behind, drop its oldest event."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class StreamHub:
+    """Routes events from the producer to subscribed clients."""
+
+    def __init__(self):
+        self.by_symbol = {}        # symbol -> set of clients
+        self.movers_clients = set()
+        self.states = {}           # symbol -> IndicatorState
+        self.changes = {}          # symbol -> (price, change %)
+        self.last_movers = None
+        self.events_published = 0
+        self.events_dropped = 0
+
+    # --- subscriptions ----------------------------------------------
+    def subscribe(self, client: StreamClient):
+        for symbol in client.symbols:
+            self.by_symbol.setdefault(symbol, set()).add(client)
+        if client.movers:
+            self.movers_clients.add(client)
+            if self.last_movers is not None:
+                client.offer({"type": "movers", **self.last_movers})
+
+    def unsubscribe(self, client: StreamClient):
+        for symbol in client.symbols:
+            clients = self.by_symbol.get(symbol)
+            if clients:
+                clients.discard(client)
+                if not clients:
+                    del self.by_symbol[symbol]
+        self.movers_clients.discard(client)
+        self.events_dropped += client.dropped
+
+    def update_subscription(self, client: StreamClient, symbols=None, movers=None):
+        self.unsubscribe(client)
+        client.dropped = 0
+        if symbols is not None:
+            client.symbols = {s.upper() for s in symbols}
+        if movers is not None:
+            client.movers = movers
+        self.subscribe(client)
+
+    @property
+    def client_count(self):
+        clients = set(self.movers_clients)
+        for subs in self.by_symbol.values():
+            clients |= subs
+        return len(clients)
+
+    def reset_market(self):
+        """Forget indicator state and movers (e.g. before a new replay)."""
+        self.states.clear()
+        self.changes.clear()
+        self.last_movers = None
+
+    # --- publishing --------------------------------------------------
+    def _send(self, clients, event):
+        for client in clients:
+            client.offer(event)
+        self.events_published += len(clients)
+
+    def publish_day(self, bars):
+        """
+        Publish one trading day of bars (list of dicts with date, symbol,
+        open, high, low, close, close_norm). Must run on the event loop.
+        """
+        for bar in bars:
+            symbol = bar["symbol"]
+            state = self.states.get(symbol)
+            if state is None:
+                state = self.states[symbol] = IndicatorState()
+            prev_close = state.prev_close
+            indicators = state.update(bar)
+
+            if prev_close:
+                self.changes[symbol] = (bar["close"], round((bar["close"] - prev_close) / prev_close * 100, 2))
+
+            clients = self.by_symbol.get(symbol)
+            if clients:
+                self._send(clients, {"type": "bar", "symbol": symbol, "bar": bar, "indicators": indicators})
+
+        self._publish_movers()
+
+    def _publish_movers(self):
+        """Send the movers list only when it changed."""
+        ranked = sorted(self.changes.items(), key=lambda item: item[1][1], reverse=True)
+        movers = {
+            "gainers": [
+                {"symbol": s, "current_price": p, "change_percent": c}
+                for s, (p, c) in ranked[:MOVERS_COUNT] if c > 0
+            ],
+            "losers": [
+                {"symbol": s, "current_price": p, "change_percent": c}
+                for s, (p, c) in reversed(ranked[-MOVERS_COUNT:]) if c < 0
+            ],
+        }
+        if movers != self.last_movers:
+            self.last_movers = movers
+            if self.movers_clients:
+                self._send(self.movers_clients, {"type": "movers", **movers})
+
+
+hub = StreamHub()
+
+register_gauge("stream_clients", "Connected streaming clients", lambda: hub.client_count)
+register_counter("stream_events_published_total", "Events queued for streaming clients",
+                 lambda: hub.events_published)
+register_counter("stream_events_dropped_total", "Events dropped for slow streaming clients",
+                 lambda: hub.events_dropped + sum(
+                     c.dropped for subs in hub.by_symbol.values() for c in subs))
+
+
+# -------------------------------------------------------------------
+# Replay feed
+# -------------------------------------------------------------------
+
+class ReplayFeed:
+    """
+    Plays historical `stocks` rows through the hub, one trading day at a
+    time, so streaming can be tested without a live data source.
+
+    speed = trading days per second.
+    """
+
+    def __init__(self, start_date=None, end_date=None, speed=1.0):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.speed = speed
+        self.current_date = None
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def _read_days(self):
+        """Generator of (date, bars) read with a server-side cursor."""
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor(name="stream_replay")  # server-side, streams rows
+            cur.itersize = 5000
+            cur.execute(
+                """
+                SELECT date, symbol, open, high, low, close, close_norm
+                FROM stocks
+                WHERE close IS NOT NULL
+                  AND (%s::date IS NULL OR date >= %s::date)
+                  AND (%s::date IS NULL OR date <= %s::date)
+                ORDER BY date, symbol
+                """,
+                (self.start_date, self.start_date, self.end_date, self.end_date),
+            )
+            day, bars = None, []
+            for row in cur:
+                if row[0] != day and bars:
+                    yield day, bars
+                    bars = []
+                day = row[0]
+                bars.append({
+                    "date": row[0].isoformat() if isinstance(row[0], date_type) else str(row[0]),
+                    "symbol": row[1],
+                    "open": float(row[2]) if row[2] is not None else None,
+                    "high": float(row[3]) if row[3] is not None else None,
+                    "low": float(row[4]) if row[4] is not None else None,
+                    "close": float(row[5]),
+                    "close_norm": float(row[6]) if row[6] is not None else None,
+                })
+            if bars:
+                yield day, bars
+            cur.close()
+        finally:
+            conn.close()
+
+    async def _run(self):
+        days = self._read_days()
+        # A cancelled task leaves its next() running in the worker thread;
+        # the lock makes close() wait for it instead of failing
+        lock = threading.Lock()
+
+        def step():
+            with lock:
+                return next(days, None)
+
+        def close():
+            with lock:
+                days.close()
+
+        try:
+            while True:
+                item = await run_in_threadpool(step)
+                if item is None:
+                    break
+                self.current_date, bars = item
+                # high/low may be missing in old rows; fall back to close
+                for bar in bars:
+                    bar["high"] = bar["high"] if bar["high"] is not None else bar["close"]
+                    bar["low"] = bar["low"] if bar["low"] is not None else bar["close"]
+                hub.publish_day(bars)
+                await asyncio.sleep(1 / self.speed)
+        finally:
+            # Release the server-side cursor and its connection now (also on
+            # stop()), not whenever the generator is garbage collected
+            await run_in_threadpool(close)
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
@@ -0,0 +1,18 @@
+"""
+timeframes.py
+
+Calendar days covered by each chart timeframe (anything else = ALL history).
+One map for every router, so /api/stocks, /api/compare, /api/correlations
+and /api/sectors read the same window for the same timeframe: the days
+after (latest date - N days).
+"""
+
+TIMEFRAME_DAYS = {
+    "1D": 1,
+    "1W": 7,
+    "1M": 30,
+    "6M": 180,
+    "1Y": 365,
+    "3Y": 1095,
+    "5Y": 1825
+}